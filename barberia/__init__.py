@@ -0,0 +1,99 @@
+"""Fábrica de la aplicación.
+
+Cada proceso registra solo los blueprints que sirve, así la reserva pública y el
+panel/reportes (pandas) pueden correr en pools de gunicorn separados:
+
+    gunicorn -w 8 'barberia:create_app(blueprints="auth,reservas,api,api_v1")'
+    gunicorn -w 2 'barberia:create_app(blueprints="admin,reportes,empleado")'
+
+Los scripts y comandos de CLI usan create_app(blueprints=()) y no cargan rutas.
+"""
+import os
+import importlib
+import click
+from flask import Flask, request, has_request_context
+from barberia import extensiones, sesiones, seguridad, estaticos, eventos, metricas, bitacora
+from barberia.config import Config, CONFIGS
+
+BLUEPRINTS = ('auth', 'reservas', 'api', 'api_v1', 'admin', 'reportes', 'empleado')
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_mapa_completo = None
+
+
+def create_app(config=None, blueprints=None):
+    app = Flask(__name__,
+                template_folder=os.path.join(RAIZ, 'templates'),
+                static_folder=os.path.join(RAIZ, 'static'),
+                instance_path=os.path.join(RAIZ, 'instance'))
+
+    # config: objeto de configuración o nombre ('desarrollo', 'produccion', 'pruebas')
+    if config is None:
+        config = os.getenv('APP_CONFIG')
+    if config is None or isinstance(config, str):
+        config = CONFIGS.get(config, Config)
+    app.config.from_object(config)
+
+    extensiones.init_app(app)
+    metricas.init_app(app)
+    bitacora.init_app(app)
+    sesiones.init_app(app)
+    seguridad.init_app(app)
+    estaticos.init_app(app)
+    eventos.init_app(app)
+
+    if blueprints is None:
+        blueprints = app.config['BLUEPRINTS'] or BLUEPRINTS
+    if isinstance(blueprints, str):
+        blueprints = [nombre.strip() for nombre in blueprints.split(',') if nombre.strip()]
+    for nombre in blueprints:
+        app.register_blueprint(importlib.import_module(f'barberia.{nombre}').bp)
+    app.url_build_error_handlers.append(_enlace_a_otro_pool)
+
+    # El esquema no se toca al arrancar: se migra aparte con `flask --app app migrar`
+    @app.cli.command('migrar')
+    def migrar_comando():
+        from migraciones import migrar
+        migrar()
+
+    @app.cli.command('archivar')
+    def archivar_comando():
+        from barberia.archivo import archivar
+        try:
+            print(f"Turnos archivados: {archivar()}")
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    @app.cli.command('importar')
+    @click.argument('tipo', type=click.Choice(['servicios', 'productos', 'clientes']))
+    @click.argument('ruta', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--simular', is_flag=True, help='Solo valida y muestra el reporte, sin insertar.')
+    def importar_comando(tipo, ruta, simular):
+        from barberia.importacion import importar
+        with open(ruta, 'rb') as archivo:
+            reporte = importar(tipo, archivo, ruta, simular=simular)
+        for e in reporte['errores']:
+            print(f"Fila {e['fila']}: {e['error']}")
+        print(f"Filas: {reporte['filas']} | válidas: {reporte['validas']} | insertadas: {reporte['insertadas']} "
+              f"| errores: {reporte['total_errores']}")
+
+    return app
+
+
+def _enlace_a_otro_pool(error, endpoint, values):
+    # En un pool parcial, url_for hacia vistas de otro pool se resuelve con el mapa completo
+    global _mapa_completo
+    if endpoint.split('.', 1)[0] not in BLUEPRINTS or not has_request_context():
+        return None
+    if _mapa_completo is None:
+        completo = Flask(__name__)
+        for nombre in BLUEPRINTS:
+            completo.register_blueprint(importlib.import_module(f'barberia.{nombre}').bp)
+        _mapa_completo = completo.url_map
+
+    ancla, metodo = values.pop('_anchor', None), values.pop('_method', None)
+    esquema, externa = values.pop('_scheme', None), values.pop('_external', None)
+    adaptador = _mapa_completo.bind(request.host, script_name=request.script_root,
+                                    url_scheme=esquema or request.scheme)
+    url = adaptador.build(endpoint, values, method=metodo, force_external=bool(externa))
+    return f"{url}#{ancla}" if ancla else url
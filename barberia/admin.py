@@ -0,0 +1,591 @@
+import logging
+import csv
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from barberia.extensiones import db
+from barberia.modelos import (Usuario, Sucursal, Producto, Empleado, Turno, Servicio, ReglaPuntos, Premio,
+                              BloqueoDisponibilidad, HistorialCanje, TURNO_INACTIVO)
+from barberia.seguridad import hashear_password, limitador
+from barberia.sesiones import revocar_sesiones
+from barberia.eventos import flujo_eventos
+from barberia.utilidades import (paginar_por_cursor, filtrar_por_barbero, periodo_quincena,
+                                 calcular_liquidacion, sucursal_de_sesion, args_filtros, lectura_replica,
+                                 admin_o_gerente_required, admin_required)
+
+log = logging.getLogger(__name__)
+
+bp = Blueprint('admin', __name__)
+
+# --- DASHBOARD ADMINISTRADOR ---
+# La página solo entrega el esqueleto; cada sección se carga por JSON al abrirla.
+@bp.route('/admin/dashboard')
+@admin_o_gerente_required
+def admin_dashboard():
+    ahora = datetime.now()
+    fecha_query = request.args.get('fecha', ahora.strftime('%Y-%m-%d'))
+    Turnos_agenda_fecha = datetime.strptime(fecha_query, '%Y-%m-%d').date()
+
+    # Selector de días (Traducción manual a Español, Python usa 0=Lunes)
+    dias_semana = []
+    nombres_es = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+
+    for i in range(7):
+        d = ahora.date() + timedelta(days=i)
+        dias_semana.append({
+            'fecha': d.strftime('%Y-%m-%d'),
+            'nombre': nombres_es[d.weekday()],
+            'numero': d.day
+    })
+
+    return render_template('admin_dashboard.html',
+                           hoy_str=Turnos_agenda_fecha.strftime('%d de %B, %Y'),
+                           periodo=periodo_quincena(ahora)[2],
+                           dias_semana=dias_semana,
+                           fecha_actual=fecha_query,
+                           es_gerente=session.get('rol') == 'gerente')
+
+@bp.route('/admin/api/filtros')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_filtros():
+    sucursales = Sucursal.query
+    barberos = Empleado.query
+    sucursal_fija = sucursal_de_sesion()
+    if sucursal_fija:
+        sucursales = sucursales.filter(Sucursal.id == sucursal_fija)
+        barberos = barberos.filter(Empleado.sucursal_id == sucursal_fija)
+
+    return jsonify({
+        'sucursales': [{'id': s.id, 'nombre': s.nombre} for s in sucursales.order_by(Sucursal.nombre).all()],
+        'barberos': [{'id': e.id, 'nombre': e.nombre, 'sucursal_id': e.sucursal_id}
+                     for e in barberos.order_by(Empleado.nombre).all()],
+        'sucursal_fija': sucursal_fija
+    })
+
+@bp.route('/admin/api/agenda')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_agenda():
+    sucursal_id, barbero_id = args_filtros()
+    hoy = datetime.now().date()
+    try:
+        fecha = datetime.strptime(request.args.get('fecha', hoy.strftime('%Y-%m-%d')), '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': 'Fecha inválida'}), 400
+
+    # Rango [fecha, fecha+1) en lugar de date(fecha_hora) para poder usar índices
+    query = Turno.query.options(joinedload(Turno.servicio)).filter(
+        Turno.fecha_hora >= fecha, Turno.fecha_hora < fecha + timedelta(days=1))
+    query = filtrar_por_barbero(query, Turno, sucursal_id, barbero_id)
+    try:
+        turnos, siguiente = paginar_por_cursor(query, Turno.fecha_hora, request.args.get('cursor'),
+                                               current_app.config['ADMIN_PAGINA'])
+    except ValueError:
+        return jsonify({'error': 'Cursor inválido'}), 400
+
+    respuesta = {
+        'turnos': [{
+            'id': t.id,
+            'empleado_id': t.empleado_id,
+            'hora': t.fecha_hora.strftime('%H:%M'),
+            'cliente': t.nombre_cliente,
+            'servicio': t.servicio.nombre if t.servicio else 'N/A',
+            'estado': t.estado
+        } for t in turnos],
+        'siguiente': siguiente
+    }
+
+    # Las tarjetas (siempre de HOY real) solo se calculan con la primera página
+    if not request.args.get('cursor'):
+        inicio_hoy = datetime.combine(hoy, datetime.min.time())
+        es_hoy = db.and_(Turno.fecha_hora >= inicio_hoy, Turno.fecha_hora < inicio_hoy + timedelta(days=1))
+        stats = filtrar_por_barbero(db.session.query(
+            db.func.sum(db.case((db.and_(es_hoy, Turno.estado == 'pendiente'), 1), else_=0)),
+            db.func.sum(db.case((db.and_(es_hoy, Turno.estado == 'completado'), 1), else_=0)),
+            db.func.sum(db.case((Turno.estado.notin_(TURNO_INACTIVO), 1), else_=0))
+        ), Turno, sucursal_id, barbero_id).one()
+        respuesta['stats'] = {
+            'programados_hoy': int(stats[0] or 0),
+            'completados_hoy': int(stats[1] or 0),
+            'total_turnos_historico': int(stats[2] or 0)
+        }
+    return jsonify(respuesta)
+
+@bp.route('/admin/eventos')
+@admin_o_gerente_required
+def admin_eventos():
+    # El admin recibe toda la cadena; el gerente, lo que entra o sale de su sede
+    sucursal_fija = sucursal_de_sesion()
+    if not sucursal_fija:
+        return flujo_eventos(lambda e: True)
+    return flujo_eventos(lambda e: e['sucursal_id'] == sucursal_fija
+                         or e.get('antes', {}).get('sucursal_id') == sucursal_fija)
+
+@bp.route('/admin/api/historial')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_historial():
+    sucursal_id, barbero_id = args_filtros()
+    query = Turno.query.options(joinedload(Turno.servicio), joinedload(Turno.barbero))
+    query = filtrar_por_barbero(query, Turno, sucursal_id, barbero_id)
+    try:
+        turnos, siguiente = paginar_por_cursor(query, Turno.fecha_hora, request.args.get('cursor'),
+                                               current_app.config['ADMIN_PAGINA'], descendente=True)
+    except ValueError:
+        return jsonify({'error': 'Cursor inválido'}), 400
+
+    return jsonify({
+        'turnos': [{
+            'id': t.id,
+            'fecha': t.fecha_hora.strftime('%Y-%m-%d %H:%M'),
+            'cliente': t.nombre_cliente,
+            'barbero': t.barbero.nombre if t.barbero else 'N/A',
+            'servicio': t.servicio.nombre if t.servicio else 'N/A',
+            'estado': t.estado,
+            'total': t.total_pagado
+        } for t in turnos],
+        'siguiente': siguiente
+    })
+
+@bp.route('/admin/api/contabilidad')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_contabilidad():
+    sucursal_id, _ = args_filtros()
+    inicio_p, fin_p, nombre_periodo = periodo_quincena(datetime.now())
+    return jsonify({
+        'periodo': nombre_periodo,
+        'liquidacion': calcular_liquidacion(inicio_p, fin_p, sucursal_id)
+    })
+
+@bp.route('/admin/api/usuarios')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_usuarios():
+    sucursal_id, barbero_id = args_filtros()
+
+    bloqueos = BloqueoDisponibilidad.query.options(joinedload(BloqueoDisponibilidad.empleado))
+    bloqueos = filtrar_por_barbero(bloqueos, BloqueoDisponibilidad, sucursal_id, barbero_id)
+    try:
+        bloqueos, siguiente = paginar_por_cursor(bloqueos, BloqueoDisponibilidad.fecha, request.args.get('cursor'),
+                                                 current_app.config['ADMIN_PAGINA'], parsear=str)
+    except ValueError:
+        return jsonify({'error': 'Cursor inválido'}), 400
+
+    respuesta = {
+        'bloqueos': [{
+            'id': b.id,
+            'barbero': b.empleado.nombre if b.empleado else 'N/A',
+            'fecha': b.fecha,
+            'hora_inicio': b.hora_inicio,
+            'hora_fin': b.hora_fin,
+            'dia_completo': b.dia_completo,
+            'motivo': b.motivo
+        } for b in bloqueos],
+        'siguiente': siguiente
+    }
+
+    if not request.args.get('cursor'):
+        empleados = Empleado.query.options(joinedload(Empleado.sucursal_local))
+        if sucursal_id:
+            empleados = empleados.filter(Empleado.sucursal_id == sucursal_id)
+        respuesta['empleados'] = [{
+            'id': e.id,
+            'nombre': e.nombre,
+            'sucursal': e.sucursal_local.nombre if e.sucursal_local else 'Principal'
+        } for e in empleados.order_by(Empleado.nombre).all()]
+    return jsonify(respuesta)
+
+@bp.route('/admin/api/inventario')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_inventario():
+    try:
+        productos, siguiente = paginar_por_cursor(Producto.query, Producto.nombre, request.args.get('cursor'),
+                                                  current_app.config['ADMIN_PAGINA'], parsear=str)
+    except ValueError:
+        return jsonify({'error': 'Cursor inválido'}), 400
+
+    respuesta = {
+        'productos': [{'id': p.id, 'nombre': p.nombre, 'precio': p.precio, 'stock': p.stock, 'unidad': p.unidad}
+                      for p in productos],
+        'siguiente': siguiente
+    }
+    if not request.args.get('cursor'):
+        respuesta['servicios'] = [{'id': s.id, 'nombre': s.nombre, 'precio': s.precio, 'duracion_minutos': s.duracion_minutos}
+                                  for s in Servicio.query.order_by(Servicio.nombre).all()]
+    return jsonify(respuesta)
+
+@bp.route('/admin/api/puntos')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_puntos():
+    return jsonify({
+        'reglas': [{'id': r.id, 'rango_min': r.rango_min, 'rango_max': r.rango_max, 'puntos': r.puntos}
+                   for r in ReglaPuntos.query.order_by(ReglaPuntos.rango_min).all()],
+        'premios': [{'id': p.id, 'nombre': p.nombre, 'puntos_requeridos': p.puntos_requeridos}
+                    for p in Premio.query.order_by(Premio.puntos_requeridos).all()]
+    })
+
+@bp.route('/admin/add-producto', methods=['POST'])
+def add_producto():
+    # Extraemos los datos del formulario, incluyendo la nueva 'unidad'
+    nombre = request.form.get('nombre')
+    stock = request.form.get('stock')
+    precio = request.form.get('precio')
+    unidad = request.form.get('unidad') # <--- Capturamos la medida (uds, ml, etc.)
+
+    nuevo = Producto(
+        nombre=nombre,
+        stock=int(stock) if stock else 0,
+        precio=float(precio) if precio else 0.0,
+        unidad=unidad if unidad else "uds" # <--- Si llega vacío, ponemos "uds" por defecto
+    )
+    
+    db.session.add(nuevo)
+    db.session.commit()
+    flash("Producto añadido al inventario", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#inventario')
+
+@bp.route('/admin/importar', methods=['POST'])
+@admin_required
+def importar_archivo():
+    # Servicios, productos o clientes desde CSV/XLSX; simular=1 solo valida. Devuelve el reporte por fila.
+    from barberia.importacion import importar, TIPOS
+    tipo = request.form.get('tipo')
+    archivo = request.files.get('archivo')
+    if tipo not in TIPOS or not archivo or not archivo.filename:
+        return jsonify({'error': 'Indica el tipo y un archivo CSV o XLSX'}), 400
+    try:
+        reporte = importar(tipo, archivo.stream, archivo.filename, simular=request.form.get('simular') == '1')
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'error': f'No se pudo leer el archivo: {e}'}), 400
+    except Exception:
+        log.exception("Error importando %s", tipo, extra={'archivo': archivo.filename})
+        return jsonify({'error': 'No se pudo leer el archivo (¿CSV en UTF-8 o XLSX válido?)'}), 400
+    return jsonify(reporte)
+
+@bp.route('/admin/eliminar-producto/<int:id>')
+def eliminar_producto(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    
+    prod = Producto.query.get_or_404(id)
+    db.session.delete(prod)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        flash("No se puede eliminar: el producto tiene ventas registradas.", "error")
+        return redirect(url_for('admin.admin_dashboard') + '#inventario')
+    flash("Producto eliminado del inventario", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#inventario')
+
+@bp.route('/admin/editar-producto/<int:id>', methods=['POST'])
+def editar_producto(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    p = Producto.query.get_or_404(id)
+    p.nombre = request.form.get('nombre')
+    p.unidad = request.form.get('unidad') # Añadido como pediste
+    p.precio = float(request.form.get('precio'))
+    p.stock = int(request.form.get('stock'))
+    db.session.commit()
+    flash("Producto actualizado correctamente", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#inventario')
+
+@bp.route('/admin/add-servicio', methods=['POST'])
+def add_servicio():
+    nombre = request.form.get('nombre')
+    precio = request.form.get('precio')
+    duracion = request.form.get('duracion') # Captura el select del HTML
+    
+    nuevo = Servicio(nombre=nombre, precio=float(precio), duracion_minutos=int(duracion))
+    db.session.add(nuevo)
+    db.session.commit()
+    return redirect(url_for('admin.admin_dashboard') + '#inventario')
+
+@bp.route('/admin/eliminar-servicio/<int:id>')
+def eliminar_servicio(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    
+    serv = Servicio.query.get_or_404(id)
+    db.session.delete(serv)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        flash("No se puede eliminar: el servicio tiene turnos asociados.", "error")
+        return redirect(url_for('admin.admin_dashboard') + '#inventario')
+    flash("Servicio eliminado", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#inventario')
+
+@bp.route('/admin/editar-servicio/<int:id>', methods=['POST'])
+def editar_servicio(id):
+    s = Servicio.query.get_or_404(id)
+    s.nombre = request.form.get('nombre')
+    s.precio = float(request.form.get('precio'))
+    s.duracion_minutos = int(request.form.get('duracion'))
+    db.session.commit()
+    return redirect(url_for('admin.admin_dashboard') + '#inventario')
+
+@bp.route('/admin/crear-empleado', methods=['POST'])
+def crear_empleado():
+    if session.get('rol') != 'admin': 
+        return redirect(url_for('auth.login'))
+    
+    # Captura de datos
+    nombre = request.form.get('nombre')
+    email = request.form.get('email').lower()
+    password = request.form.get('password')
+    comision = request.form.get('comision', 70.0) 
+    sucursal_id = request.form.get('sucursal_id')
+    # Valor por defecto ya que no está en tu HTML actual
+    especialidad = request.form.get('especialidad', 'Barbero') 
+
+    # Validar existencia
+    if Usuario.query.filter_by(email=email).first():
+        flash("El correo ya existe", "error")
+        return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+    try:
+        # 1. Crear Usuario (Acceso)
+        nuevo_u = Usuario(
+            nombre=nombre, 
+            email=email, 
+            password=hashear_password(password), 
+            rol='empleado'
+        )
+        db.session.add(nuevo_u)
+        db.session.flush() # flush() obtiene el ID sin cerrar la transacción
+
+        # 2. Crear Empleado (Perfil)
+        nuevo_e = Empleado(
+            nombre=nombre, 
+            especialidad=especialidad, 
+            comision_porcentaje=float(comision), 
+            usuario_id=nuevo_u.id,
+            sucursal_id=int(sucursal_id) if sucursal_id else None
+        )
+        db.session.add(nuevo_e)
+        db.session.commit()
+        flash("Empleado creado exitosamente", "exito")
+        
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error al crear: {str(e)}", "error")
+
+    return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+@bp.route('/admin/crear-gerente', methods=['POST'])
+@admin_required
+def crear_gerente():
+    nombre = request.form.get('nombre')
+    email = request.form.get('email').lower()
+    password = request.form.get('password')
+    sucursal_id = request.form.get('sucursal_id', type=int)
+
+    if not sucursal_id or not db.session.get(Sucursal, sucursal_id):
+        flash("Debes elegir una sede para el gerente.", "error")
+        return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+    if Usuario.query.filter_by(email=email).first():
+        flash("El correo ya existe", "error")
+        return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+    try:
+        db.session.add(Usuario(
+            nombre=nombre,
+            email=email,
+            password=hashear_password(password),
+            rol='gerente',
+            sucursal_id=sucursal_id,
+            confirmado=True
+        ))
+        db.session.commit()
+        flash("Gerente de sede creado exitosamente", "exito")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error al crear: {str(e)}", "error")
+
+    return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+@bp.route('/admin/eliminar-empleado/<int:id>')
+def eliminar_empleado(id):
+    emp = Empleado.query.get_or_404(id)
+    user = Usuario.query.get(emp.usuario_id)
+    db.session.delete(emp)
+    if user: db.session.delete(user)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        flash("No se puede eliminar: el empleado tiene turnos o registros asociados.", "error")
+        return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+    revocar_sesiones(emp.usuario_id)
+    flash("Empleado eliminado", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+@bp.route('/admin/revocar-sesiones/<int:usuario_id>', methods=['POST'])
+@admin_required
+def admin_revocar_sesiones(usuario_id):
+    usuario = Usuario.query.get_or_404(usuario_id)
+    revocar_sesiones(usuario.id)
+    flash(f"Sesiones de {usuario.nombre} cerradas.", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+@bp.route('/admin/eliminar-bloqueo/<int:id>', methods=['POST'])
+def admin_eliminar_bloqueo(id):
+    if session.get('rol') != 'admin':
+        return redirect(url_for('auth.login'))
+    
+    bloqueo = BloqueoDisponibilidad.query.get_or_404(id)
+    
+    try:
+        db.session.delete(bloqueo)
+        db.session.commit()
+        flash(f"Bloqueo de {bloqueo.empleado.nombre} eliminado.", "exito")
+    except Exception as e:
+        db.session.rollback()
+        flash("Error al eliminar el bloqueo.", "error")
+        
+    return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+@bp.route('/admin/editar-bloqueo/<int:id>')
+def editar_bloqueo_form(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    bloqueo = BloqueoDisponibilidad.query.get_or_404(id)
+    return render_template('admin_editar_bloqueo.html', b=bloqueo)
+
+@bp.route('/admin/actualizar-bloqueo/<int:id>', methods=['POST'])
+def actualizar_bloqueo(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    
+    b = BloqueoDisponibilidad.query.get_or_404(id)
+    b.fecha = request.form.get('fecha')
+    b.motivo = request.form.get('motivo')
+    
+    # Manejo de jornada completa
+    if 'dia_completo' in request.form:
+        b.dia_completo = True
+        b.hora_inicio = "00:00"
+        b.hora_fin = "23:59"
+    else:
+        b.dia_completo = False
+        b.hora_inicio = request.form.get('hora_inicio')
+        b.hora_fin = request.form.get('hora_fin')
+
+    db.session.commit()
+    flash("Bloqueo actualizado", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#usuarios')
+
+@bp.route('/admin/config-puntos', methods=['POST'])
+def config_puntos():
+    r_min = request.form.get('min') 
+    r_max = request.form.get('max')
+    pts = request.form.get('puntos')
+    
+    if r_min and r_max and pts:
+        # Usamos los nombres exactos de tu class ReglaPuntos
+        nueva_regla = ReglaPuntos(
+            rango_min=float(r_min), 
+            rango_max=float(r_max), 
+            puntos=int(pts)
+        )
+        db.session.add(nueva_regla)
+        db.session.commit()
+        flash("Regla de puntos guardada", "exito")
+    
+    return redirect(url_for('admin.admin_dashboard') + '#puntos')
+
+@bp.route('/admin/crear-premio', methods=['POST'])
+def crear_premio():
+    nombre = request.form.get('nombre')
+    costo = int(request.form.get('costo'))
+    nuevo = Premio(nombre=nombre, puntos_requeridos=costo)
+    db.session.add(nuevo)
+    db.session.commit()
+    flash("Premio creado exitosamente", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#puntos')
+
+@bp.route('/admin/canjear/<int:usuario_id>', methods=['POST'])
+def canjear_puntos(usuario_id):
+    if session.get('rol') not in ['admin', 'empleado']:
+        flash("Acceso denegado.", "error")
+        return redirect(url_for('auth.login'))
+    
+    usuario = Usuario.query.get_or_404(usuario_id)
+    puntos_premio = int(request.form.get('puntos'))
+    
+    # Buscamos el nombre del premio para el historial (opcional pero profesional)
+    premio = Premio.query.filter_by(puntos_requeridos=puntos_premio).first()
+    nombre_p = premio.nombre if premio else "Premio Especial"
+
+    if usuario.puntos_acumulados >= puntos_premio:
+        # 1. Restar puntos
+        usuario.puntos_acumulados -= puntos_premio
+        
+        # 2. Registrar en historial para evitar confusiones
+        nuevo_canje = HistorialCanje(
+            usuario_id=usuario.id,
+            premio_nombre=nombre_p,
+            puntos_usados=puntos_premio
+        )
+        
+        db.session.add(nuevo_canje)
+        db.session.commit()
+        flash(f"Canje exitoso. Cliente: {usuario.nombre}. Saldo: {usuario.puntos_acumulados} pts.", "exito")
+    else:
+        flash("El cliente no dispone de puntos suficientes para este premio.", "error")
+        
+    return redirect(url_for('admin.admin_dashboard') + '#puntos')
+
+@bp.route('/admin/buscar_cliente_json')
+def buscar_cliente_json():
+    if session.get('rol') not in ['admin', 'empleado']:
+        return jsonify([]), 403
+        
+    query = request.args.get('q', '')
+    if not query:
+        return jsonify([])
+
+    # Buscamos clientes que coincidan con el nombre o el email
+    clientes = Usuario.query.filter(
+        (Usuario.rol == 'cliente') & 
+        ((Usuario.nombre.ilike(f"%{query}%")) | (Usuario.email.ilike(f"%{query}%")))
+    ).all()
+    
+    return jsonify([{
+        'id': c.id, 
+        'nombre': c.nombre, 
+        'email': c.email, # Enviamos email en lugar de celular
+        'puntos': c.puntos_acumulados
+    } for c in clientes])
+
+@bp.route('/admin/metricas/limites')
+@admin_required
+def metricas_limites():
+    # Cuántas solicitudes fueron rechazadas por el limitador (por endpoint, todos los workers)
+    rechazados = limitador().rechazados()
+    return jsonify({
+        'rechazados': rechazados,
+        'total_rechazados': sum(rechazados.values())
+    })
+
+@bp.route('/admin/eliminar-regla/<int:id>')
+def eliminar_regla(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    regla = ReglaPuntos.query.get_or_404(id)
+    db.session.delete(regla)
+    db.session.commit()
+    flash("Regla eliminada", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#puntos')
+
+@bp.route('/admin/eliminar-premio/<int:id>')
+def eliminar_premio(id):
+    if session.get('rol') != 'admin': return redirect(url_for('auth.login'))
+    premio = Premio.query.get_or_404(id)
+    db.session.delete(premio)
+    db.session.commit()
+    flash("Premio eliminado", "exito")
+    return redirect(url_for('admin.admin_dashboard') + '#puntos')
@@ -0,0 +1,283 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from barberia.extensiones import db
+from barberia.modelos import (Turno, Servicio, Producto, BloqueoDisponibilidad, TurnoAdicional, Venta,
+                              ReglaPuntos, Usuario, Empleado, SerieTurno, TURNO_INACTIVO)
+from barberia.eventos import publicar_turno, estado_previo
+from barberia.disponibilidad import intervalos_ocupados
+
+# Lógica de reservas compartida por las vistas Flask, la API JSON y el servidor ASGI (barberia/asgi.py).
+# Los errores de validación se lanzan como ValueError con el mensaje para el cliente.
+# completar, reemplazar_adicionales y crear_bloqueo no hacen commit: la vista
+# decide la transacción (la API por lotes aplica varios cambios en una sola).
+
+
+def duracion_turno(turno):
+    return turno.servicio.duracion_minutos if (turno.servicio and turno.servicio.duracion_minutos) else 30
+
+
+def hueco_de(turno):
+    """(barbero, inicio, fin) del horario que ocupa `turno`; se toma antes de cancelarlo o moverlo."""
+    return turno.empleado_id, turno.fecha_hora, turno.fecha_hora + timedelta(minutes=duracion_turno(turno))
+
+
+def llenar_hueco(hueco):
+    # Importación diferida: lista_espera usa reservar_turno de este módulo
+    from barberia.lista_espera import llenar_hueco as ofrecer_a_lista_espera
+    return ofrecer_a_lista_espera(*hueco)
+
+
+def turnos_del_dia(barbero_id, dia, excluir_id=None):
+    # Rango [dia, dia+1) en lugar de date(fecha_hora) para usar ix_turno_empleado_fecha
+    inicio = datetime.combine(dia, datetime.min.time())
+    query = Turno.query.options(joinedload(Turno.servicio)).filter(
+        Turno.empleado_id == barbero_id,
+        Turno.estado.notin_(TURNO_INACTIVO),
+        Turno.fecha_hora >= inicio,
+        Turno.fecha_hora < inicio + timedelta(days=1)
+    )
+    if excluir_id:
+        query = query.filter(Turno.id != excluir_id)
+    return query.all()
+
+
+def horarios_ocupados(barbero_id, fecha_str, excluir_id=None):
+    fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+
+    # 1. Turnos ocupados por clientes
+    bloqueados = []
+    for t in turnos_del_dia(barbero_id, fecha_obj, excluir_id):
+        bloqueados.append({
+            'inicio': t.fecha_hora.strftime('%H:%M'),
+            'fin': (t.fecha_hora + timedelta(minutes=duracion_turno(t))).strftime('%H:%M')
+        })
+
+    # 2. Bloqueos manuales del barbero
+    for b in BloqueoDisponibilidad.query.filter_by(empleado_id=barbero_id, fecha=fecha_str).all():
+        if b.dia_completo:
+            bloqueados.append({'inicio': '00:00', 'fin': '23:59'})
+        else:
+            bloqueados.append({'inicio': b.hora_inicio, 'fin': b.hora_fin})
+    return bloqueados
+
+
+def reservar_turno(cliente_id, nombre_cliente, barbero_id, servicio_id, fecha_dia, hora_slot, turno_id=None):
+    """Crea un turno o reprograma `turno_id` (del mismo cliente). Devuelve (turno, mensaje)."""
+    if not all([barbero_id, servicio_id, fecha_dia, hora_slot]):
+        raise ValueError("Faltan datos para completar la reserva.")
+    try:
+        fecha_dt = datetime.strptime(f"{fecha_dia} {hora_slot}", '%Y-%m-%d %H:%M')
+        barbero_id, servicio_id = int(barbero_id), int(servicio_id)
+        turno_id = int(turno_id) if turno_id else None
+    except (ValueError, TypeError):
+        raise ValueError("Fecha, hora o datos de la reserva inválidos.")
+
+    servicio = db.session.get(Servicio, servicio_id)
+    if servicio is None:
+        raise ValueError("El servicio no existe.")
+    if db.session.get(Empleado, barbero_id) is None:
+        raise ValueError("El barbero no existe.")
+
+    # No permitir fechas pasadas
+    if fecha_dt < datetime.now():
+        raise ValueError("No puedes agendar en una fecha u hora que ya pasó.")
+
+    # Evitar solapamientos con los turnos activos del barbero ese día
+    fin_solicitado = fecha_dt + timedelta(minutes=servicio.duracion_minutos or 30)
+    for t in turnos_del_dia(barbero_id, fecha_dt.date(), excluir_id=turno_id):
+        fin_t = t.fecha_hora + timedelta(minutes=duracion_turno(t))
+        if fecha_dt < fin_t and fin_solicitado > t.fecha_hora:
+            raise ValueError(f"El barbero ya tiene una cita de {t.fecha_hora.strftime('%H:%M')} a {fin_t.strftime('%H:%M')}.")
+
+    if turno_id:
+        turno = db.session.get(Turno, turno_id)
+        if turno is None or turno.cliente_id != cliente_id:
+            raise ValueError("El turno a reprogramar no existe.")
+        antes = estado_previo(turno)
+        hueco = hueco_de(turno) if turno.estado == 'pendiente' else None
+        turno.fecha_hora = fecha_dt
+        turno.empleado_id = barbero_id
+        turno.servicio_id = servicio_id
+        turno.estado = 'pendiente'
+        mensaje = "Turno reprogramado exitosamente."
+    else:
+        antes = hueco = None
+        turno = Turno(
+            nombre_cliente=nombre_cliente,
+            fecha_hora=fecha_dt,
+            cliente_id=cliente_id,
+            empleado_id=barbero_id,
+            servicio_id=servicio_id,
+            estado='pendiente'
+        )
+        db.session.add(turno)
+        mensaje = "Turno agendado correctamente."
+
+    db.session.commit()
+    publicar_turno('reprogramado' if turno_id else 'creado', turno, antes)
+    if hueco:
+        llenar_hueco(hueco)
+    return turno, mensaje
+
+
+def reservar_serie(cliente_id, nombre_cliente, barbero_id, servicio_id, fecha_dia, hora_slot, cada_dias, repeticiones,
+                   cada_semanas=None):
+    """Agenda `repeticiones` turnos cada `cada_dias` días (o `cada_semanas`, como en el formulario)
+    desde la fecha y hora dadas.
+
+    Los turnos y bloqueos de todo el periodo se leen en una sola consulta por rango; los que
+    chocan se informan uno por uno y el resto se guarda en una sola transacción.
+    Devuelve (serie o None si ninguno entró, turnos, conflictos [{'fecha', 'hora', 'motivo'}])."""
+    if cada_semanas:
+        try:
+            cada_dias = int(cada_semanas) * 7
+        except (ValueError, TypeError):
+            raise ValueError("La frecuencia de la serie no es válida.")
+    if not all([barbero_id, servicio_id, fecha_dia, hora_slot, cada_dias, repeticiones]):
+        raise ValueError("Faltan datos para completar la reserva.")
+    try:
+        primera = datetime.strptime(f"{fecha_dia} {hora_slot}", '%Y-%m-%d %H:%M')
+        barbero_id, servicio_id = int(barbero_id), int(servicio_id)
+        cada_dias, repeticiones = int(cada_dias), int(repeticiones)
+    except (ValueError, TypeError):
+        raise ValueError("Fecha, hora o datos de la reserva inválidos.")
+    if not 2 <= repeticiones <= current_app.config['SERIE_MAX_TURNOS']:
+        raise ValueError(f"Una serie tiene entre 2 y {current_app.config['SERIE_MAX_TURNOS']} turnos.")
+    if not 1 <= cada_dias <= current_app.config['SERIE_MAX_CADA_DIAS']:
+        raise ValueError(f"La frecuencia debe ser de 1 a {current_app.config['SERIE_MAX_CADA_DIAS']} días.")
+
+    servicio = db.session.get(Servicio, servicio_id)
+    if servicio is None:
+        raise ValueError("El servicio no existe.")
+    if db.session.get(Empleado, barbero_id) is None:
+        raise ValueError("El barbero no existe.")
+    if primera < datetime.now():
+        raise ValueError("No puedes agendar en una fecha u hora que ya pasó.")
+
+    duracion = timedelta(minutes=servicio.duracion_minutos or 30)
+    fechas = [primera + timedelta(days=cada_dias * i) for i in range(repeticiones)]
+    horizonte = (primera.replace(hour=0, minute=0), fechas[-1].replace(hour=0, minute=0) + timedelta(days=1))
+    ocupados = intervalos_ocupados([barbero_id], *horizonte)[barbero_id]
+
+    libres, conflictos = [], []
+    for fecha in fechas:
+        fin = fecha + duracion
+        choque = next(((ini, f) for ini, f in ocupados if ini < fin and f > fecha), None)
+        if choque:
+            if choque[1] - choque[0] >= timedelta(days=1):
+                motivo = "El barbero no atiende ese día."
+            else:
+                motivo = f"El barbero no está disponible de {choque[0].strftime('%H:%M')} a {choque[1].strftime('%H:%M')}."
+            conflictos.append({'fecha': fecha.strftime('%Y-%m-%d'), 'hora': fecha.strftime('%H:%M'), 'motivo': motivo})
+        else:
+            libres.append(fecha)
+    if not libres:
+        return None, [], conflictos
+
+    serie = SerieTurno(cliente_id=cliente_id, empleado_id=barbero_id, servicio_id=servicio_id,
+                       inicio=primera, cada_dias=cada_dias, repeticiones=repeticiones)
+    turnos = [Turno(nombre_cliente=nombre_cliente, fecha_hora=fecha, cliente_id=cliente_id, empleado_id=barbero_id,
+                    servicio_id=servicio_id, estado='pendiente', serie=serie) for fecha in libres]
+    db.session.add(serie)
+    db.session.add_all(turnos)
+    db.session.commit()
+    for turno in turnos:
+        publicar_turno('creado', turno)
+    return serie, turnos, conflictos
+
+
+def al_alcance(turno, usuario_id, rol, sucursal_id=None):
+    # Mismo alcance que api_v1.visibles, sin depender de la sesión de Flask (la usa también asgi.py):
+    # el cliente sus citas, el barbero su agenda, el gerente su sede, el admin todo
+    if rol == 'admin':
+        return True
+    if rol == 'cliente':
+        return turno.cliente_id == usuario_id
+    if rol == 'empleado':
+        return turno.barbero is not None and turno.barbero.usuario_id == usuario_id
+    if rol == 'gerente':
+        return bool(sucursal_id) and turno.barbero is not None and turno.barbero.sucursal_id == sucursal_id
+    return False
+
+
+def cancelar_turno_de(turno_id, usuario_id, rol, sucursal_id=None):
+    # Fuera del alcance del rol se responde igual que si no existiera
+    turno = db.session.get(Turno, turno_id)
+    if turno is None or not al_alcance(turno, usuario_id, rol, sucursal_id):
+        raise LookupError("Turno no encontrado.")
+    antes = estado_previo(turno)
+    turno.estado = 'cancelado'
+    db.session.commit()
+    publicar_turno('cancelado', turno, antes)
+    if antes['estado'] == 'pendiente':
+        llenar_hueco(hueco_de(turno))
+    return turno
+
+
+def completar(turno, producto_id=None):
+    """Marca el turno como completado (con un producto vendido opcional). Devuelve los puntos ganados."""
+    if producto_id:
+        prod = db.session.get(Producto, int(producto_id))
+        if prod and prod.stock > 0:
+            prod.stock -= 1
+            # Registro para el total del turno y en Venta para la contabilidad
+            db.session.add(TurnoAdicional(turno_id=turno.id, tipo='producto', item_id=prod.id,
+                                          nombre=prod.nombre, precio=prod.precio))
+            db.session.add(Venta(turno_id=turno.id, producto_id=prod.id, cantidad=1))
+
+    turno.estado = 'completado'
+
+    # Puntos automáticos según el monto del turno
+    monto_total = turno.total_pagado
+    regla = ReglaPuntos.query.filter(
+        ReglaPuntos.rango_min <= monto_total,
+        ReglaPuntos.rango_max >= monto_total
+    ).first()
+    if regla:
+        cliente = db.session.get(Usuario, turno.cliente_id)
+        if cliente:
+            cliente.puntos_acumulados += regla.puntos
+            return regla.puntos
+    return 0
+
+
+def reemplazar_adicionales(turno, extras):
+    """Sustituye los adicionales del turno por `extras` ([{'tipo', 'id'}]). Devuelve el nuevo total."""
+    TurnoAdicional.query.filter_by(turno_id=turno.id).delete()
+    monto_acumulado = float(turno.servicio.precio if turno.servicio else 0)
+
+    for item in extras:
+        modelo = Servicio if item.get('tipo') == 'servicio' else Producto
+        obj = db.session.get(modelo, item.get('id'))
+        if obj:
+            db.session.add(TurnoAdicional(turno_id=turno.id, tipo=item['tipo'], item_id=obj.id,
+                                          nombre=obj.nombre, precio=obj.precio))
+            monto_acumulado += float(obj.precio)
+
+    turno.monto_total = monto_acumulado
+    return monto_acumulado
+
+
+def crear_bloqueo(empleado_id, fecha, hora_inicio=None, hora_fin=None, dia_completo=False, motivo=None):
+    if not fecha:
+        raise ValueError("Debes seleccionar una fecha obligatoriamente.")
+    try:
+        datetime.strptime(fecha, '%Y-%m-%d')
+        if not dia_completo:
+            inicio, fin = datetime.strptime(hora_inicio, '%H:%M'), datetime.strptime(hora_fin, '%H:%M')
+    except (TypeError, ValueError):
+        raise ValueError("Fecha u horas del bloqueo inválidas.")
+    if not dia_completo and inicio >= fin:
+        raise ValueError("La hora de inicio debe ser anterior a la de fin.")
+
+    bloqueo = BloqueoDisponibilidad(
+        empleado_id=empleado_id,
+        fecha=fecha,
+        hora_inicio="00:00" if dia_completo else hora_inicio,
+        hora_fin="23:59" if dia_completo else hora_fin,
+        dia_completo=bool(dia_completo),
+        motivo=motivo
+    )
+    db.session.add(bloqueo)
+    return bloqueo
@@ -0,0 +1,287 @@
+from datetime import timedelta
+import numpy as np
+from barberia.extensiones import db
+from barberia.modelos import Turno, Servicio, Empleado, TurnoAdicional, BloqueoDisponibilidad
+
+# Analítica de ingresos y ocupación sobre columnas de NumPy.
+# Una consulta por tabla (turnos con su servicio y barbero; adicionales) y el
+# resto son operaciones vectorizadas: bincount por barbero, hora o servicio en
+# lugar de recorrer los turnos en Python con consultas por fila.
+
+COMISION_POR_DEFECTO = 70.0
+ESTADOS = ('pendiente', 'completado', 'cancelado', 'inasistencia')  # código = posición
+
+
+def _minuto_epoch(columna, dialecto):
+    # Minutos desde 1970 calculados en la BD: llegan como enteros y pasan a datetime64 sin parsear texto
+    if dialecto == 'sqlite':
+        return db.cast(db.func.strftime('%s', columna), db.Integer) // 60
+    return db.cast(db.func.extract('epoch', columna), db.BigInteger) // 60
+
+
+def _matriz(conn, consulta, columnas):
+    # Todas las columnas son numéricas: se leen del cursor sin construir filas del ORM
+    resultado = conn.execute(consulta)
+    filas = resultado.cursor.fetchall()
+    resultado.close()
+    return np.array(filas, dtype=np.float64).reshape(-1, columnas)
+
+
+def _tabla_por_id(matriz, columna, defecto):
+    # Búsqueda densa: valores[id] en lugar de un join por fila
+    valores = np.full(int(matriz[:, 0].max()) + 1 if len(matriz) else 1, defecto, dtype=np.float64)
+    valores[matriz[:, 0].astype(np.int64)] = np.where(np.isnan(matriz[:, columna]), defecto, matriz[:, columna])
+    return valores
+
+
+def datos_turnos(inicio, fin=None, sucursal_id=None, barbero_id=None):
+    """Turnos de [inicio, fin) como diccionario de arrays alineados por posición (orden por id).
+
+    Incluye los turnos movidos al archivo histórico (barberia.archivo)."""
+    filtro = [Turno.fecha_hora >= inicio]
+    empleados = db.select(Empleado.id)
+    if fin is not None:
+        filtro.append(Turno.fecha_hora < fin)
+    if barbero_id:
+        filtro.append(Turno.empleado_id == barbero_id)
+        empleados = empleados.where(Empleado.id == barbero_id)
+    if sucursal_id:
+        filtro.append(Turno.empleado_id.in_(db.select(Empleado.id).where(Empleado.sucursal_id == sucursal_id)))
+        empleados = empleados.where(Empleado.sucursal_id == sucursal_id)
+    d = columnas_turnos(filtro)
+
+    # Importación diferida: archivo usa columnas_turnos de este módulo
+    from barberia import archivo
+    filtra_empleado = bool(barbero_id or sucursal_id)
+    archivados = archivo.leer(inicio, fin, db.session.scalars(empleados).all() if filtra_empleado else None)
+    if archivados is not None:
+        # Si un lote quedó a medio borrar, la fila viva manda y la archivada se descarta
+        archivados = {c: v[np.isin(archivados['id'], d['id'], invert=True)] for c, v in archivados.items()}
+        orden = np.argsort(np.concatenate((archivados['id'], d['id'])), kind='stable')
+        d = {c: np.concatenate((archivados[c], d[c]))[orden] for c in d}
+
+    d['estado'] = np.array(ESTADOS + ('',))[d['estado']]
+    # Los productos no son comisionables (igual que en la liquidación)
+    d['ingreso_servicios'] = d['precio'] + d['extras_servicio']
+    d['ingreso'] = d['ingreso_servicios'] + d['extras_producto']
+    d['pago_barbero'] = d['ingreso_servicios'] * d['comision'] / 100
+    return d
+
+
+def columnas_turnos(filtro):
+    """Columnas base de los turnos de la tabla viva que cumplen `filtro`, con el estado como código
+    (posición en ESTADOS, -1 si es desconocido) y sin las columnas derivadas de ingreso."""
+    conn = db.session.connection()
+    estado = db.case({e: i for i, e in enumerate(ESTADOS)}, value=Turno.estado, else_=-1)
+    turnos = _matriz(conn, db.select(
+        Turno.id, Turno.empleado_id, db.func.coalesce(Turno.servicio_id, 0), estado,
+        _minuto_epoch(Turno.fecha_hora, conn.dialect.name)
+    ).where(*filtro).order_by(Turno.id), 5).astype(np.int64)
+
+    # Tablas chicas (servicios, barberos) enteras; los adicionales con el mismo filtro que los turnos
+    servicios = _matriz(conn, db.select(Servicio.id, Servicio.precio, Servicio.duracion_minutos), 3)
+    barberos = _matriz(conn, db.select(Empleado.id, Empleado.comision_porcentaje), 2)
+    adicionales = _matriz(conn, db.select(
+        TurnoAdicional.turno_id, db.case((TurnoAdicional.tipo == 'producto', 1), else_=0),
+        db.func.coalesce(TurnoAdicional.precio, 0)
+    ).join(Turno, TurnoAdicional.turno_id == Turno.id).where(*filtro), 3)
+
+    servicio_id = turnos[:, 2]
+    empleado_id = turnos[:, 1]
+    precio = np.append(_tabla_por_id(servicios, 1, 0.0), 0.0)
+    duracion = np.append(_tabla_por_id(servicios, 2, 30.0), 30.0)
+    comision = np.append(_tabla_por_id(barberos, 1, COMISION_POR_DEFECTO), COMISION_POR_DEFECTO)
+    # Un servicio o barbero borrado apunta fuera de la tabla: cae en la última posición
+    # (precio 0, comisión por defecto) en lugar de tomar el valor de otro
+    servicio_idx = np.where(servicio_id < len(precio) - 1, servicio_id, len(precio) - 1)
+    empleado_idx = np.where(empleado_id < len(comision) - 1, empleado_id, len(comision) - 1)
+
+    d = {
+        'id': turnos[:, 0],
+        'empleado_id': empleado_id,
+        'servicio_id': servicio_id,  # 0 = sin servicio
+        'estado': turnos[:, 3],
+        'fecha': turnos[:, 4].astype('datetime64[m]'),
+        'precio': precio[servicio_idx],
+        'duracion': duracion[servicio_idx],
+        'comision': comision[empleado_idx],
+    }
+
+    # Adicionales sumados por turno con bincount (posición del turno vía searchsorted sobre ids ordenados)
+    n = len(d['id'])
+    pos = np.searchsorted(d['id'], adicionales[:, 0].astype(np.int64))
+    es_producto = adicionales[:, 1] == 1
+    d['extras_servicio'] = np.bincount(pos[~es_producto], weights=adicionales[~es_producto, 2], minlength=n)
+    d['extras_producto'] = np.bincount(pos[es_producto], weights=adicionales[es_producto, 2], minlength=n)
+    return d
+
+
+def hora_del_dia(fechas):
+    return (fechas - fechas.astype('datetime64[D]')).astype('timedelta64[h]').astype(np.int64)
+
+
+def dia_semana(fechas):
+    # 0 = lunes; el 1970-01-01 (día 0 de datetime64) fue jueves
+    return (fechas.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+
+def _tasa(parte, total):
+    return np.divide(parte, total, out=np.zeros(len(total)), where=total > 0)
+
+
+def resumen(d, dias, horas_abiertas):
+    """Indicadores del periodo. `dias` y `horas_abiertas` dan el tiempo disponible por barbero."""
+    completado = d['estado'] == 'completado'
+    inasistencia = d['estado'] == 'inasistencia'
+    ingreso = np.where(completado, d['ingreso'], 0.0)
+    fechas = d['fecha'][completado]
+    total_completados = int(completado.sum())
+
+    # Por barbero: un índice compacto por empleado y todas las sumas con bincount
+    empleados, idx = np.unique(d['empleado_id'], return_inverse=True)
+    completados = np.bincount(idx, weights=completado, minlength=len(empleados))
+    inasistencias = np.bincount(idx, weights=inasistencia, minlength=len(empleados))
+    ingresos = np.bincount(idx, weights=ingreso, minlength=len(empleados))
+    minutos = np.bincount(idx, weights=np.where(completado, d['duracion'], 0.0), minlength=len(empleados))
+    disponibles = dias * horas_abiertas * 60
+    utilizacion = minutos / disponibles if disponibles else np.zeros(len(empleados))
+    tasa_inasistencia = _tasa(inasistencias, completados + inasistencias)
+    ticket = _tasa(ingresos, completados)
+
+    servicios, idx_s = np.unique(d['servicio_id'][completado], return_inverse=True)
+    por_servicio = np.bincount(idx_s, weights=ingreso[completado], minlength=len(servicios))
+    turnos_servicio = np.bincount(idx_s, minlength=len(servicios))
+
+    dias_cal, idx_f = np.unique(fechas.astype('datetime64[D]'), return_inverse=True)
+    por_fecha = np.bincount(idx_f, weights=ingreso[completado], minlength=len(dias_cal))
+
+    base_inasistencia = total_completados + int(inasistencia.sum())
+    return {
+        'turnos_completados': total_completados,
+        'ingresos_total': round(float(ingreso.sum()), 2),
+        'ticket_promedio': round(float(ingreso.sum()) / total_completados, 2) if total_completados else 0,
+        'tasa_inasistencia': round(float(inasistencia.sum()) / base_inasistencia, 4) if base_inasistencia else 0,
+        'por_hora': np.round(np.bincount(hora_del_dia(fechas), weights=ingreso[completado], minlength=24), 2).tolist(),
+        'por_dia_semana': np.round(np.bincount(dia_semana(fechas), weights=ingreso[completado], minlength=7), 2).tolist(),
+        'por_fecha': [{'fecha': str(f), 'ingresos': round(float(v), 2)} for f, v in zip(dias_cal, por_fecha)],
+        'por_servicio': [{'servicio_id': int(s), 'turnos': int(c), 'ingresos': round(float(v), 2)}
+                         for s, c, v in zip(servicios, turnos_servicio, por_servicio)],
+        'por_barbero': [{
+            'empleado_id': int(e),
+            'turnos_completados': int(c),
+            'ingresos': round(float(i), 2),
+            'ticket_promedio': round(float(t), 2),
+            'utilizacion': round(float(u), 4),
+            'tasa_inasistencia': round(float(r), 4)
+        } for e, c, i, t, u, r in zip(empleados, completados, ingresos, ticket, utilizacion, tasa_inasistencia)]
+    }
+
+
+def completados_df(d):
+    """DataFrame de los turnos completados con sus importes, para los reportes en Excel."""
+    import pandas as pd  # pesado: solo se carga en el proceso que sirve reportes
+    completado = d['estado'] == 'completado'
+    return pd.DataFrame({
+        'fecha': d['fecha'][completado],
+        'empleado_id': d['empleado_id'][completado],
+        'servicios': d['ingreso_servicios'][completado],
+        'productos': d['extras_producto'][completado],
+        'pago_barbero': d['pago_barbero'][completado],
+    })
+
+
+# --- OCUPACIÓN POR FRANJAS ---
+FRANJA_MINUTOS = 15
+
+
+def minutos_cubiertos(inicios, fines, bordes):
+    """Minutos de los intervalos [inicio, fin) anteriores a cada borde.
+
+    Barrido sobre inicios y fines ordenados: cubierto(t) = Σ(t - s, s < t) - Σ(t - e, e < t),
+    resuelto con búsquedas binarias y sumas acumuladas en lugar de recorrer franja por franja."""
+    inicios, fines = np.sort(inicios), np.sort(fines)
+    suma_i = np.concatenate(([0], np.cumsum(inicios)))
+    suma_f = np.concatenate(([0], np.cumsum(fines)))
+    ki = np.searchsorted(inicios, bordes)
+    kf = np.searchsorted(fines, bordes)
+    return bordes * (ki - kf) - (suma_i[ki] - suma_f[kf])
+
+
+def fusionar_intervalos(inicios, fines):
+    """Une los intervalos [inicio, fin) que se solapan o se tocan; devuelve (inicios, fines) disjuntos.
+
+    Ordenados por inicio, un intervalo abre grupo nuevo si empieza después del mayor fin anterior."""
+    orden = np.argsort(inicios, kind='stable')
+    inicios, fines = inicios[orden], fines[orden]
+    fin_previo = np.maximum.accumulate(fines)
+    nuevo = np.concatenate(([True], inicios[1:] > fin_previo[:-1]))
+    grupos = np.flatnonzero(nuevo)
+    return inicios[grupos], np.maximum.reduceat(fines, grupos)
+
+
+def _por_franja(inicios, fines, bordes):
+    # bordes (..., franjas + 1) -> minutos cubiertos dentro de cada franja (..., franjas)
+    cubiertos = minutos_cubiertos(inicios, fines, bordes.ravel()).reshape(bordes.shape)
+    return np.diff(cubiertos, axis=-1)
+
+
+def _minuto_del_dia(hora, defecto):
+    try:
+        return int(hora[:2]) * 60 + int(hora[3:5])
+    except (TypeError, ValueError):
+        return defecto
+
+
+def ocupacion(inicio, dias, barberos, apertura, cierre):
+    """Minutos reservados y disponibles por barbero, día y franja de FRANJA_MINUTOS.
+
+    `inicio` es la medianoche del primer día y `barberos` los ids a medir. Devuelve
+    (reservados, disponibles) con forma (barberos, dias, franjas). Cada barbero tiene su
+    propia línea de tiempo desplazada en `dias` días, así un solo barrido sirve para todos."""
+    barberos = np.sort(np.asarray(barberos, dtype=np.int64))
+    largo = dias * 1440
+    franjas = (cierre - apertura) * 60 // FRANJA_MINUTOS
+    bordes = (np.arange(len(barberos))[:, None, None] * largo
+              + np.arange(dias)[None, :, None] * 1440
+              + apertura * 60 + np.arange(franjas + 1)[None, None, :] * FRANJA_MINUTOS)
+
+    # Reservas activas (pendientes o completadas) como intervalos [inicio, inicio + duración)
+    d = datos_turnos(inicio, inicio + timedelta(days=dias))
+    activo = np.isin(d['estado'], ('pendiente', 'completado')) & np.isin(d['empleado_id'], barberos)
+    desplazamiento = np.searchsorted(barberos, d['empleado_id'][activo]) * largo
+    inicios = desplazamiento + (d['fecha'][activo] - np.datetime64(inicio, 'm')).astype(np.int64)
+    reservados = _por_franja(inicios, inicios + d['duracion'][activo], bordes)
+
+    # Bloqueos del barbero: restan tiempo disponible. Se fusionan antes del barrido para que
+    # los minutos compartidos por bloqueos solapados no se descuenten dos veces
+    bloqueos = db.session.execute(
+        db.select(BloqueoDisponibilidad.empleado_id, BloqueoDisponibilidad.fecha, BloqueoDisponibilidad.hora_inicio,
+                  BloqueoDisponibilidad.hora_fin, BloqueoDisponibilidad.dia_completo)
+        .where(BloqueoDisponibilidad.empleado_id.in_(barberos.tolist()),
+               BloqueoDisponibilidad.fecha >= inicio.strftime('%Y-%m-%d'),
+               BloqueoDisponibilidad.fecha < (inicio + timedelta(days=dias)).strftime('%Y-%m-%d'))
+    ).all()
+    bloqueado = np.zeros(reservados.shape)
+    if bloqueos:
+        empleado, fecha, hora_inicio, hora_fin, completo = zip(*bloqueos)
+        dia = (np.array(fecha, dtype='datetime64[D]') - np.datetime64(inicio.date())).astype(np.int64)
+        base = np.searchsorted(barberos, np.array(empleado, dtype=np.int64)) * largo + dia * 1440
+        desde = np.array([0 if c else _minuto_del_dia(h, 0) for h, c in zip(hora_inicio, completo)])
+        hasta = np.array([1440 if c else _minuto_del_dia(h, 1440) for h, c in zip(hora_fin, completo)])
+        inicios_b, fines_b = fusionar_intervalos(base + desde, base + np.maximum(hasta, desde))
+        bloqueado = _por_franja(inicios_b, fines_b, bordes)
+
+    return reservados, FRANJA_MINUTOS - bloqueado
+
+
+def por_dia_semana(matriz, inicio):
+    """Suma una matriz (dias, franjas) por día de la semana -> (7, franjas), lunes primero."""
+    dias = np.datetime64(inicio.date()) + np.arange(matriz.shape[0])
+    semana = np.zeros((7, matriz.shape[1]))
+    np.add.at(semana, dia_semana(dias), matriz)
+    return semana
+
+
+def proporcion(parte, total):
+    parte, total = np.broadcast_arrays(np.asarray(parte, dtype=float), np.asarray(total, dtype=float))
+    return np.divide(parte, total, out=np.zeros(total.shape), where=total > 0)
@@ -0,0 +1,96 @@
+import logging
+from flask import Blueprint, request, session, jsonify, current_app
+from barberia.extensiones import db
+from barberia.utilidades import pagina_turnos_cliente, lectura_replica, json_condicional
+from barberia.agenda import horarios_ocupados, reservar_turno, cancelar_turno_de
+from barberia.disponibilidad import proximos_horarios
+
+log = logging.getLogger(__name__)
+
+bp = Blueprint('api', __name__)
+
+@bp.route('/api/mis-turnos')
+def api_mis_turnos():
+    if 'usuario_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+
+    try:
+        turnos, siguiente = pagina_turnos_cliente(session['usuario_id'],
+                                                  cursor=request.args.get('cursor'),
+                                                  limite=current_app.config['AGENDAR_PAGINA'])
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
+
+    return jsonify({
+        "turnos": [{
+            "id": t.id,
+            "fecha": t.fecha_hora.strftime('%d/%m/%Y - %H:%M'),
+            "servicio": t.servicio.nombre if t.servicio else "",
+            "barbero": t.barbero.nombre if t.barbero else "",
+            "estado": t.estado
+        } for t in turnos],
+        "siguiente": siguiente
+    })
+
+
+@bp.route('/api/disponibilidad')
+@lectura_replica
+def consultar_disponibilidad():
+    barbero_id = request.args.get('barbero_id')
+    fecha_str = request.args.get('fecha')
+    edit_id = request.args.get('edit_id')
+    
+    if not barbero_id or not fecha_str:
+        return jsonify([])
+
+    try:
+        excluir = int(edit_id) if edit_id and edit_id != 'None' else None
+    except ValueError:
+        return jsonify({"error": "edit_id inválido"}), 400
+
+    try:
+        return json_condicional(horarios_ocupados(barbero_id, fecha_str, excluir))
+    except Exception:
+        log.exception("Error en API disponibilidad", extra={'barbero_id': barbero_id, 'fecha': fecha_str})
+        return jsonify([]), 500
+
+@bp.route('/api/proximos-horarios')
+@lectura_replica
+def api_proximos_horarios():
+    # ?servicio_id=1&cantidad=5[&sucursal_id=&barbero_id=&hora_desde=HH:MM&hora_hasta=HH:MM&fecha=YYYY-MM-DD]
+    a = request.args
+    try:
+        horarios = proximos_horarios(a.get('servicio_id'), a.get('cantidad'), sucursal_id=a.get('sucursal_id'),
+                                     barbero_id=a.get('barbero_id'), hora_desde=a.get('hora_desde'),
+                                     hora_hasta=a.get('hora_hasta'), fecha_desde=a.get('fecha'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(horarios)
+
+# Mismas rutas que sirve barberia/asgi.py; aquí quedan para despliegues solo WSGI.
+
+@bp.route('/api/reservas', methods=['POST'])
+@bp.route('/api/reservas/<int:turno_id>', methods=['PUT'])
+def api_reservar(turno_id=None):
+    if 'usuario_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+
+    datos = request.get_json(silent=True) or {}
+    try:
+        turno, mensaje = reservar_turno(session['usuario_id'], session['nombre'], datos.get('barbero_id'),
+                                        datos.get('servicio_id'), datos.get('fecha'), datos.get('hora'),
+                                        turno_id=turno_id)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"id": turno.id, "mensaje": mensaje}), 200 if turno_id else 201
+
+@bp.route('/api/reservas/<int:turno_id>/cancelar', methods=['POST'])
+def api_cancelar(turno_id):
+    if 'usuario_id' not in session:
+        return jsonify({"error": "No autenticado"}), 401
+    try:
+        turno = cancelar_turno_de(turno_id, session['usuario_id'], session.get('rol'), session.get('sucursal_id'))
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify({"id": turno.id, "estado": turno.estado})
@@ -0,0 +1,310 @@
+import logging
+from datetime import datetime, timedelta
+from flask import Blueprint, request, session, jsonify, current_app
+from barberia.extensiones import db
+from barberia.modelos import Turno, Usuario, Empleado, Premio, HistorialCanje, BloqueoDisponibilidad, TurnoAdicional
+from barberia.utilidades import (paginar_por_cursor, filtrar_por_barbero, sucursal_de_sesion, perfil_empleado,
+                                 lectura_replica, api_rol_required, json_condicional)
+from barberia.agenda import reservar_turno, reservar_serie, completar, reemplazar_adicionales, crear_bloqueo, hueco_de, llenar_hueco
+from barberia.eventos import publicar_turno, estado_previo
+
+log = logging.getLogger(__name__)
+
+# API JSON versionada (/api/v1) para clientes móviles y de caja.
+# Devuelve solo ids y estados; los lotes van en una sola transacción:
+# si un elemento no es válido no se guarda ninguno.
+bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+PERSONAL = ('empleado', 'gerente', 'admin')
+
+
+def turno_json(t):
+    return {
+        'id': t.id,
+        'estado': t.estado,
+        'fecha_hora': t.fecha_hora.strftime('%Y-%m-%dT%H:%M'),
+        'empleado_id': t.empleado_id,
+        'servicio_id': t.servicio_id,
+        'cliente_id': t.cliente_id,
+        'serie_id': t.serie_id,
+        'total': t.total_pagado
+    }
+
+
+def bloqueo_json(b):
+    return {'id': b.id, 'empleado_id': b.empleado_id, 'fecha': b.fecha, 'hora_inicio': b.hora_inicio,
+            'hora_fin': b.hora_fin, 'dia_completo': b.dia_completo}
+
+
+def empleado_de_sesion():
+    empleado = perfil_empleado()
+    return empleado['id'] if empleado else -1
+
+
+def visibles(modelo):
+    # Turnos o bloqueos al alcance del rol: el cliente sus citas, el barbero su agenda, el gerente su sede
+    query = modelo.query
+    rol = session.get('rol')
+    if rol == 'cliente':
+        return query.filter(modelo.cliente_id == session['usuario_id'])
+    if rol == 'empleado':
+        return query.filter(modelo.empleado_id == empleado_de_sesion())
+    return filtrar_por_barbero(query, modelo, sucursal_de_sesion())
+
+
+def leer_ids(datos):
+    ids = datos.get('ids') if isinstance(datos, dict) else None
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        raise ValueError("Se espera 'ids': lista de enteros.")
+    if len(ids) > current_app.config['API_LOTE_MAX']:
+        raise ValueError(f"Máximo {current_app.config['API_LOTE_MAX']} elementos por lote.")
+    return list(dict.fromkeys(ids))
+
+
+def cambiar_estado(ids, accion, productos=None):
+    """Completa o cancela `ids` (todos pendientes y visibles para el rol) en una sola transacción."""
+    # FOR UPDATE en Postgres: dos cajas no completan el mismo turno (ni suman puntos) dos veces
+    turnos = {t.id: t for t in visibles(Turno).filter(Turno.id.in_(ids)).with_for_update(of=Turno).all()}
+    faltan = [i for i in ids if i not in turnos]
+    if faltan:
+        db.session.rollback()
+        return jsonify({"error": "Turno no encontrado", "ids": faltan}), 404
+    procesados = [i for i in ids if turnos[i].estado != 'pendiente']
+    if procesados:
+        db.session.rollback()
+        return jsonify({"error": "Solo se pueden modificar turnos pendientes", "ids": procesados}), 409
+
+    antes = {i: estado_previo(t) for i, t in turnos.items()}
+    try:
+        for i in ids:
+            if accion == 'completar':
+                completar(turnos[i], (productos or {}).get(str(i)))
+            else:
+                turnos[i].estado = 'cancelado'
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        log.exception("Error en lote (%s)", accion, extra={'ids': ids})
+        return jsonify({"error": "No se pudo aplicar el cambio"}), 500
+
+    for i in ids:
+        publicar_turno('completado' if accion == 'completar' else 'cancelado', turnos[i], antes[i])
+    if accion == 'cancelar':
+        for i in ids:
+            llenar_hueco(hueco_de(turnos[i]))
+    return None
+
+
+# --- TURNOS ---
+@bp.route('/turnos')
+@api_rol_required()
+@lectura_replica
+def listar_turnos():
+    query = visibles(Turno)
+    try:
+        if request.args.get('desde'):
+            query = query.filter(Turno.fecha_hora >= datetime.strptime(request.args['desde'], '%Y-%m-%d'))
+        if request.args.get('hasta'):
+            hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d') + timedelta(days=1)
+            query = query.filter(Turno.fecha_hora < hasta)
+    except ValueError:
+        return jsonify({"error": "Fecha inválida"}), 400
+    if request.args.get('estado'):
+        query = query.filter(Turno.estado == request.args['estado'])
+    if request.args.get('barbero_id', type=int):
+        query = query.filter(Turno.empleado_id == request.args.get('barbero_id', type=int))
+
+    try:
+        turnos, siguiente = paginar_por_cursor(query, Turno.fecha_hora, request.args.get('cursor'),
+                                               current_app.config['API_PAGINA'])
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
+    return json_condicional({"turnos": [turno_json(t) for t in turnos], "siguiente": siguiente})
+
+@bp.route('/turnos', methods=['POST'])
+@api_rol_required()
+def crear_turno():
+    datos = request.get_json(silent=True) or {}
+    try:
+        turno, _ = reservar_turno(session['usuario_id'], session['nombre'], datos.get('barbero_id'),
+                                  datos.get('servicio_id'), datos.get('fecha'), datos.get('hora'))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify(turno_json(turno)), 201
+
+@bp.route('/turnos/serie', methods=['POST'])
+@api_rol_required()
+def crear_serie():
+    # Las fechas que chocan se informan en 'conflictos'; si ninguna entra no se crea la serie (409)
+    datos = request.get_json(silent=True) or {}
+    try:
+        serie, turnos, conflictos = reservar_serie(session['usuario_id'], session['nombre'], datos.get('barbero_id'),
+                                                   datos.get('servicio_id'), datos.get('fecha'), datos.get('hora'),
+                                                   datos.get('cada_dias'), datos.get('repeticiones'))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    if serie is None:
+        return jsonify({"error": "Ningún turno de la serie está disponible", "conflictos": conflictos}), 409
+    return jsonify({"serie_id": serie.id, "turnos": [turno_json(t) for t in turnos], "conflictos": conflictos}), 201
+
+@bp.route('/turnos/<int:turno_id>')
+@api_rol_required()
+def ver_turno(turno_id):
+    turno = visibles(Turno).filter(Turno.id == turno_id).first()
+    if turno is None:
+        return jsonify({"error": "Turno no encontrado"}), 404
+    return jsonify(turno_json(turno))
+
+@bp.route('/turnos/completar', methods=['POST'])
+@api_rol_required(*PERSONAL)
+def completar_turnos():
+    # {"ids": [..], "productos": {"<turno_id>": producto_id}} (producto vendido opcional)
+    datos = request.get_json(silent=True) or {}
+    try:
+        ids = leer_ids(datos)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    productos = datos.get('productos') if isinstance(datos.get('productos'), dict) else None
+    error = cambiar_estado(ids, 'completar', productos)
+    return error or jsonify({"ids": ids, "estado": "completado"})
+
+@bp.route('/turnos/<int:turno_id>/completar', methods=['POST'])
+@api_rol_required(*PERSONAL)
+def completar_uno(turno_id):
+    datos = request.get_json(silent=True) or {}
+    error = cambiar_estado([turno_id], 'completar', {str(turno_id): datos.get('producto_id')})
+    return error or jsonify({"id": turno_id, "estado": "completado"})
+
+@bp.route('/turnos/cancelar', methods=['POST'])
+@api_rol_required()
+def cancelar_turnos():
+    try:
+        ids = leer_ids(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    error = cambiar_estado(ids, 'cancelar')
+    return error or jsonify({"ids": ids, "estado": "cancelado"})
+
+@bp.route('/turnos/<int:turno_id>/cancelar', methods=['POST'])
+@api_rol_required()
+def cancelar_uno(turno_id):
+    error = cambiar_estado([turno_id], 'cancelar')
+    return error or jsonify({"id": turno_id, "estado": "cancelado"})
+
+# --- ADICIONALES DEL TURNO ---
+@bp.route('/turnos/<int:turno_id>/adicionales')
+@api_rol_required()
+def ver_adicionales(turno_id):
+    if visibles(Turno).filter(Turno.id == turno_id).first() is None:
+        return jsonify({"error": "Turno no encontrado"}), 404
+    adicionales = TurnoAdicional.query.filter_by(turno_id=turno_id).all()
+    return json_condicional({"adicionales": [{"id": a.item_id, "tipo": a.tipo, "precio": a.precio}
+                                             for a in adicionales]})
+
+@bp.route('/turnos/<int:turno_id>/adicionales', methods=['PUT'])
+@api_rol_required(*PERSONAL)
+def reemplazar_adicionales_turno(turno_id):
+    # {"adicionales": [{"tipo": "servicio"|"producto", "id": n}, ...]} reemplaza la lista completa
+    extras = (request.get_json(silent=True) or {}).get('adicionales')
+    if not isinstance(extras, list) or not all(isinstance(e, dict) for e in extras):
+        return jsonify({"error": "Se espera 'adicionales': lista de {tipo, id}."}), 400
+    turno = visibles(Turno).filter(Turno.id == turno_id).first()
+    if turno is None:
+        return jsonify({"error": "Turno no encontrado"}), 404
+
+    total = reemplazar_adicionales(turno, extras)
+    db.session.commit()
+    return jsonify({"id": turno.id, "total": round(total, 2)})
+
+# --- BLOQUEOS DE DISPONIBILIDAD ---
+@bp.route('/bloqueos')
+@api_rol_required(*PERSONAL)
+@lectura_replica
+def listar_bloqueos():
+    query = visibles(BloqueoDisponibilidad)
+    if request.args.get('barbero_id', type=int):
+        query = query.filter(BloqueoDisponibilidad.empleado_id == request.args.get('barbero_id', type=int))
+    # fecha es texto YYYY-MM-DD: la comparación de cadenas respeta el orden
+    if request.args.get('desde'):
+        query = query.filter(BloqueoDisponibilidad.fecha >= request.args['desde'])
+    if request.args.get('hasta'):
+        query = query.filter(BloqueoDisponibilidad.fecha <= request.args['hasta'])
+    bloqueos = query.order_by(BloqueoDisponibilidad.fecha, BloqueoDisponibilidad.hora_inicio).all()
+    return json_condicional({"bloqueos": [bloqueo_json(b) for b in bloqueos]})
+
+@bp.route('/bloqueos', methods=['POST'])
+@api_rol_required(*PERSONAL)
+def crear_bloqueos():
+    # {"bloqueos": [{fecha, hora_inicio, hora_fin, dia_completo, motivo, empleado_id}]}
+    # El barbero solo bloquea su agenda; admin/gerente indican empleado_id (de su sede)
+    items = (request.get_json(silent=True) or {}).get('bloqueos')
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        return jsonify({"error": "Se espera 'bloqueos': lista de objetos."}), 400
+    if len(items) > current_app.config['API_LOTE_MAX']:
+        return jsonify({"error": f"Máximo {current_app.config['API_LOTE_MAX']} elementos por lote."}), 400
+
+    sucursal_fija = sucursal_de_sesion()
+    nuevos = []
+    for indice, item in enumerate(items):
+        if session.get('rol') == 'empleado':
+            empleado_id = empleado_de_sesion()
+        else:
+            empleado = db.session.get(Empleado, item.get('empleado_id')) if isinstance(item.get('empleado_id'), int) else None
+            if empleado is None or (sucursal_fija and empleado.sucursal_id != sucursal_fija):
+                db.session.rollback()
+                return jsonify({"error": "Barbero no encontrado", "indice": indice}), 404
+            empleado_id = empleado.id
+        try:
+            nuevos.append(crear_bloqueo(empleado_id, item.get('fecha'), item.get('hora_inicio'),
+                                        item.get('hora_fin'), item.get('dia_completo', False), item.get('motivo')))
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e), "indice": indice}), 400
+
+    db.session.commit()
+    return jsonify({"ids": [b.id for b in nuevos]}), 201
+
+@bp.route('/bloqueos/<int:bloqueo_id>', methods=['DELETE'])
+@api_rol_required(*PERSONAL)
+def eliminar_bloqueo(bloqueo_id):
+    bloqueo = visibles(BloqueoDisponibilidad).filter(BloqueoDisponibilidad.id == bloqueo_id).first()
+    if bloqueo is None:
+        return jsonify({"error": "Bloqueo no encontrado"}), 404
+    db.session.delete(bloqueo)
+    db.session.commit()
+    return '', 204
+
+# --- PUNTOS DE FIDELIDAD ---
+@bp.route('/clientes/<int:usuario_id>/puntos')
+@api_rol_required()
+def ver_puntos(usuario_id):
+    if session.get('rol') == 'cliente' and usuario_id != session['usuario_id']:
+        return jsonify({"error": "Cliente no encontrado"}), 404
+    usuario = db.session.get(Usuario, usuario_id)
+    if usuario is None:
+        return jsonify({"error": "Cliente no encontrado"}), 404
+    return jsonify({"usuario_id": usuario.id, "puntos": usuario.puntos_acumulados})
+
+@bp.route('/clientes/<int:usuario_id>/canjes', methods=['POST'])
+@api_rol_required('admin', 'empleado')
+def canjear(usuario_id):
+    premio_id = (request.get_json(silent=True) or {}).get('premio_id')
+    premio = db.session.get(Premio, premio_id) if isinstance(premio_id, int) else None
+    if premio is None:
+        return jsonify({"error": "Premio no encontrado"}), 404
+
+    # Fila bloqueada hasta el commit: dos canjes simultáneos no dejan el saldo en negativo
+    usuario = Usuario.query.filter_by(id=usuario_id).with_for_update().first()
+    if usuario is None:
+        return jsonify({"error": "Cliente no encontrado"}), 404
+    if usuario.puntos_acumulados < premio.puntos_requeridos:
+        db.session.rollback()
+        return jsonify({"error": "Puntos insuficientes", "puntos": usuario.puntos_acumulados}), 409
+
+    usuario.puntos_acumulados -= premio.puntos_requeridos
+    db.session.add(HistorialCanje(usuario_id=usuario.id, premio_nombre=premio.nombre,
+                                  puntos_usados=premio.puntos_requeridos))
+    db.session.commit()
+    return jsonify({"usuario_id": usuario.id, "puntos": usuario.puntos_acumulados}), 201
@@ -0,0 +1,206 @@
+"""Archivo histórico de turnos en columnas de NumPy.
+
+Los turnos cerrados (completados, cancelados, inasistencias) con más de
+ARCHIVO_DIAS días ya no se editan, pero engordan la tabla que consultan la
+disponibilidad y los tableros. `archivar()` los saca por lotes, junto con sus
+adicionales y ventas, a una carpeta por lote dentro de ARCHIVO_DIR:
+
+    lote-<id_min>-<id_max>/
+        meta.json       rango de ids y fechas, para saltar lotes fuera del periodo
+        <columna>.npy   columnas de analítica, se leen con mmap
+        filas.npz       filas completas de turno, turno_adicional y ventas (comprimido)
+
+Solo analitica.datos_turnos (analítica, ocupación, reportes semanal y mensual) une lo
+archivado con la tabla viva; precio, duración y comisión quedan fijados al
+momento de archivar. El resto lee solo la tabla viva:
+
+- el historial del panel de administración y el de cada cliente muestran los
+  turnos cerrados de los últimos ARCHIVO_DIAS días, lo anterior ya no aparece;
+- la liquidación quincenal, el reporte diario y el tablero de 90 días del
+  empleado miran ventanas más cortas que MINIMO_DIAS, que es el menor
+  ARCHIVO_DIAS aceptado, así que no pierden filas.
+
+    flask --app app archivar
+"""
+import os
+import json
+import logging
+import shutil
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from barberia.extensiones import db
+from barberia.modelos import Turno, TurnoAdicional, Venta, TURNO_INACTIVO
+from barberia.analitica import columnas_turnos
+
+log = logging.getLogger(__name__)
+
+ESTADOS_CERRADOS = ('completado',) + TURNO_INACTIVO
+# Por encima de la ventana más larga que se lee solo de la tabla viva (tablero del empleado, 90 días)
+MINIMO_DIAS = 100
+COLUMNAS = ('id', 'empleado_id', 'servicio_id', 'estado', 'fecha', 'precio', 'duracion', 'comision',
+            'extras_servicio', 'extras_producto')
+# Enteros compactos; los importes quedan en float64 para que los totales coincidan al centavo
+TIPOS = {'id': np.int64, 'empleado_id': np.int32, 'servicio_id': np.int32, 'estado': np.int8,
+         'precio': np.float64, 'duracion': np.int16, 'comision': np.float64,
+         'extras_servicio': np.float64, 'extras_producto': np.float64}
+
+
+def carpeta():
+    return current_app.config['ARCHIVO_DIR'] or os.path.join(current_app.instance_path, 'archivo')
+
+
+def _meta(ruta):
+    with open(os.path.join(ruta, 'meta.json')) as f:
+        return json.load(f)
+
+
+def _guardar_meta(ruta, meta):
+    temporal = os.path.join(ruta, 'meta.json.tmp')
+    with open(temporal, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temporal, os.path.join(ruta, 'meta.json'))
+
+
+def lotes(inicio=None, fin=None):
+    """Carpetas de los lotes cuyo rango de fechas se cruza con [inicio, fin)."""
+    raiz = carpeta()
+    if not os.path.isdir(raiz):
+        return []
+    encontrados = []
+    for nombre in sorted(os.listdir(raiz)):
+        # Las carpetas .tmp-* son lotes a medio escribir: no existen hasta el rename
+        if not nombre.startswith('lote-'):
+            continue
+        ruta = os.path.join(raiz, nombre)
+        meta = _meta(ruta)
+        if inicio is not None and meta['fecha_max'] < inicio.strftime('%Y-%m-%dT%H:%M'):
+            continue
+        if fin is not None and meta['fecha_min'] >= fin.strftime('%Y-%m-%dT%H:%M'):
+            continue
+        encontrados.append(ruta)
+    return encontrados
+
+
+def leer(inicio, fin=None, empleados=None):
+    """Columnas archivadas de los turnos de [inicio, fin), o None si no hay nada archivado.
+
+    Mismo formato que analitica.columnas_turnos. `empleados`: ids a incluir (None = todos)."""
+    partes = []
+    for ruta in lotes(inicio, fin):
+        # mmap: solo se leen del disco las páginas que tocan los filtros y las filas elegidas
+        fecha = np.load(os.path.join(ruta, 'fecha.npy'), mmap_mode='r')
+        elegidos = fecha >= np.datetime64(inicio, 'm')
+        if fin is not None:
+            elegidos &= fecha < np.datetime64(fin, 'm')
+        if empleados is not None:
+            elegidos &= np.isin(np.load(os.path.join(ruta, 'empleado_id.npy'), mmap_mode='r'), empleados)
+        if elegidos.any():
+            partes.append({c: np.load(os.path.join(ruta, c + '.npy'), mmap_mode='r')[elegidos] for c in COLUMNAS})
+    if not partes:
+        return None
+    d = {c: np.concatenate([p[c] for p in partes]) for c in COLUMNAS}
+    # Mismos tipos que la tabla viva para que la unión no cambie los cálculos
+    for c in ('id', 'empleado_id', 'servicio_id', 'estado'):
+        d[c] = d[c].astype(np.int64)
+    for c in ('precio', 'duracion', 'comision', 'extras_servicio', 'extras_producto'):
+        d[c] = d[c].astype(np.float64)
+    return d
+
+
+def _columnas_tabla(tabla, filas):
+    # Filas completas a columnas; texto nulo queda como '' y números nulos como NaN
+    columnas = {}
+    for i, columna in enumerate(tabla.columns):
+        valores = [fila[i] for fila in filas]
+        tipo = columna.type.python_type
+        if tipo is str:
+            columnas[columna.name] = np.array(['' if v is None else v for v in valores], dtype=str)
+        elif tipo is datetime:
+            columnas[columna.name] = np.array(valores, dtype='datetime64[us]')
+        elif any(v is None for v in valores):
+            columnas[columna.name] = np.array([np.nan if v is None else v for v in valores], dtype=np.float64)
+        else:
+            columnas[columna.name] = np.array(valores)
+    return columnas
+
+
+def _escribir_lote(raiz, filtro):
+    d = columnas_turnos(filtro)
+    ids = d['id']
+    nombre = f"lote-{ids[0]:010d}-{ids[-1]:010d}"
+    temporal = os.path.join(raiz, '.tmp-' + nombre)
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+
+    for c in COLUMNAS:
+        valores = d[c] if c == 'fecha' else d[c].astype(TIPOS[c])
+        np.save(os.path.join(temporal, c + '.npy'), valores)
+
+    consultas = (
+        (Turno.__table__, db.select(Turno.__table__).where(*filtro)),
+        (TurnoAdicional.__table__, db.select(TurnoAdicional.__table__)
+         .join(Turno, TurnoAdicional.turno_id == Turno.id).where(*filtro)),
+        (Venta.__table__, db.select(Venta.__table__).join(Turno, Venta.turno_id == Turno.id).where(*filtro)),
+    )
+    filas = {}
+    for tabla, consulta in consultas:
+        for columna, valores in _columnas_tabla(tabla, db.session.execute(consulta).all()).items():
+            filas[f"{tabla.name}.{columna}"] = valores
+    np.savez_compressed(os.path.join(temporal, 'filas.npz'), **filas)
+
+    _guardar_meta(temporal, {
+        'id_min': int(ids[0]), 'id_max': int(ids[-1]), 'turnos': len(ids),
+        'fecha_min': str(d['fecha'].min()), 'fecha_max': str(d['fecha'].max()),
+        'archivado': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'borrado': False
+    })
+    ruta = os.path.join(raiz, nombre)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def _borrar_lote(ruta):
+    # Hijos primero (FK a turno); un solo commit por lote
+    ids = np.load(os.path.join(ruta, 'id.npy')).tolist()
+    for i in range(0, len(ids), 500):
+        tramo = ids[i:i + 500]
+        db.session.execute(db.delete(Venta).where(Venta.turno_id.in_(tramo)))
+        db.session.execute(db.delete(TurnoAdicional).where(TurnoAdicional.turno_id.in_(tramo)))
+        db.session.execute(db.delete(Turno).where(Turno.id.in_(tramo)))
+    db.session.commit()
+    meta = _meta(ruta)
+    meta['borrado'] = True
+    _guardar_meta(ruta, meta)
+
+
+def archivar(dias=None, lote=None):
+    """Mueve al archivo los turnos cerrados con más de `dias` días, de a `lote` turnos.
+    Devuelve la cantidad de turnos archivados."""
+    dias = dias or current_app.config['ARCHIVO_DIAS']
+    lote = lote or current_app.config['ARCHIVO_LOTE']
+    if dias < MINIMO_DIAS:
+        raise ValueError(f"ARCHIVO_DIAS debe ser al menos {MINIMO_DIAS}: hay vistas que solo leen la tabla viva.")
+    corte = datetime.now() - timedelta(days=dias)
+    raiz = carpeta()
+    os.makedirs(raiz, exist_ok=True)
+
+    # Una corrida anterior cortada entre escribir el lote y borrar sus filas: se termina el borrado
+    for ruta in lotes():
+        if not _meta(ruta)['borrado']:
+            log.warning("Completando borrado de %s", os.path.basename(ruta))
+            _borrar_lote(ruta)
+
+    total = 0
+    cerrados = [Turno.estado.in_(ESTADOS_CERRADOS), Turno.fecha_hora < corte]
+    while True:
+        tope = db.session.scalar(db.select(Turno.id).where(*cerrados).order_by(Turno.id)
+                                 .offset(lote - 1).limit(1))
+        filtro = cerrados if tope is None else cerrados + [Turno.id <= tope]
+        if not db.session.scalar(db.select(db.func.count()).select_from(Turno).where(*filtro)):
+            break
+        ruta = _escribir_lote(raiz, filtro)
+        _borrar_lote(ruta)
+        archivados = _meta(ruta)['turnos']
+        total += archivados
+        log.info("Archivados %s turnos en %s", archivados, os.path.basename(ruta))
+    return total
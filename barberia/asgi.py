@@ -0,0 +1,183 @@
+"""Servidor ASGI para la API pública de reservas.
+
+    uvicorn barberia.asgi:app --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker -w 2 barberia.asgi:app
+
+Sirve las mismas rutas JSON que el blueprint `api` (disponibilidad, reservar,
+reprogramar y cancelar) con los mismos modelos y funciones de barberia.agenda.
+El bucle de eventos atiende muchas conexiones a la vez; cada consulta a la BD
+corre en un pool de hilos acotado (ASYNC_DB_THREADS), así que un worker ya no
+queda bloqueado por cada ida y vuelta a la base. El proxy envía a este proceso
+/api/disponibilidad y /api/reservas*; el resto sigue en gunicorn (app:app).
+"""
+import logging
+import re
+import json
+import uuid
+import time
+import asyncio
+import hashlib
+from functools import partial
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from flask import g
+from itsdangerous import BadSignature
+from barberia import create_app
+from barberia.extensiones import db
+from barberia.agenda import horarios_ocupados, reservar_turno, cancelar_turno_de
+from barberia.bitacora import id_peticion, con_contexto, ID_VALIDO
+
+log = logging.getLogger(__name__)
+
+flask_app = create_app(blueprints=())
+executor = ThreadPoolExecutor(max_workers=flask_app.config['ASYNC_DB_THREADS'], thread_name_prefix='bd')
+
+RUTA_RESERVA = re.compile(r'^/api/reservas/(\d+)$')
+RUTA_CANCELAR = re.compile(r'^/api/reservas/(\d+)/cancelar$')
+
+
+def _en_contexto(funcion, *args, replica=False):
+    # Cada tarea abre su propio contexto; al cerrarlo Flask-SQLAlchemy devuelve la conexión al pool
+    with flask_app.app_context():
+        g.usar_replica = replica
+        return funcion(*args)
+
+
+async def en_hilo(funcion, *args, replica=False):
+    loop = asyncio.get_running_loop()
+    # run_in_executor no copia las ContextVar: el hilo recibe el id de la petición explícitamente
+    return await loop.run_in_executor(executor, con_contexto(partial(_en_contexto, funcion, *args, replica=replica)))
+
+
+def cargar_sesion(cabeceras):
+    cookie = SimpleCookie(cabeceras.get('cookie', ''))
+    nombre = flask_app.config['SESSION_COOKIE_NAME']
+    if nombre not in cookie:
+        return None, {}
+    valor = cookie[nombre].value
+
+    almacen = flask_app.extensions.get('almacen_sesiones')
+    if almacen is not None:
+        return valor, almacen.cargar(valor) or {}
+
+    # Sesión en cookie firmada (SESSION_BACKEND='cookie')
+    firmador = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        return None, firmador.loads(valor, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None, {}
+
+
+def recordar_escritura(sid, datos):
+    # Igual que recordar_escritura en Flask: tras escribir, sus lecturas van al primario un rato
+    almacen = flask_app.extensions.get('almacen_sesiones')
+    if almacen is not None and sid:
+        datos['_ultima_escritura'] = time.time()
+        almacen.guardar(sid, datos, time.time() + flask_app.permanent_session_lifetime.total_seconds())
+
+
+def _reservar(sid, sesion, datos, turno_id):
+    try:
+        turno, mensaje = reservar_turno(sesion['usuario_id'], sesion['nombre'], datos.get('barbero_id'),
+                                        datos.get('servicio_id'), datos.get('fecha'), datos.get('hora'),
+                                        turno_id=turno_id)
+    except ValueError as e:
+        db.session.rollback()
+        return 400, {"error": str(e)}
+    recordar_escritura(sid, sesion)
+    return (200 if turno_id else 201), {"id": turno.id, "mensaje": mensaje}
+
+
+def _cancelar(sid, sesion, turno_id):
+    try:
+        turno = cancelar_turno_de(turno_id, sesion['usuario_id'], sesion.get('rol'), sesion.get('sucursal_id'))
+    except LookupError as e:
+        return 404, {"error": str(e)}
+    recordar_escritura(sid, sesion)
+    return 200, {"id": turno.id, "estado": turno.estado}
+
+
+async def responder(send, estado, datos, cabeceras_peticion=None):
+    cuerpo = json.dumps(datos, separators=(',', ':')).encode()
+    cabeceras = [(b'content-type', b'application/json'), (b'x-request-id', id_peticion.get().encode())]
+    if cabeceras_peticion is not None:
+        # ETag como json_condicional: si el cliente ya tiene la respuesta, 304 sin cuerpo
+        etag = '"' + hashlib.sha1(cuerpo).hexdigest() + '"'
+        cabeceras += [(b'etag', etag.encode()), (b'cache-control', b'private, no-cache')]
+        if cabeceras_peticion.get('if-none-match') == etag:
+            estado, cuerpo = 304, b''
+    cabeceras.append((b'content-length', str(len(cuerpo)).encode()))
+    await send({'type': 'http.response.start', 'status': estado, 'headers': cabeceras})
+    await send({'type': 'http.response.body', 'body': cuerpo})
+
+
+async def leer_cuerpo(receive):
+    partes = []
+    while True:
+        mensaje = await receive()
+        partes.append(mensaje.get('body', b''))
+        if not mensaje.get('more_body'):
+            return b''.join(partes)
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    ruta, metodo = scope['path'], scope['method']
+    cabeceras = {k.decode('latin-1'): v.decode('latin-1') for k, v in scope['headers']}
+    args = {k: v[0] for k, v in parse_qs(scope['query_string'].decode()).items()}
+    # Cada petición ASGI corre en su propia tarea, con su propia copia del contexto
+    entrante = cabeceras.get('x-request-id', '')
+    id_peticion.set(entrante if ID_VALIDO.match(entrante) else uuid.uuid4().hex)
+
+    try:
+        if ruta == '/api/disponibilidad' and metodo == 'GET':
+            barbero_id, fecha_str, edit_id = args.get('barbero_id'), args.get('fecha'), args.get('edit_id')
+            if not barbero_id or not fecha_str:
+                return await responder(send, 200, [], cabeceras)
+            try:
+                excluir = int(edit_id) if edit_id and edit_id != 'None' else None
+            except ValueError:
+                return await responder(send, 400, {"error": "edit_id inválido"})
+            _, sesion = await en_hilo(cargar_sesion, cabeceras)
+            replica = time.time() - sesion.get('_ultima_escritura', 0) > flask_app.config['REPLICA_VENTANA_ESCRITURA']
+            datos = await en_hilo(horarios_ocupados, barbero_id, fecha_str, excluir, replica=replica)
+            return await responder(send, 200, datos, cabeceras)
+
+        es_reserva = ruta == '/api/reservas' and metodo == 'POST'
+        reprogramar = RUTA_RESERVA.match(ruta) if metodo == 'PUT' else None
+        cancelar = RUTA_CANCELAR.match(ruta) if metodo == 'POST' else None
+        if not (es_reserva or reprogramar or cancelar):
+            return await responder(send, 404, {"error": "No encontrado"})
+
+        sid, sesion = await en_hilo(cargar_sesion, cabeceras)
+        if 'usuario_id' not in sesion:
+            return await responder(send, 401, {"error": "No autenticado"})
+
+        if cancelar:
+            estado, datos = await en_hilo(_cancelar, sid, sesion, int(cancelar.group(1)))
+        else:
+            try:
+                cuerpo = json.loads(await leer_cuerpo(receive) or b'{}')
+            except ValueError:
+                cuerpo = None
+            if not isinstance(cuerpo, dict):
+                return await responder(send, 400, {"error": "JSON inválido"})
+            turno_id = int(reprogramar.group(1)) if reprogramar else None
+            estado, datos = await en_hilo(_reservar, sid, sesion, cuerpo, turno_id)
+        return await responder(send, estado, datos)
+
+    except Exception:
+        log.exception("Error en API ASGI %s", ruta)
+        return await responder(send, 500, {"error": "Error interno"})
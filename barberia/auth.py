@@ -0,0 +1,212 @@
+import logging
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from barberia.extensiones import db, serializador
+from barberia.modelos import Usuario
+from barberia.seguridad import (validar_password, hashear_password, verificar_password, necesita_rehash,
+                                intentos_excedidos, registrar_intento, respuesta_limite)
+from barberia.sesiones import revocar_sesiones
+from barberia.utilidades import iniciar_sesion
+
+log = logging.getLogger(__name__)
+
+bp = Blueprint('auth', __name__)
+
+@bp.route('/')
+def index():
+    # Si el usuario ya está logueado, lo enviamos a su dashboard
+    if 'usuario_id' in session:
+        rol = session.get('rol')
+        if rol in ['admin', 'gerente']:
+            return redirect(url_for('admin.admin_dashboard'))
+        elif rol == 'empleado':
+            return redirect(url_for('empleado.empleado_dashboard'))
+        else:
+            return redirect(url_for('reservas.agendar'))
+            
+    # Si no hay sesión, mostramos la nueva página de inicio
+    return render_template('index.html')
+
+@bp.route('/registro', methods=['GET', 'POST'])
+def registro():
+    if request.method == 'POST':
+        nombre = request.form.get('nombre')
+        email = request.form.get('email').lower()
+        password = request.form.get('password')
+
+        # Validación de contraseña
+        val = validar_password(password)
+        if val is not True:
+            flash(f"Seguridad: {val}", "error")
+            return redirect(url_for('auth.registro'))
+
+        # Verificar si ya existe el usuario
+        if Usuario.query.filter_by(email=email).first():
+            flash("El correo ya está registrado.", "error")
+            return redirect(url_for('auth.registro'))
+
+        # Crear nuevo usuario
+        nuevo = Usuario(
+            nombre=nombre,
+            email=email,
+            password=hashear_password(password),
+            rol='cliente',
+            confirmado=True
+        )
+        
+        try:
+            db.session.add(nuevo)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            log.exception("Error en base de datos al registrar usuario")
+            flash("Error interno al crear la cuenta.", "error")
+            return redirect(url_for('auth.registro'))
+
+        # --- SECCIÓN DE CORREO EN HIBERNACIÓN ---
+        """
+        token = serializador().dumps(email, salt='email-confirm')
+        link = url_for('auth.confirmar_email', token=token, _external=True)
+
+        # Preparar el correo
+        remitente_seguro = os.getenv('MAIL_USERNAME')
+        msg = Message(
+            'Confirma tu cuenta - Barbero_1999',
+            sender=remitente_seguro,
+            recipients=[email]
+        )
+        msg.body = f'Hola {nombre}, confirma tu cuenta aquí: {link}'
+
+        app_contexto = current_app._get_current_object()
+        Thread(target=send_async_email, args=(app_contexto, msg)).start()
+        """        
+        # --- FIN HIBERNACIÓN ---
+
+        flash("Registro exitoso. Ya puedes iniciar sesión", "exito")
+        return redirect(url_for('auth.login'))
+
+    return render_template('registro.html')
+
+@bp.route('/confirmar_email/<token>')
+def confirmar_email(token):
+    try:
+        email = serializador().loads(token, salt='email-confirm', max_age=3600) # Expira en 1h
+    except:
+        flash("El enlace es inválido o expiró.", "error")
+        return redirect(url_for('auth.login'))
+    
+    usuario = Usuario.query.filter_by(email=email).first_or_404()
+    usuario.confirmado = True
+    db.session.commit()
+    flash("¡Cuenta activada correctamente! Ya puedes iniciar sesión.", "exito")
+    return redirect(url_for('auth.login'))
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email').lower()
+        password = request.form.get('password')
+
+        if intentos_excedidos(email):
+            return respuesta_limite('login.html')
+
+        usuario = Usuario.query.filter_by(email=email).first()
+
+        if usuario and verificar_password(usuario.password, password):
+            # BLOQUEO si no ha confirmado su correo
+            if not usuario.confirmado:
+                flash("Debes confirmar tu correo electrónico antes de entrar.", "error")
+                return redirect(url_for('auth.login'))
+
+            # Rehash transparente si el hash guardado usa parámetros antiguos
+            if necesita_rehash(usuario.password):
+                try:
+                    usuario.password = hashear_password(password)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    log.exception("Error al actualizar hash", extra={'usuario_id': usuario.id})
+
+            iniciar_sesion(usuario)
+            
+            if usuario.rol in ['admin', 'gerente']:
+                return redirect(url_for('admin.admin_dashboard'))
+            elif usuario.rol == 'empleado':
+                return redirect(url_for('empleado.empleado_dashboard'))
+            else:
+                return redirect(url_for('reservas.agendar'))
+        
+        registrar_intento(email)
+        flash("Correo o contraseña incorrectos", "error")
+    return render_template('login.html')
+
+@bp.route('/recuperar_password', methods=['GET', 'POST'])
+def recuperar_password():
+    if request.method == 'POST':
+        email = request.form.get('email').lower()
+
+        if intentos_excedidos(email):
+            return respuesta_limite('recuperar.html')
+        registrar_intento(email)
+
+        usuario = Usuario.query.filter_by(email=email).first()
+        
+        if usuario:
+            token = serializador().dumps(email, salt='pass-reset')
+            
+            # --- MODO HIBERNACIÓN (CÓDIGO GUARDADO) ---
+            """
+            msg = Message(
+                'Recuperar Contraseña - Barbero_1999', 
+                sender=current_app.config['MAIL_USERNAME'],
+                recipients=[email]
+            )
+            msg.body = f'Enlace: {url_for("auth.reset_password", token=token, _external=True)}'
+            try:
+                mail.send(msg)
+            except Exception:
+                log.exception("Error enviando correo de recuperación")
+            """
+            # --- FIN HIBERNACIÓN ---
+
+            # Redirigimos directamente al reseteo
+            flash("Usuario verificado. Por favor, define tu nueva contraseña.", "exito")
+            return redirect(url_for('auth.reset_password', token=token))
+        
+        # Si el usuario NO existe, volvemos al login para no dar pistas a intrusos
+        flash("Si el correo existe en nuestro sistema, podrás restablecer tu cuenta.", "exito")
+        return redirect(url_for('auth.login'))
+
+    # Este es el return que te estaba fallando. 
+    # Ahora solo se ejecuta si el método es GET (cuando entras a la página).
+    return render_template('recuperar.html')
+
+@bp.route('/reset_password/<token>', methods=['GET', 'POST'])
+def reset_password(token):
+    try:
+        email = serializador().loads(token, salt='pass-reset', max_age=1800) # 30 min
+    except:
+        flash("El enlace de recuperación ha expirado o es inválido.", "error")
+        return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        nueva_pass = request.form.get('password')
+        
+        # Validar seguridad de la nueva clave
+        val = validar_password(nueva_pass)
+        if val is not True:
+            flash(f"Seguridad: {val}", "error")
+            return redirect(request.url)
+
+        usuario = Usuario.query.filter_by(email=email).first()
+        usuario.password = hashear_password(nueva_pass)
+        db.session.commit()
+        revocar_sesiones(usuario.id)
+        
+        flash("Tu contraseña ha sido actualizada exitosamente.", "exito")
+        return redirect(url_for('auth.login'))
+    return render_template('reset_password.html')
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('auth.index'))
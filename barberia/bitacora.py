@@ -0,0 +1,188 @@
+"""Logs estructurados en JSON, una línea por evento, con el id de la petición.
+
+Los módulos usan `logging.getLogger(__name__)` (todos cuelgan del logger
+'barberia', que es también app.logger). El handler no escribe: deja el registro
+en una cola acotada y un hilo lo formatea y lo escribe en stdout, así un disco
+o un colector lento nunca frena a la petición. Si la cola se llena, el registro
+se descarta y se cuenta en barberia_logs_descartados_total.
+
+Cada petición recibe un id (el X-Request-ID del proxy si viene, si no uno
+nuevo), que se devuelve en la respuesta y va en cada línea que se escriba
+mientras se atiende. Vive en una ContextVar: los hilos que se lanzan con
+`con_contexto` y los avisos que pasan por la cola de correo lo conservan.
+
+El acceso (una línea por petición) se muestrea por endpoint con LOG_MUESTREO;
+los errores y las peticiones lentas (LOG_LENTO_MS) se escriben siempre.
+"""
+import os
+import re
+import sys
+import copy
+import json
+import time
+import uuid
+import queue
+import random
+import logging
+import threading
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from flask import request, g
+
+id_peticion = contextvars.ContextVar('id_peticion', default=None)
+ID_VALIDO = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+# Atributos propios de LogRecord; el resto son los campos pasados con extra={...}
+ATRIBUTOS_REGISTRO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+log_acceso = logging.getLogger('barberia.acceso')
+
+
+class FormatoJSON(logging.Formatter):
+
+    def format(self, registro):
+        datos = {
+            'ts': datetime.fromtimestamp(registro.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': registro.levelname,
+            'logger': registro.name,
+            'mensaje': registro.getMessage(),
+        }
+        for clave, valor in vars(registro).items():
+            if clave not in ATRIBUTOS_REGISTRO and not clave.startswith('_'):
+                datos[clave] = valor
+        if registro.exc_info:
+            datos['excepcion'] = self.formatException(registro.exc_info)
+        elif registro.exc_text:
+            datos['excepcion'] = registro.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    # Para desarrollo: legible en la consola, con el id de la petición al frente
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(id_peticion)s] %(name)s: %(message)s')
+
+
+class ManejadorCola(QueueHandler):
+    """QueueHandler que nunca bloquea: con la cola llena descarta. El hilo que escribe
+    arranca en cada proceso al primer registro (los workers de gunicorn nacen por fork)."""
+
+    def __init__(self, destino, max_cola, metricas=None):
+        super().__init__(queue.Queue(maxsize=max_cola))
+        self.destino = destino
+        self.metricas = metricas
+        self.pid = None
+        self.lock_hilo = threading.Lock()
+
+    def _arrancar(self):
+        with self.lock_hilo:
+            if self.pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                threading.Thread(target=self._escribir, name='bitacora', daemon=True).start()
+                self.pid = os.getpid()
+
+    def prepare(self, registro):
+        # Copia con el mensaje ya armado: los argumentos y la excepción no se pueden
+        # leer después desde otro hilo. El formato JSON se hace en el hilo que escribe.
+        registro = copy.copy(registro)
+        registro.msg = registro.getMessage()
+        registro.args = None
+        if registro.exc_info:
+            registro.exc_text = logging.Formatter().formatException(registro.exc_info)
+            registro.exc_info = None
+        registro.id_peticion = getattr(registro, 'id_peticion', None) or id_peticion.get()
+        return registro
+
+    def emit(self, registro):
+        if self.pid != os.getpid():
+            self._arrancar()
+        # Con la cola llena ni se copia el registro
+        if self.queue.full():
+            self._descartar()
+        else:
+            super().emit(registro)
+
+    def enqueue(self, registro):
+        try:
+            self.queue.put_nowait(registro)
+        except queue.Full:
+            self._descartar()
+
+    def _descartar(self):
+        if self.metricas is not None:
+            self.metricas.contar('barberia_logs_descartados_total')
+
+    def _escribir(self):
+        cola = self.queue
+        while True:
+            registro = cola.get()
+            try:
+                self.destino.handle(registro)
+            except Exception:
+                pass  # sin dónde avisar: el destino es la salida
+
+
+def con_contexto(funcion):
+    """Envuelve `funcion` para correr en otro hilo con el id de la petición actual."""
+    contexto = contextvars.copy_context()
+    return lambda *args, **kwargs: contexto.run(funcion, *args, **kwargs)
+
+
+def _muestreo(texto):
+    # "api.consultar_disponibilidad=0.1,static=0" -> {endpoint: proporción registrada}
+    tasas = {}
+    for parte in (texto or '').split(','):
+        if '=' in parte:
+            endpoint, tasa = parte.split('=', 1)
+            tasas[endpoint.strip()] = float(tasa)
+    return tasas
+
+
+def configurar(app):
+    destino = logging.StreamHandler(sys.stdout)
+    destino.setFormatter(FormatoJSON() if app.config['LOG_FORMATO'] == 'json' else FormatoTexto())
+    manejador = ManejadorCola(destino, app.config['LOG_COLA_MAX'], app.extensions.get('metricas'))
+
+    raiz = logging.getLogger('barberia')
+    # Una sola salida por proceso aunque se cree más de una app (scripts, pruebas)
+    for anterior in [h for h in raiz.handlers if isinstance(h, ManejadorCola)]:
+        raiz.removeHandler(anterior)
+    raiz.addHandler(manejador)
+    raiz.setLevel(app.config['LOG_NIVEL'])
+    raiz.propagate = False
+
+
+def init_app(app):
+    configurar(app)
+    muestreo = _muestreo(app.config['LOG_MUESTREO'])
+    lento = app.config['LOG_LENTO_MS'] / 1000
+
+    @app.before_request
+    def asignar_id_peticion():
+        entrante = request.headers.get('X-Request-ID', '')
+        g.id_peticion = entrante if ID_VALIDO.match(entrante) else uuid.uuid4().hex
+        g.token_id_peticion = id_peticion.set(g.id_peticion)
+        g.inicio_log = time.perf_counter()
+
+    @app.after_request
+    def registrar_acceso(response):
+        if 'id_peticion' not in g:
+            return response
+        response.headers['X-Request-ID'] = g.id_peticion
+        duracion = time.perf_counter() - g.inicio_log
+        if (response.status_code >= 500 or duracion >= lento
+                or random.random() < muestreo.get(request.endpoint, 1.0)):
+            log_acceso.info('%s %s %s', request.method, request.path, response.status_code, extra={
+                'endpoint': request.endpoint, 'estado': response.status_code,
+                'duracion_ms': round(duracion * 1000, 1), 'muestreo': muestreo.get(request.endpoint, 1.0)})
+        return response
+
+    @app.teardown_request
+    def liberar_id_peticion(error=None):
+        token = g.pop('token_id_peticion', None)
+        if token is not None:
+            try:
+                id_peticion.reset(token)
+            except ValueError:
+                pass  # respuesta en streaming cerrada desde otro contexto
@@ -0,0 +1,182 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _url_bd(url):
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+class Config:
+    SECRET_KEY = os.getenv('SECRET_KEY', 'clave-de-emergencia-por-si-no-carga-el-env')
+
+    SQLALCHEMY_DATABASE_URI = _url_bd(os.getenv('DATABASE_URL')) or 'sqlite:///barberia.db'
+    if os.getenv('DATABASE_URL'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "pool_pre_ping": True,
+            "pool_recycle": 300,
+            "pool_size": int(os.getenv('DB_POOL_SIZE', 10)),
+            "max_overflow": int(os.getenv('DB_MAX_OVERFLOW', 20))
+        }
+
+    # Perfil SQLite para un solo nodo (se aplica en cada conexión nueva, ver configurar_sqlite)
+    SQLITE_TUNING = os.getenv('SQLITE_TUNING', '1') == '1'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64000))  # negativo = KiB (64 MB)
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  # 256 MB
+    # Con las claves foráneas activas, borrar un servicio, producto o empleado que
+    # tenga turnos o ventas falla (el panel lo avisa en lugar de dejar filas huérfanas).
+    # Bases que ya tenían huérfanas: revisar con `PRAGMA foreign_key_check` antes de
+    # activarlo, o dejar SQLITE_FOREIGN_KEYS=0 hasta limpiarlas.
+    SQLITE_FOREIGN_KEYS = os.getenv('SQLITE_FOREIGN_KEYS', '1') == '1'
+
+    # Réplica de solo lectura para reportes y tableros (opcional)
+    if os.getenv('DATABASE_REPLICA_URL'):
+        SQLALCHEMY_BINDS = {'replica': _url_bd(os.getenv('DATABASE_REPLICA_URL'))}
+    # Segundos tras una escritura del usuario en los que sus lecturas siguen yendo al primario
+    REPLICA_VENTANA_ESCRITURA = int(os.getenv('REPLICA_VENTANA_ESCRITURA', 10))
+
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Política de hashing de contraseñas (ajustable según el hardware del servidor)
+    # Ejemplos: 'scrypt:16384:8:1', 'pbkdf2:sha256:260000'
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+
+    # Límite de intentos (ventana deslizante) para login y recuperación
+    RATE_LIMIT_STORAGE_URL = os.getenv('RATE_LIMIT_STORAGE_URL')  # ej: redis://localhost:6379/0
+    RATE_LIMIT_VENTANA = int(os.getenv('RATE_LIMIT_VENTANA', 300))  # segundos
+    RATE_LIMIT_POR_IP = int(os.getenv('RATE_LIMIT_POR_IP', 30))
+    RATE_LIMIT_POR_EMAIL = int(os.getenv('RATE_LIMIT_POR_EMAIL', 5))
+    RATE_LIMIT_MAX_CLAVES = int(os.getenv('RATE_LIMIT_MAX_CLAVES', 50000))
+
+    # Sesiones del lado del servidor: 'sqlite' (por defecto), 'redis' o 'cookie' (la de Flask)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlite')
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH')  # por defecto instance/sesiones.db
+    SESSION_STORAGE_URL = os.getenv('SESSION_STORAGE_URL')  # ej: redis://localhost:6379/1
+    SESSION_PURGA_CADA = int(os.getenv('SESSION_PURGA_CADA', 500))  # SQLite: borra vencidas cada N guardados
+
+    # Caché HTTP: los estáticos con huella (?v=hash) se cachean un año
+    STATIC_CACHE_INMUTABLE = 31536000
+    STATIC_CACHE_SIN_HUELLA = int(os.getenv('STATIC_CACHE_SIN_HUELLA', 3600))
+
+    # Compresión al vuelo de HTML/JSON grandes (los estáticos van precomprimidos por build_assets.py)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_MIMETYPES = {'text/html', 'application/json', 'text/css',
+                          'text/javascript', 'application/javascript', 'text/plain'}
+
+    # Historial de citas del cliente en /agendar (paginación por cursor)
+    AGENDAR_PRIMERA_PAGINA = 3
+    AGENDAR_PAGINA = 10
+    ADMIN_PAGINA = int(os.getenv('ADMIN_PAGINA', 100))
+
+    # Horario de atención (el mismo que usa agendar.js para ofrecer horarios); base de la ocupación
+    AGENDA_HORA_APERTURA = int(os.getenv('AGENDA_HORA_APERTURA', 9))
+    AGENDA_HORA_CIERRE = int(os.getenv('AGENDA_HORA_CIERRE', 21))
+    # Rango máximo de los reportes de analítica y ocupación (la ocupación arma barberos x días x franjas)
+    REPORTE_MAX_DIAS = int(os.getenv('REPORTE_MAX_DIAS', 366))
+
+    # Búsqueda de próximos horarios libres (ver barberia/disponibilidad.py)
+    BUSQUEDA_TRAMO_DIAS = int(os.getenv('BUSQUEDA_TRAMO_DIAS', 7))  # días leídos por consulta
+    BUSQUEDA_MAX_DIAS = int(os.getenv('BUSQUEDA_MAX_DIAS', 60))  # hasta dónde se busca
+    BUSQUEDA_MAX_RESULTADOS = int(os.getenv('BUSQUEDA_MAX_RESULTADOS', 20))
+    BUSQUEDA_PASO_MINUTOS = 5  # mismo paso que agendar.js
+    BUSQUEDA_ANTICIPACION = 15  # minutos mínimos desde ahora, como agendar.js
+
+    # Reservas recurrentes (agenda.reservar_serie)
+    SERIE_MAX_TURNOS = int(os.getenv('SERIE_MAX_TURNOS', 12))
+    SERIE_MAX_CADA_DIAS = int(os.getenv('SERIE_MAX_CADA_DIAS', 90))
+
+    # Archivo histórico de turnos cerrados (ver barberia/archivo.py)
+    ARCHIVO_DIR = os.getenv('ARCHIVO_DIR')  # por defecto instance/archivo
+    ARCHIVO_DIAS = int(os.getenv('ARCHIVO_DIAS', 365))
+    ARCHIVO_LOTE = int(os.getenv('ARCHIVO_LOTE', 5000))  # turnos por lote
+
+    # Importación masiva desde CSV/XLSX (ver barberia/importacion.py)
+    IMPORTACION_LOTE = int(os.getenv('IMPORTACION_LOTE', 2000))  # filas por INSERT
+    IMPORTACION_MAX_ERRORES = int(os.getenv('IMPORTACION_MAX_ERRORES', 1000))  # errores listados en el reporte
+    IMPORTACION_PROCESOS = int(os.getenv('IMPORTACION_PROCESOS', os.cpu_count() or 2))  # hash de contraseñas
+
+    # API JSON /api/v1 (móvil y caja)
+    API_PAGINA = int(os.getenv('API_PAGINA', 100))
+    API_LOTE_MAX = int(os.getenv('API_LOTE_MAX', 200))  # elementos por petición en los lotes
+
+    # Blueprints que sirve este proceso (separados por coma); vacío = todos.
+    # Permite pools de gunicorn distintos para la reserva pública y el panel/reportes.
+    BLUEPRINTS = os.getenv('BLUEPRINTS', '')
+
+    # Servidor ASGI (barberia/asgi.py): hilos que ejecutan las consultas a la BD.
+    # Debe ser <= pool_size + max_overflow del motor para no esperar conexiones.
+    ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', 16))
+
+    # Agenda en tiempo real (SSE): 'memoria' reparte dentro del proceso; con varios
+    # workers o nodos usar 'redis' para que el evento llegue a todos los tableros
+    EVENTOS_BACKEND = os.getenv('EVENTOS_BACKEND', 'memoria')
+    EVENTOS_STORAGE_URL = os.getenv('EVENTOS_STORAGE_URL')  # ej: redis://localhost:6379/2
+    EVENTOS_MAX_COLA = int(os.getenv('EVENTOS_MAX_COLA', 100))
+    SSE_KEEPALIVE = int(os.getenv('SSE_KEEPALIVE', 15))  # segundos entre pings
+    SSE_DURACION_MAX = int(os.getenv('SSE_DURACION_MAX', 300))  # luego el navegador reconecta
+
+    # Configuración de Correo
+    MAIL_SERVER = '74.125.141.108'
+    MAIL_PORT = 465
+    MAIL_USE_TLS = False
+    MAIL_USE_SSL = True
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_USERNAME')
+    MAIL_DEBUG = os.getenv('MAIL_DEBUG', '0') == '1'  # diálogo SMTP completo en stderr, solo para depurar
+    # Avisos automáticos (lista de espera): se juntan y se envían por una sola conexión SMTP
+    CORREO_LOTE_MAX = int(os.getenv('CORREO_LOTE_MAX', 50))
+    CORREO_LOTE_ESPERA = float(os.getenv('CORREO_LOTE_ESPERA', 5))  # segundos juntando avisos
+
+    # Lista de espera (ver barberia/lista_espera.py)
+    LISTA_ESPERA_CANDIDATOS = int(os.getenv('LISTA_ESPERA_CANDIDATOS', 20))  # probados por hueco
+    LISTA_ESPERA_MAX_DIAS = int(os.getenv('LISTA_ESPERA_MAX_DIAS', 30))  # largo máximo de la ventana
+    LISTA_ESPERA_MAX_ACTIVAS = int(os.getenv('LISTA_ESPERA_MAX_ACTIVAS', 5))  # por cliente
+    LISTA_ESPERA_ANTICIPACION = int(os.getenv('LISTA_ESPERA_ANTICIPACION', 30))  # minutos mínimos de aviso
+
+    # Métricas en /metrics (ver barberia/metricas.py); con varios workers, un directorio compartido
+    METRICAS_DIR = os.getenv('METRICAS_DIR')
+    METRICAS_INTERVALO = int(os.getenv('METRICAS_INTERVALO', 5))  # segundos entre volcados de cada worker
+    METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')  # si se define, /metrics pide "Authorization: Bearer <token>"
+    METRICAS_TOKEN_OBLIGATORIO = False  # en producción la app no arranca sin METRICAS_TOKEN
+
+    # Logs estructurados (ver barberia/bitacora.py)
+    LOG_NIVEL = os.getenv('LOG_NIVEL', 'INFO')
+    LOG_FORMATO = os.getenv('LOG_FORMATO', 'json')  # 'json' o 'texto'
+    LOG_COLA_MAX = int(os.getenv('LOG_COLA_MAX', 10000))  # registros en espera antes de descartar
+    LOG_LENTO_MS = int(os.getenv('LOG_LENTO_MS', 1000))  # peticiones más lentas se registran siempre
+    # Proporción de peticiones registradas por endpoint; el resto, todas
+    LOG_MUESTREO = os.getenv('LOG_MUESTREO', 'api.consultar_disponibilidad=0.05,api.api_proximos_horarios=0.2,'
+                                             'static=0,metricas=0')
+
+
+class DesarrolloConfig(Config):
+    DEBUG = True
+
+
+class ProduccionConfig(Config):
+    MAIL_DEBUG = False
+    METRICAS_TOKEN_OBLIGATORIO = True
+
+
+class PruebasConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SESSION_BACKEND = 'cookie'
+    # Hash barato: las pruebas no miden seguridad
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+
+CONFIGS = {
+    'desarrollo': DesarrolloConfig,
+    'produccion': ProduccionConfig,
+    'pruebas': PruebasConfig,
+}
@@ -0,0 +1,161 @@
+"""Búsqueda de los próximos horarios libres para un servicio, entre todos los barberos.
+
+En lugar de probar barbero por barbero y día por día, se leen de una vez los
+turnos activos y los bloqueos de todos los barberos candidatos para un tramo de
+BUSQUEDA_TRAMO_DIAS días (consultas por rango sobre ix_turno_empleado_fecha e
+ix_bloqueo_empleado_fecha). Con eso se arma, por barbero, la lista ordenada de
+intervalos libres dentro del horario de atención, y un heap (heapq.merge) va
+sacando el inicio más temprano entre todos los barberos hasta juntar los
+pedidos. Si el tramo no alcanza se lee el siguiente, hasta BUSQUEDA_MAX_DIAS:
+con la agenda casi llena el costo queda acotado por la ventana, no por la
+cantidad de turnos de la tabla.
+"""
+import heapq
+from datetime import datetime, timedelta
+from itertools import islice
+from flask import current_app
+from barberia.extensiones import db
+from barberia.modelos import Turno, Servicio, Empleado, BloqueoDisponibilidad, TURNO_INACTIVO
+
+
+def _hora(texto, defecto):
+    h, m = (texto or defecto).split(':')
+    return timedelta(hours=int(h), minutes=int(m))
+
+
+def intervalos_ocupados(barberos, inicio, fin):
+    """{barbero: [(inicio, fin), ...]} de turnos activos y bloqueos en [inicio, fin), ordenados."""
+    ocupados = {b: [] for b in barberos}
+    duracion = db.func.coalesce(Servicio.duracion_minutos, 30)
+    turnos = db.session.execute(
+        db.select(Turno.empleado_id, Turno.fecha_hora, duracion)
+        .outerjoin(Servicio, Turno.servicio_id == Servicio.id)
+        .where(Turno.empleado_id.in_(barberos),
+               Turno.fecha_hora >= inicio,
+               Turno.fecha_hora < fin,
+               Turno.estado.notin_(TURNO_INACTIVO)))
+    for empleado_id, fecha_hora, minutos in turnos:
+        ocupados[empleado_id].append((fecha_hora, fecha_hora + timedelta(minutes=minutos)))
+
+    bloqueos = db.session.execute(
+        db.select(BloqueoDisponibilidad.empleado_id, BloqueoDisponibilidad.fecha, BloqueoDisponibilidad.hora_inicio,
+                  BloqueoDisponibilidad.hora_fin, BloqueoDisponibilidad.dia_completo)
+        .where(BloqueoDisponibilidad.empleado_id.in_(barberos),
+               BloqueoDisponibilidad.fecha >= inicio.strftime('%Y-%m-%d'),
+               BloqueoDisponibilidad.fecha < fin.strftime('%Y-%m-%d')))
+    for empleado_id, fecha, hora_inicio, hora_fin, dia_completo in bloqueos:
+        dia = datetime.strptime(fecha, '%Y-%m-%d')
+        if dia_completo:
+            ocupados[empleado_id].append((dia, dia + timedelta(days=1)))
+        else:
+            ocupados[empleado_id].append((dia + _hora(hora_inicio, '00:00'), dia + _hora(hora_fin, '23:59')))
+
+    for lista in ocupados.values():
+        lista.sort()
+    return ocupados
+
+
+def intervalos_libres(ocupados, ventanas):
+    """Resta los intervalos `ocupados` (ordenados) de las `ventanas` (ordenadas y disjuntas)."""
+    libres = []
+    i = 0
+    for desde, hasta in ventanas:
+        # Los ocupados que terminan antes de la ventana no vuelven a servir
+        while i < len(ocupados) and ocupados[i][1] <= desde:
+            i += 1
+        cursor = desde
+        j = i
+        while j < len(ocupados) and ocupados[j][0] < hasta:
+            inicio, fin = ocupados[j]
+            if inicio > cursor:
+                libres.append((cursor, inicio))
+            cursor = max(cursor, fin)
+            j += 1
+        if cursor < hasta:
+            libres.append((cursor, hasta))
+    return libres
+
+
+def _inicios(barbero_id, libres, minutos, paso):
+    # Inicios en la grilla de `paso` minutos, en orden; el generador solo avanza cuando el heap lo pide
+    for desde, hasta in libres:
+        resto = (desde.hour * 60 + desde.minute) % paso
+        inicio = desde.replace(second=0, microsecond=0)
+        if resto or inicio < desde:
+            inicio += timedelta(minutes=paso - resto)
+        while inicio + minutos <= hasta:
+            yield inicio, barbero_id
+            inicio += timedelta(minutes=paso)
+
+
+def _ventanas(inicio, fin, ahora, franja):
+    # Horario de atención de cada día de [inicio, fin), recortado a la franja pedida y a partir de `ahora`
+    apertura = timedelta(hours=current_app.config['AGENDA_HORA_APERTURA'])
+    cierre = timedelta(hours=current_app.config['AGENDA_HORA_CIERRE'])
+    if franja:
+        apertura, cierre = max(apertura, franja[0]), min(cierre, franja[1])
+    ventanas = []
+    dia = inicio
+    while dia < fin:
+        desde, hasta = max(dia + apertura, ahora), dia + cierre
+        if desde < hasta:
+            ventanas.append((desde, hasta))
+        dia += timedelta(days=1)
+    return ventanas
+
+
+def proximos_horarios(servicio_id, cantidad=5, sucursal_id=None, barbero_id=None, hora_desde=None, hora_hasta=None,
+                      fecha_desde=None):
+    """Los `cantidad` horarios libres más tempranos para el servicio, entre los barberos elegidos.
+
+    Devuelve [{'barbero_id', 'barbero', 'sucursal_id', 'fecha', 'hora', 'fin'}] en orden de inicio.
+    Lanza ValueError con el mensaje para el cliente."""
+    try:
+        servicio_id = int(servicio_id)
+        cantidad = min(int(cantidad or 5), current_app.config['BUSQUEDA_MAX_RESULTADOS'])
+        sucursal_id = int(sucursal_id) if sucursal_id else None
+        barbero_id = int(barbero_id) if barbero_id else None
+        franja = (_hora(hora_desde, '00:00'), _hora(hora_hasta, '23:59')) if hora_desde or hora_hasta else None
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        inicio = max(hoy, datetime.strptime(fecha_desde, '%Y-%m-%d')) if fecha_desde else hoy
+    except (ValueError, TypeError):
+        raise ValueError("Parámetros de búsqueda inválidos.")
+    if cantidad < 1:
+        raise ValueError("La cantidad debe ser al menos 1.")
+
+    servicio = db.session.get(Servicio, servicio_id)
+    if servicio is None:
+        raise ValueError("El servicio no existe.")
+    minutos = timedelta(minutes=servicio.duracion_minutos or 30)
+
+    consulta = db.select(Empleado.id, Empleado.nombre, Empleado.sucursal_id)
+    if barbero_id:
+        consulta = consulta.where(Empleado.id == barbero_id)
+    if sucursal_id:
+        consulta = consulta.where(Empleado.sucursal_id == sucursal_id)
+    barberos = {e.id: e for e in db.session.execute(consulta)}
+    if not barberos:
+        return []
+
+    ahora = datetime.now() + timedelta(minutes=current_app.config['BUSQUEDA_ANTICIPACION'])
+    paso = current_app.config['BUSQUEDA_PASO_MINUTOS']
+    tramo = timedelta(days=current_app.config['BUSQUEDA_TRAMO_DIAS'])
+    limite = inicio + timedelta(days=current_app.config['BUSQUEDA_MAX_DIAS'])
+    encontrados = []
+    while inicio < limite and len(encontrados) < cantidad:
+        fin = min(inicio + tramo, limite)
+        ventanas = _ventanas(inicio, fin, ahora, franja)
+        if ventanas:
+            ocupados = intervalos_ocupados(list(barberos), inicio, fin)
+            por_barbero = [_inicios(b, intervalos_libres(ocupados[b], ventanas), minutos, paso) for b in barberos]
+            encontrados.extend(islice(heapq.merge(*por_barbero), cantidad - len(encontrados)))
+        inicio = fin
+
+    return [{
+        'barbero_id': b,
+        'barbero': barberos[b].nombre,
+        'sucursal_id': barberos[b].sucursal_id,
+        'fecha': momento.strftime('%Y-%m-%d'),
+        'hora': momento.strftime('%H:%M'),
+        'fin': (momento + minutos).strftime('%H:%M')
+    } for momento, b in encontrados]
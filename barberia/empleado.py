@@ -0,0 +1,261 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from barberia.extensiones import db
+from barberia.modelos import Producto, Turno, Servicio, TurnoAdicional, BloqueoDisponibilidad
+from barberia.utilidades import perfil_empleado, json_condicional
+from barberia.eventos import publicar_turno, estado_previo, flujo_eventos
+from barberia.agenda import completar, reemplazar_adicionales, crear_bloqueo, hueco_de, llenar_hueco
+
+bp = Blueprint('empleado', __name__)
+
+# --- DASHBOARD EMPLEADO (BARBERO) ---
+@bp.route('/empleado/dashboard')
+def empleado_dashboard():
+    if 'usuario_id' not in session or session.get('rol') != 'empleado':
+        return redirect(url_for('auth.login'))
+    
+    empleado = perfil_empleado()
+    ahora = datetime.now()
+    hace_90_dias = ahora - timedelta(days=90)
+    
+    # --- 1. GESTIÓN DE FECHA SELECCIONADA ---
+    fecha_query = request.args.get('fecha', ahora.strftime('%Y-%m-%d'))
+    fecha_dt = datetime.strptime(fecha_query, '%Y-%m-%d').date()
+    
+    # Generar lista de 7 días para el selector (Mismo estilo que Admin)
+    dias_semana = []
+    nombres_es = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+    for i in range(7):
+        d = ahora.date() + timedelta(days=i)
+        dias_semana.append({
+            'fecha': d.strftime('%Y-%m-%d'),
+            'nombre': nombres_es[d.weekday()],
+            'numero': d.day
+        })
+
+    # --- 2. HISTORIAL Y COMISIONES (Se mantiene igual) ---
+    turnos_completados = Turno.query.filter(
+        Turno.empleado_id == empleado['id'],
+        Turno.estado == 'completado',
+        Turno.fecha_hora >= hace_90_dias
+    ).order_by(Turno.fecha_hora.desc()).all()
+
+    valor_comision = empleado['comision_porcentaje'] if empleado['comision_porcentaje'] else 70.0
+    porcentaje = valor_comision / 100
+    mensual_estimado = 0
+    servicios_totales_mes = 0
+    historial_semanal = {}
+
+    for t in turnos_completados:
+        monto_comisionable = t.servicio.precio if t.servicio else 0
+        servicios_nombres = [t.servicio.nombre] if t.servicio else []
+        
+        adicionales = TurnoAdicional.query.filter_by(turno_id=t.id).all()
+        for ad in adicionales:
+            if ad.tipo == 'servicio':
+                monto_comisionable += ad.precio
+                servicios_nombres.append(ad.nombre)
+
+        comision_turno = monto_comisionable * porcentaje
+        
+        if t.fecha_hora.month == ahora.month and t.fecha_hora.year == ahora.year:
+            mensual_estimado += comision_turno
+            servicios_totales_mes += 1
+
+        semana_key = t.fecha_hora.strftime('%U - %Y')
+        dia_key = t.fecha_hora.strftime('%A %d/%m')
+
+        if semana_key not in historial_semanal:
+            historial_semanal[semana_key] = {'total_servicios_semana': 0, 'comision_total': 0, 'detalles_dias': {}}
+        
+        S = historial_semanal[semana_key]
+        S['total_servicios_semana'] += 1
+        S['comision_total'] += comision_turno
+
+        if dia_key not in S['detalles_dias']:
+            S['detalles_dias'][dia_key] = {'servicios_lista': [], 'cantidad_dia': 0}
+        
+        S['detalles_dias'][dia_key]['cantidad_dia'] += 1
+        S['detalles_dias'][dia_key]['servicios_lista'].append({
+            'hora': t.fecha_hora.strftime('%H:%M'),
+            'servicios': ", ".join(servicios_nombres),
+            'ganancia': round(comision_turno, 2)
+        })
+
+    # --- 3. AGENDA FILTRADA (Usamos fecha_dt en lugar de ahora.date()) ---
+    turnos_filtrados = Turno.query.filter(
+        Turno.empleado_id == empleado['id'],
+        db.func.date(Turno.fecha_hora) == fecha_dt, # <--- Cambio clave
+        Turno.estado.in_(['pendiente', 'completado'])
+    ).order_by(Turno.fecha_hora.asc()).all()
+    
+    for t in turnos_filtrados:
+        total_acumulado = float(t.servicio.precio if t.servicio else 0)
+        adicionales_hoy = TurnoAdicional.query.filter_by(turno_id=t.id).all()
+        for ad in adicionales_hoy:
+            total_acumulado += float(ad.precio)
+        t.precio_visual_total = total_acumulado
+
+    # --- 4. BLOQUEOS Y CONTADORES ---
+    bloqueos_activos = BloqueoDisponibilidad.query.filter_by(empleado_id=empleado['id']).all()
+    pendientes = len([t for t in turnos_filtrados if t.estado == 'pendiente'])
+    completados = len([t for t in turnos_filtrados if t.estado == 'completado'])
+
+    return render_template('empleado_dashboard.html', 
+        empleado=empleado,
+        turnos=turnos_filtrados, # Pasamos los turnos de la fecha elegida
+        dias_semana=dias_semana, # Para el selector
+        fecha_actual=fecha_query, # Para marcar el día activo en el HTML
+        hoy_str=fecha_dt.strftime('%d/%m/%Y'), # Fecha formateada para el título
+        pendientes=pendientes,
+        completados=completados,
+        total_hoy=len(turnos_filtrados),
+        mensual_estimado=round(mensual_estimado, 2),
+        servicios_totales=servicios_totales_mes,
+        porcentaje_aplicado=int(valor_comision),
+        historial_semanal=historial_semanal,
+        productos=Producto.query.filter(Producto.stock > 0).all(),
+        servicios_extra=Servicio.query.all(),
+        bloqueos_activos=bloqueos_activos
+    )
+
+# --- AGENDA EN TIEMPO REAL (SSE) ---
+@bp.route('/empleado/eventos')
+def empleado_eventos():
+    if 'usuario_id' not in session or session.get('rol') != 'empleado':
+        return redirect(url_for('auth.login'))
+    empleado = perfil_empleado()
+    if empleado is None:
+        return redirect(url_for('auth.login'))
+
+    # Solo los turnos que entran o salen de su propia agenda
+    empleado_id = empleado['id']
+    return flujo_eventos(lambda e: e['empleado_id'] == empleado_id
+                         or e.get('antes', {}).get('empleado_id') == empleado_id)
+
+@bp.route('/empleado/add-multiple-extra', methods=['POST'])
+def add_extra():
+    turno_id = request.form.get('turno_id')
+    prod_id = request.form.get('producto_id')
+    serv_id = request.form.get('servicio_id')
+
+    if prod_id:
+        p = Producto.query.get(prod_id)
+        nuevo_extra = TurnoAdicional(turno_id=turno_id, tipo='producto', item_id=p.id, nombre=p.nombre, precio=p.precio)
+        p.stock -= 1 # Descontar del inventario
+        db.session.add(nuevo_extra)
+    
+    if serv_id:
+        s = Servicio.query.get(serv_id)
+        nuevo_extra = TurnoAdicional(turno_id=turno_id, tipo='servicio', item_id=s.id, nombre=s.nombre, precio=s.precio)
+        db.session.add(nuevo_extra)
+
+    db.session.commit()
+    flash("Adicional agregado correctamente", "exito")
+    return redirect(url_for('empleado.empleado_dashboard'))
+
+@bp.route('/completar-turno/<int:id>', methods=['POST'])
+def completar_turno(id):
+    turno = Turno.query.get_or_404(id)
+    if turno.estado == 'completado':
+        return redirect(url_for('empleado.empleado_dashboard'))
+
+    antes = estado_previo(turno)
+    puntos = completar(turno, request.form.get('producto_extra'))
+    if puntos:
+        flash(f"Turno finalizado. ¡Cliente ganó {puntos} puntos!", "exito")
+    else:
+        flash("Turno finalizado con éxito.", "exito")
+
+    db.session.commit()
+    publicar_turno('completado', turno, antes)
+    return redirect(url_for('empleado.empleado_dashboard'))
+
+@bp.route('/guardar_extras_multiples', methods=['POST'])
+def guardar_extras_multiples():
+    data = request.get_json()
+    turno_id = data.get('turno_id')
+    extras = data.get('extras', []) 
+
+    try:
+        turno = Turno.query.get_or_404(turno_id)
+        monto_acumulado = reemplazar_adicionales(turno, extras)
+        db.session.commit()
+        return jsonify({"success": True, "nuevo_total": round(monto_acumulado, 2)})
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route('/get_extras_turno/<int:turno_id>')
+def get_extras_turno(turno_id):
+    try:
+        # Buscamos en la tabla unificada
+        adicionales = TurnoAdicional.query.filter_by(turno_id=turno_id).all()
+        lista_final = []
+        for a in adicionales:
+            lista_final.append({
+                "id": a.item_id,
+                "nombre": a.nombre,
+                "tipo": a.tipo
+            })
+        return json_condicional({"extras": lista_final})
+    except Exception as e:
+        return jsonify({"extras": []})
+
+@bp.route('/empleado/inasistencia/<int:id>', methods=['POST'])
+def inasistencia_empleado(id):
+    if session.get('rol') != 'empleado':
+        return redirect(url_for('auth.login'))
+    
+    t = Turno.query.get_or_404(id)
+    antes = estado_previo(t)
+    t.estado = 'inasistencia'
+    db.session.commit()
+    publicar_turno('inasistencia', t, antes)
+    if antes['estado'] == 'pendiente':
+        llenar_hueco(hueco_de(t))
+    
+    flash(f"Inasistencia registrada para el cliente: {t.nombre_cliente}", "exito")
+    return redirect(url_for('empleado.empleado_dashboard'))
+
+@bp.route('/empleado/bloquear-disponibilidad', methods=['POST'])
+def bloquear_disponibilidad():
+    if session.get('rol') != 'empleado':
+        return redirect(url_for('auth.login'))
+    
+    empleado = perfil_empleado()
+    fecha = request.form.get('fecha_bloqueo')
+    if not fecha:
+        flash("Debes seleccionar una fecha obligatoriamente.", "error")
+        return redirect(url_for('empleado.empleado_dashboard'))
+    dia_completo = 'dia_completo' in request.form
+
+    try:
+        crear_bloqueo(empleado['id'], fecha, request.form.get('hora_inicio'), request.form.get('hora_fin'),
+                      dia_completo, request.form.get('motivo'))
+        db.session.commit()
+        flash("Horario bloqueado correctamente.", "exito")
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), "error")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error al guardar el bloqueo: {str(e)}", "error")
+    
+    return redirect(url_for('empleado.empleado_dashboard'))
+
+@bp.route('/empleado/eliminar-bloqueo/<int:id>', methods=['POST'])
+def eliminar_bloqueo(id):
+    if session.get('rol') != 'empleado':
+        return redirect(url_for('auth.login'))
+    
+    bloqueo = BloqueoDisponibilidad.query.get_or_404(id)
+    empleado = perfil_empleado()
+    
+    if bloqueo.empleado_id == empleado['id']:
+        db.session.delete(bloqueo)
+        db.session.commit()
+        flash("Disponibilidad restaurada.", "exito")
+    
+    return redirect(url_for('empleado.empleado_dashboard'))
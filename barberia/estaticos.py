@@ -0,0 +1,97 @@
+import os
+import time
+import gzip
+import hashlib
+import mimetypes
+from flask import request, session, url_for, current_app, send_from_directory, g
+
+_huellas_estaticos = {}
+
+def static_url(filename):
+    # URL con huella del contenido: cambia solo cuando cambia el archivo
+    ruta = os.path.join(current_app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(ruta)
+    except OSError:
+        return url_for('static', filename=filename)
+
+    # Si build_assets.py generó una versión minificada al día, usamos esa
+    ruta_dist = os.path.join(current_app.static_folder, 'dist', filename)
+    if os.path.isfile(ruta_dist) and os.path.getmtime(ruta_dist) >= mtime:
+        filename, ruta, mtime = 'dist/' + filename, ruta_dist, os.path.getmtime(ruta_dist)
+
+    huella = _huellas_estaticos.get(filename)
+    if huella is None or huella[0] != mtime:
+        with open(ruta, 'rb') as f:
+            huella = (mtime, hashlib.md5(f.read()).hexdigest()[:10])
+        _huellas_estaticos[filename] = huella
+    return url_for('static', filename=filename, v=huella[1])
+
+def servir_estatico(filename):
+    # Variante precomprimida (.br/.gz) si el navegador la acepta y existe en disco
+    ruta = os.path.join(current_app.static_folder, filename)
+    for codificacion, extension in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[codificacion] and os.path.isfile(ruta + extension):
+            response = send_from_directory(current_app.static_folder, filename + extension,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers["Content-Encoding"] = codificacion
+            response.vary.add("Accept-Encoding")
+            return response
+
+    response = current_app.send_static_file(filename)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def add_header(response):
+    if request.endpoint == 'static':
+        if request.args.get('v'):
+            response.headers["Cache-Control"] = f"public, max-age={current_app.config['STATIC_CACHE_INMUTABLE']}, immutable"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={current_app.config['STATIC_CACHE_SIN_HUELLA']}"
+        return response
+
+    # Las vistas que definen su propia política (p.ej. JSON con ETag) se respetan
+    if "Cache-Control" in response.headers:
+        return response
+
+    if 'usuario_id' in session:
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def recordar_escritura(response):
+    if g.get('hubo_escritura') and 'usuario_id' in session:
+        session['_ultima_escritura'] = time.time()
+    return response
+
+def comprimir_respuesta(response):
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in current_app.config['COMPRESS_MIMETYPES']
+            or not request.accept_encodings['gzip']):
+        return response
+
+    datos = response.get_data()
+    if len(datos) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    response.set_data(gzip.compress(datos, compresslevel=current_app.config['COMPRESS_LEVEL']))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    # El cuerpo cambió de bytes: el ETag pasa a ser débil para seguir validando con 304
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    app.add_template_global(static_url)
+    app.view_functions['static'] = servir_estatico
+    app.after_request(add_header)
+    app.after_request(recordar_escritura)
+    app.after_request(comprimir_respuesta)
@@ -0,0 +1,164 @@
+import logging
+import json
+import time
+import queue
+import threading
+from flask import current_app, Response
+from barberia.metricas import contar
+
+log = logging.getLogger(__name__)
+
+# Cambios de agenda en tiempo real (server-sent events).
+# Las vistas publican un evento por turno después del commit; los tableros del
+# barbero y del panel lo reciben por /empleado/eventos y /admin/eventos y
+# actualizan solo la fila afectada, sin recargar la página.
+
+
+class BusEventos:
+    """Reparto en memoria: cada suscriptor (una conexión SSE) tiene su propia cola acotada."""
+
+    def __init__(self, max_cola=100):
+        self.max_cola = max_cola
+        self.suscriptores = set()
+        self.lock = threading.Lock()
+
+    def suscribir(self):
+        cola = queue.Queue(maxsize=self.max_cola)
+        with self.lock:
+            self.suscriptores.add(cola)
+        return cola
+
+    def desuscribir(self, cola):
+        with self.lock:
+            self.suscriptores.discard(cola)
+
+    def publicar(self, evento):
+        self._repartir(evento)
+
+    def _repartir(self, evento):
+        with self.lock:
+            colas = list(self.suscriptores)
+        for cola in colas:
+            try:
+                cola.put_nowait(evento)
+            except queue.Full:
+                # Cliente lento: se vacía su cola y se le pide recargar en lugar de bloquear al resto
+                try:
+                    while True:
+                        cola.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    cola.put_nowait({'tipo': 'resincronizar'})
+                except queue.Full:
+                    pass  # otro publicador la volvió a llenar; al desbordar de nuevo recibirá el aviso
+
+
+class BusEventosRedis(BusEventos):
+    """Reparto entre workers y nodos: se publica en un canal de Redis y cada
+    proceso reenvía lo recibido a sus suscriptores locales."""
+
+    def __init__(self, url, canal='barberia:agenda', max_cola=100):
+        import redis  # Dependencia opcional, solo si EVENTOS_BACKEND='redis'
+        super().__init__(max_cola)
+        self.cliente = redis.Redis.from_url(url)
+        self.canal = canal
+        self.hilo = None
+
+    def suscribir(self):
+        # El hilo lector arranca con el primer suscriptor; los procesos que solo publican no lo necesitan
+        with self.lock:
+            if self.hilo is None:
+                self.hilo = threading.Thread(target=self._escuchar, name='eventos-redis', daemon=True)
+                self.hilo.start()
+        return super().suscribir()
+
+    def publicar(self, evento):
+        self.cliente.publish(self.canal, json.dumps(evento, separators=(',', ':')))
+
+    def _escuchar(self):
+        while True:
+            try:
+                pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.canal)
+                for mensaje in pubsub.listen():
+                    self._repartir(json.loads(mensaje['data']))
+            except Exception:
+                log.exception("Error en el bus de eventos (Redis)")
+                # Lo publicado mientras tanto se perdió: los tableros recargan su agenda
+                self._repartir({'tipo': 'resincronizar'})
+                time.sleep(1)
+
+
+def init_app(app):
+    if app.config['EVENTOS_BACKEND'] == 'redis':
+        bus = BusEventosRedis(app.config['EVENTOS_STORAGE_URL'], max_cola=app.config['EVENTOS_MAX_COLA'])
+    else:
+        bus = BusEventos(max_cola=app.config['EVENTOS_MAX_COLA'])
+    app.extensions['eventos'] = bus
+
+
+def publicar_turno(tipo, turno, antes=None):
+    """Publica el estado nuevo de `turno`. `antes` = {'estado', 'fecha', 'empleado_id', 'sucursal_id'}
+    previo al cambio, para que los tableros muevan la fila y ajusten sus contadores."""
+    try:
+        contar('barberia_turnos_total', tipo)
+        evento = {
+            'tipo': tipo,
+            'id': turno.id,
+            'estado': turno.estado,
+            'empleado_id': turno.empleado_id,
+            'sucursal_id': turno.barbero.sucursal_id if turno.barbero else None,
+            'fecha': turno.fecha_hora.strftime('%Y-%m-%d'),
+            'hora': turno.fecha_hora.strftime('%H:%M'),
+            'cliente': turno.nombre_cliente,
+            'servicio': turno.servicio.nombre if turno.servicio else 'N/A',
+            'total': float(turno.total_pagado or (turno.servicio.precio if turno.servicio else 0))
+        }
+        if antes:
+            evento['antes'] = antes
+        current_app.extensions['eventos'].publicar(evento)
+    except Exception:
+        # El cambio ya está guardado; un fallo del bus no debe romper la petición
+        log.exception("Error publicando evento de turno", extra={'turno_id': turno.id, 'evento': tipo})
+
+
+def estado_previo(turno):
+    return {
+        'estado': turno.estado,
+        'fecha': turno.fecha_hora.strftime('%Y-%m-%d'),
+        'empleado_id': turno.empleado_id,
+        'sucursal_id': turno.barbero.sucursal_id if turno.barbero else None
+    }
+
+
+def flujo_eventos(filtro):
+    """Respuesta SSE con los eventos que pasan `filtro(evento)`.
+
+    Cada conexión ocupa un hilo del worker: el pool del panel debe correr con
+    hilos (gunicorn -k gthread --threads N). La conexión se cierra tras
+    SSE_DURACION_MAX segundos y el navegador (EventSource) reconecta solo."""
+    bus = current_app.extensions['eventos']
+    espera = current_app.config['SSE_KEEPALIVE']
+    duracion = current_app.config['SSE_DURACION_MAX']
+
+    def generar():
+        cola = bus.suscribir()
+        try:
+            yield "retry: 3000\n\n"
+            fin = time.monotonic() + duracion
+            while time.monotonic() < fin:
+                try:
+                    evento = cola.get(timeout=espera)
+                except queue.Empty:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": ping\n\n"
+                    continue
+                if evento['tipo'] == 'resincronizar' or filtro(evento):
+                    yield f"event: turno\ndata: {json.dumps(evento, separators=(',', ':'))}\n\n"
+        finally:
+            bus.desuscribir(cola)
+
+    # Sin stream_with_context: el contexto (y la conexión a la BD) se libera antes de empezar a transmitir
+    return Response(generar(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,139 @@
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from functools import partial
+from flask import g, has_app_context, current_app
+from flask_mail import Mail
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as SesionSQLAlchemy
+from itsdangerous import URLSafeTimedSerializer
+from sqlalchemy import event
+from barberia.metricas import contar
+from barberia.bitacora import id_peticion
+
+log = logging.getLogger(__name__)
+
+
+class SesionConReplica(SesionSQLAlchemy):
+    """Envía las lecturas de las rutas marcadas con @lectura_replica al motor 'replica'."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_app_context() and g.get('usar_replica')
+                and not self._flushing and not getattr(clause, 'is_dml', False)):
+            engine = self._db.engines.get('replica')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': SesionConReplica})
+mail = Mail()
+
+
+def configurar_sqlite(config, dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection) or not config['SQLITE_TUNING']:
+        return
+    cursor = dbapi_connection.cursor()
+    # WAL: los lectores no bloquean al escritor ni viceversa
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # Varios workers comparten el archivo: esperamos el lock en vez de fallar con "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}")
+    # Con WAL, NORMAL es seguro ante caídas de la app (solo arriesga la última transacción si cae el SO)
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size={config['SQLITE_CACHE_SIZE']}")
+    cursor.execute(f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    # Igual que en Postgres: no se permiten filas huérfanas
+    if config['SQLITE_FOREIGN_KEYS']:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@event.listens_for(SesionConReplica, 'after_flush')
+def _marcar_escritura(sesion_db, contexto):
+    # Lectura tras escritura: el resto de la petición (y las siguientes del usuario) van al primario
+    if has_app_context():
+        g.usar_replica = False
+        g.hubo_escritura = True
+
+
+def init_app(app):
+    db.init_app(app)
+    mail.init_app(app)
+    app.extensions['cola_correo'] = ColaCorreo(app)
+    # Los motores se crean en db.init_app; cada uno aplica el perfil SQLite de esta app
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'connect', partial(configurar_sqlite, app.config))
+
+
+def serializador():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+
+
+# Función para envío asíncrono
+def send_async_email(app, msg):
+    with app.app_context():
+        try:
+            mail.send(msg)
+            contar('barberia_correos_total', 'enviado')
+            log.info("Correo enviado", extra={'asunto': msg.subject})
+        except Exception:
+            contar('barberia_correos_total', 'error')
+            log.exception("Error enviando correo", extra={'asunto': msg.subject})
+
+
+class ColaCorreo:
+    """Avisos automáticos en lote: un hilo junta hasta CORREO_LOTE_MAX mensajes durante
+    CORREO_LOTE_ESPERA segundos y los envía por una sola conexión SMTP."""
+
+    def __init__(self, app):
+        self.app = app
+        self.cola = queue.Queue()
+        self.hilo = None
+        self.lock = threading.Lock()
+
+    def encolar(self, msg):
+        with self.lock:
+            if self.hilo is None:
+                self.hilo = threading.Thread(target=self._trabajar, name='cola-correo', daemon=True)
+                self.hilo.start()
+        # Con el id de la petición que lo generó, para seguir el aviso en los logs
+        self.cola.put((msg, id_peticion.get()))
+
+    def _trabajar(self):
+        while True:
+            lote = [self.cola.get()]
+            fin = time.monotonic() + self.app.config['CORREO_LOTE_ESPERA']
+            while len(lote) < self.app.config['CORREO_LOTE_MAX']:
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self.cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+            self._enviar(lote)
+
+    def _enviar(self, lote):
+        with self.app.app_context():
+            ids = [i for _, i in lote if i]
+            if not self.app.config.get('MAIL_USERNAME') and not self.app.config.get('MAIL_SUPPRESS_SEND'):
+                contar('barberia_correos_total', 'sin_configurar', valor=len(lote))
+                log.warning("Correo sin configurar: %s avisos sin enviar", len(lote), extra={'ids_peticion': ids})
+                return
+            try:
+                with mail.connect() as conexion:
+                    for msg, _ in lote:
+                        conexion.send(msg)
+                contar('barberia_correos_total', 'enviado', valor=len(lote))
+                log.info("Correos enviados: %s", len(lote), extra={'ids_peticion': ids})
+            except Exception:
+                contar('barberia_correos_total', 'error', valor=len(lote))
+                log.exception("Error enviando lote de %s correos", len(lote), extra={'ids_peticion': ids})
+
+
+def encolar_correo(msg):
+    current_app.extensions['cola_correo'].encolar(msg)
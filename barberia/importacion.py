@@ -0,0 +1,228 @@
+"""Importación masiva de servicios, productos y clientes desde CSV o XLSX.
+
+Las filas se leen en streaming (csv / openpyxl en modo read_only), se validan,
+se descartan los duplicados (por nombre o email, dentro del archivo y contra la
+base) y se insertan de a IMPORTACION_LOTE filas con un INSERT por lote
+(executemany). Cada lote se confirma por separado: si la importación se corta,
+volver a correrla salta lo ya insertado como duplicado.
+
+Las contraseñas de los clientes se hashean en un pool de procesos. Un cliente
+sin contraseña queda con una marca que no valida ningún login y entra por
+"recuperar contraseña". Con simular=True solo se valida y se devuelve el
+reporte de errores por fila.
+
+    flask --app app importar clientes clientes.csv --simular
+"""
+import io
+import re
+import csv
+import unicodedata
+import multiprocessing
+from functools import partial
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash
+from barberia.extensiones import db
+from barberia.modelos import Usuario, Servicio, Producto
+from barberia.seguridad import validar_password
+
+# No es un hash válido: check_password_hash siempre devuelve False
+PASSWORD_SIN_DEFINIR = '!importado'
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def _texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def _columna(nombre):
+    # 'Duración ' -> 'duracion'
+    nombre = unicodedata.normalize('NFKD', _texto(nombre).lower())
+    return ''.join(c for c in nombre if not unicodedata.combining(c)).replace(' ', '_')
+
+
+def leer_filas(archivo, nombre):
+    """Genera (número de fila, {columna: valor}) de un CSV o XLSX; la fila 1 es el encabezado."""
+    if nombre.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook  # la misma dependencia que usan los reportes en Excel
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezado = [_columna(c) for c in next(filas, ())]
+            for numero, fila in enumerate(filas, start=2):
+                if any(_texto(v) for v in fila):
+                    yield numero, dict(zip(encabezado, fila))
+        finally:
+            libro.close()
+        return
+
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    primera = texto.readline()
+    # Excel en español guarda los CSV con ';'
+    separador = ';' if primera.count(';') > primera.count(',') else ','
+    lector = csv.reader(chain([primera], texto), delimiter=separador)
+    encabezado = [_columna(c) for c in next(lector, [])]
+    for numero, fila in enumerate(lector, start=2):
+        if any(_texto(v) for v in fila):
+            yield numero, dict(zip(encabezado, fila))
+
+
+def _obligatorio(fila, campo):
+    valor = _texto(fila.get(campo))
+    if not valor:
+        raise ValueError(f"Falta '{campo}'")
+    return valor
+
+
+def _numero(fila, campo, tipo, defecto=None, minimo=0):
+    valor = _texto(fila.get(campo))
+    if not valor:
+        if defecto is None:
+            raise ValueError(f"Falta '{campo}'")
+        return defecto
+    try:
+        numero = float(valor.replace(',', '.'))
+    except ValueError:
+        raise ValueError(f"'{campo}' no es un número: {valor}")
+    if tipo is int and not numero.is_integer():
+        raise ValueError(f"'{campo}' debe ser entero: {valor}")
+    if numero < minimo:
+        raise ValueError(f"'{campo}' debe ser al menos {minimo}")
+    return tipo(numero)
+
+
+def _servicio(fila):
+    nombre = _obligatorio(fila, 'nombre')
+    return nombre.casefold(), {
+        'nombre': nombre,
+        'precio': _numero(fila, 'precio', float),
+        'duracion_minutos': _numero(fila, 'duracion', int, defecto=30, minimo=1)
+    }
+
+
+def _producto(fila):
+    nombre = _obligatorio(fila, 'nombre')
+    return nombre.casefold(), {
+        'nombre': nombre,
+        'precio': _numero(fila, 'precio', float),
+        'stock': _numero(fila, 'stock', int, defecto=0),
+        'unidad': _texto(fila.get('unidad')) or 'uds'
+    }
+
+
+def _cliente(fila):
+    email = _obligatorio(fila, 'email').lower()
+    if not EMAIL.match(email):
+        raise ValueError(f"Email inválido: {email}")
+    password = _texto(fila.get('password'))
+    if password:
+        val = validar_password(password)
+        if val is not True:
+            raise ValueError(f"Contraseña: {val}")
+    return email, {
+        'nombre': _obligatorio(fila, 'nombre'),
+        'email': email,
+        'password': password,
+        'rol': 'cliente',
+        'confirmado': True,
+        'puntos_acumulados': _numero(fila, 'puntos', int, defecto=0)
+    }
+
+
+def _nombres_existentes(modelo):
+    # Catálogos chicos: se cargan enteros una vez (lower() de la BD no entiende acentos en SQLite)
+    nombres = {n.casefold() for n in db.session.scalars(db.select(modelo.nombre))}
+    return lambda claves: claves & nombres
+
+
+def _emails_existentes(claves):
+    return set(db.session.scalars(db.select(Usuario.email).where(Usuario.email.in_(list(claves)))))
+
+
+# tipo -> (modelo, validador de fila, fábrica de la búsqueda de claves ya existentes)
+TIPOS = {
+    'servicios': (Servicio, _servicio, lambda: _nombres_existentes(Servicio)),
+    'productos': (Producto, _producto, lambda: _nombres_existentes(Producto)),
+    'clientes': (Usuario, _cliente, lambda: _emails_existentes),
+}
+
+
+def _hashear(pool, filas):
+    con_password = [f for f in filas if f['password']]
+    if con_password:
+        hashear = partial(generate_password_hash, method=current_app.config['PASSWORD_HASH_METHOD'],
+                          salt_length=current_app.config['PASSWORD_SALT_LENGTH'])
+        trozo = max(1, len(con_password) // (current_app.config['IMPORTACION_PROCESOS'] * 4))
+        for fila, hash_ in zip(con_password, pool.map(hashear, [f['password'] for f in con_password], chunksize=trozo)):
+            fila['password'] = hash_
+    for fila in filas:
+        if not fila['password']:
+            fila['password'] = PASSWORD_SIN_DEFINIR
+
+
+def importar(tipo, archivo, nombre_archivo, simular=False):
+    """Importa un archivo CSV/XLSX de `tipo` ('servicios', 'productos' o 'clientes').
+
+    Devuelve el reporte: filas leídas, válidas, insertadas y errores por fila."""
+    modelo, validar, fabrica_existentes = TIPOS[tipo]
+    existentes = fabrica_existentes()
+    tamano_lote = current_app.config['IMPORTACION_LOTE']
+    max_errores = current_app.config['IMPORTACION_MAX_ERRORES']
+    reporte = {'tipo': tipo, 'simulacion': simular, 'filas': 0, 'validas': 0, 'insertadas': 0,
+               'total_errores': 0, 'errores': []}
+
+    def error(numero, motivo):
+        reporte['total_errores'] += 1
+        if len(reporte['errores']) < max_errores:
+            reporte['errores'].append({'fila': numero, 'error': motivo})
+
+    pool = None
+    if tipo == 'clientes' and not simular:
+        # spawn: el worker web tiene hilos (pool de hashes, SSE) y hacer fork con hilos vivos no es seguro
+        pool = ProcessPoolExecutor(max_workers=current_app.config['IMPORTACION_PROCESOS'],
+                                   mp_context=multiprocessing.get_context('spawn'))
+    vistas = {}  # clave -> primera fila donde apareció
+    filas = leer_filas(archivo, nombre_archivo)
+    try:
+        while True:
+            bloque = list(islice(filas, tamano_lote))
+            if not bloque:
+                break
+            validas = []
+            for numero, fila in bloque:
+                reporte['filas'] += 1
+                try:
+                    clave, valores = validar(fila)
+                except ValueError as e:
+                    error(numero, str(e))
+                    continue
+                if clave in vistas:
+                    error(numero, f"Duplicado de la fila {vistas[clave]}")
+                    continue
+                vistas[clave] = numero
+                validas.append((numero, clave, valores))
+
+            ya_existen = existentes({clave for _, clave, _ in validas}) if validas else set()
+            nuevas = []
+            for numero, clave, valores in validas:
+                if clave in ya_existen:
+                    error(numero, f"Ya existe: {clave}")
+                else:
+                    nuevas.append(valores)
+            reporte['validas'] += len(nuevas)
+
+            if nuevas and not simular:
+                if pool is not None:
+                    _hashear(pool, nuevas)
+                db.session.execute(db.insert(modelo), nuevas)
+                db.session.commit()
+                reporte['insertadas'] += len(nuevas)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    reporte['errores'].sort(key=lambda e: e['fila'])
+    return reporte
@@ -0,0 +1,168 @@
+"""Lista de espera: los huecos que deja un turno cancelado se vuelven a llenar solos.
+
+Un pedido de espera indica cliente, barbero (o cualquiera de una sede o de la
+cadena), servicio y una ventana de días. Cuando un turno se cancela, se
+reprograma o el cliente no llega, `llenar_hueco` busca con el índice
+ix_espera_estado_desde los pedidos abiertos cuya ventana cubre el hueco y cuyo
+servicio cabe en él. Primero van quienes pidieron a ese barbero y luego los
+demás, por antigüedad. El hueco se agenda al primero que se pueda. El cliente
+recibe un aviso por correo (en lote, ver extensiones.ColaCorreo) y puede
+cancelar desde /agendar, lo que vuelve a ofrecer el hueco al siguiente.
+"""
+import logging
+from datetime import datetime, timedelta
+from flask import current_app, url_for, has_request_context
+from flask_mail import Message
+from barberia.extensiones import db, encolar_correo
+from barberia.modelos import ListaEspera, Servicio, Empleado, Sucursal, Usuario, BloqueoDisponibilidad
+from barberia.agenda import reservar_turno
+
+log = logging.getLogger(__name__)
+
+FRANJA_MINUTOS = 15
+
+
+def _proxima_franja(momento):
+    # Redondeo hacia arriba a la franja de 15 minutos (la misma grilla que ofrece agendar.js)
+    base = momento.replace(second=0, microsecond=0)
+    resto = base.minute % FRANJA_MINUTOS
+    if resto or momento > base:
+        base += timedelta(minutes=FRANJA_MINUTOS - resto)
+    return base
+
+
+def crear_espera(cliente_id, nombre_cliente, servicio_id, fecha_desde, fecha_hasta, barbero_id=None, sucursal_id=None):
+    """Anota al cliente en la lista de espera. Lanza ValueError con el mensaje para el cliente."""
+    try:
+        desde = datetime.strptime(fecha_desde, '%Y-%m-%d')
+        hasta = datetime.strptime(fecha_hasta or fecha_desde, '%Y-%m-%d') + timedelta(days=1)
+        servicio_id = int(servicio_id)
+        barbero_id = int(barbero_id) if barbero_id else None
+        sucursal_id = int(sucursal_id) if sucursal_id else None
+    except (ValueError, TypeError):
+        raise ValueError("Fechas o datos de la lista de espera inválidos.")
+
+    if db.session.get(Servicio, servicio_id) is None:
+        raise ValueError("El servicio no existe.")
+    if barbero_id and db.session.get(Empleado, barbero_id) is None:
+        raise ValueError("El barbero no existe.")
+    if sucursal_id and db.session.get(Sucursal, sucursal_id) is None:
+        raise ValueError("La sede no existe.")
+    hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if desde < hoy or hasta <= desde:
+        raise ValueError("La ventana de fechas debe empezar hoy o después.")
+    if (hasta - desde).days > current_app.config['LISTA_ESPERA_MAX_DIAS']:
+        raise ValueError(f"La ventana puede durar como máximo {current_app.config['LISTA_ESPERA_MAX_DIAS']} días.")
+
+    activas = db.session.scalar(db.select(db.func.count()).select_from(ListaEspera).where(
+        ListaEspera.cliente_id == cliente_id, ListaEspera.estado == 'esperando', ListaEspera.hasta > datetime.now()))
+    if activas >= current_app.config['LISTA_ESPERA_MAX_ACTIVAS']:
+        raise ValueError("Ya tienes demasiadas solicitudes en lista de espera.")
+
+    espera = ListaEspera(cliente_id=cliente_id, nombre_cliente=nombre_cliente, servicio_id=servicio_id,
+                         empleado_id=barbero_id, sucursal_id=None if barbero_id else sucursal_id,
+                         desde=desde, hasta=hasta, estado='esperando')
+    db.session.add(espera)
+    db.session.commit()
+    return espera
+
+
+def esperas_activas(cliente_id):
+    return ListaEspera.query.filter(ListaEspera.cliente_id == cliente_id, ListaEspera.estado == 'esperando',
+                                    ListaEspera.hasta > datetime.now()).order_by(ListaEspera.desde).all()
+
+
+def cancelar_espera(espera_id, cliente_id):
+    espera = db.session.get(ListaEspera, espera_id)
+    if espera is None or espera.cliente_id != cliente_id:
+        raise LookupError("Solicitud no encontrada.")
+    if espera.estado == 'esperando':
+        espera.estado = 'cancelado'
+        db.session.commit()
+    return espera
+
+
+def _bloqueado(empleado_id, desde, fin):
+    # El barbero pudo bloquear su agenda justo en ese horario (por eso canceló)
+    for b in BloqueoDisponibilidad.query.filter_by(empleado_id=empleado_id, fecha=desde.strftime('%Y-%m-%d')):
+        if b.dia_completo or ((b.hora_inicio or '00:00') < fin.strftime('%H:%M')
+                              and (b.hora_fin or '23:59') > desde.strftime('%H:%M')):
+            return True
+    return False
+
+
+def candidatos(empleado_id, desde, minutos):
+    """Pedidos en espera que aceptan al barbero, cubren `desde` y cuyo servicio dura hasta `minutos`."""
+    barbero = db.session.get(Empleado, empleado_id)
+    sucursal_id = barbero.sucursal_id if barbero else None
+    acepta_barbero = db.or_(
+        ListaEspera.empleado_id == empleado_id,
+        db.and_(ListaEspera.empleado_id.is_(None),
+                db.or_(ListaEspera.sucursal_id.is_(None), ListaEspera.sucursal_id == sucursal_id)))
+    return (ListaEspera.query.join(Servicio, ListaEspera.servicio_id == Servicio.id)
+            .filter(ListaEspera.estado == 'esperando',
+                    ListaEspera.desde <= desde,
+                    ListaEspera.hasta > desde,
+                    acepta_barbero,
+                    db.func.coalesce(Servicio.duracion_minutos, 30) <= minutos)
+            .order_by(ListaEspera.empleado_id.is_(None), ListaEspera.creado, ListaEspera.id)
+            .limit(current_app.config['LISTA_ESPERA_CANDIDATOS'])
+            .all())
+
+
+def ofrecer_hueco(empleado_id, inicio, fin):
+    """Agenda el hueco [inicio, fin) del barbero al mejor candidato en espera. Devuelve el turno o None."""
+    # Si el hueco ya empezó (inasistencia) o está por empezar, se ofrece lo que queda con algo de aviso
+    desde = max(inicio, _proxima_franja(datetime.now() + timedelta(
+        minutes=current_app.config['LISTA_ESPERA_ANTICIPACION'])))
+    minutos = int((fin - desde).total_seconds() // 60)
+    if minutos <= 0 or _bloqueado(empleado_id, desde, fin):
+        return None
+
+    for espera in candidatos(empleado_id, desde, minutos):
+        duracion = espera.servicio.duracion_minutos or 30
+        if desde + timedelta(minutes=duracion) > espera.hasta:
+            continue
+        # Reserva del pedido: si otro hueco lo tomó a la vez, rowcount es 0 y se pasa al siguiente
+        tomado = db.session.execute(db.update(ListaEspera)
+                                    .where(ListaEspera.id == espera.id, ListaEspera.estado == 'esperando')
+                                    .values(estado='asignado')).rowcount
+        if not tomado:
+            db.session.rollback()
+            continue
+        try:
+            turno, _ = reservar_turno(espera.cliente_id, espera.nombre_cliente, empleado_id, espera.servicio_id,
+                                      desde.strftime('%Y-%m-%d'), desde.strftime('%H:%M'))
+        except ValueError as e:
+            db.session.rollback()
+            log.info("Lista de espera: no se pudo asignar la solicitud %s: %s", espera.id, e)
+            continue
+        espera.turno_id = turno.id
+        db.session.commit()
+        avisar_asignacion(espera, turno)
+        return turno
+    return None
+
+
+def llenar_hueco(empleado_id, inicio, fin):
+    # Nunca falla: el cambio que liberó el hueco ya está guardado
+    try:
+        return ofrecer_hueco(empleado_id, inicio, fin)
+    except Exception:
+        db.session.rollback()
+        log.exception("Error en lista de espera", extra={'empleado_id': empleado_id, 'inicio': inicio})
+        return None
+
+
+def avisar_asignacion(espera, turno):
+    cliente = db.session.get(Usuario, espera.cliente_id)
+    if cliente is None or not cliente.email:
+        return
+    enlace = url_for('reservas.agendar', _external=True) if has_request_context() else '/agendar'
+    msg = Message('Se liberó un turno para ti - Barbero_1999',
+                  sender=current_app.config['MAIL_DEFAULT_SENDER'], recipients=[cliente.email])
+    msg.body = (f"Hola {espera.nombre_cliente}, se liberó un turno de tu lista de espera y ya lo agendamos:\n\n"
+                f"{espera.servicio.nombre} con {turno.barbero.nombre if turno.barbero else 'tu barbero'} "
+                f"el {turno.fecha_hora.strftime('%d/%m/%Y a las %H:%M')}.\n\n"
+                f"Si no puedes asistir, cancélalo aquí para que otro cliente lo aproveche: {enlace}")
+    encolar_correo(msg)
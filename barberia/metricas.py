@@ -0,0 +1,273 @@
+"""Métricas de la aplicación en formato de texto de Prometheus, en /metrics.
+
+Cada proceso lleva sus contadores e histogramas en memoria (un dict y un lock,
+sin E/S en el camino de la petición). Con gunicorn hay un proceso por worker y
+/metrics lo atiende uno cualquiera, así que con METRICAS_DIR cada worker vuelca
+su estado a <METRICAS_DIR>/<pid>.json cada METRICAS_INTERVALO segundos y al
+exportar se suman los archivos de todos. Los contadores de workers que ya
+terminaron se siguen sumando (no deben bajar); los medidores solo se toman de
+procesos vivos. El directorio se vacía al desplegar, igual que el modo
+multiproceso de prometheus_client:
+
+    rm -rf /run/barberia-metricas && mkdir /run/barberia-metricas
+    METRICAS_DIR=/run/barberia-metricas gunicorn -w 8 'barberia:create_app()'
+
+Con ProduccionConfig la app no arranca sin METRICAS_TOKEN; Prometheus lo envía
+como bearer token (authorization.credentials en el scrape_config).
+"""
+import logging
+import os
+import json
+import glob
+import time
+import bisect
+import threading
+from flask import current_app, request, g, Response, abort
+
+log = logging.getLogger(__name__)
+
+CUBETAS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CUBETAS_BD = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+# nombre -> (tipo, ayuda, etiquetas, cubetas)
+DEFINICIONES = {
+    'barberia_http_peticion_segundos': (
+        'histogram', 'Latencia de las peticiones por endpoint', ('endpoint', 'metodo', 'estado'), CUBETAS_HTTP),
+    'barberia_bd_espera_conexion_segundos': (
+        'histogram', 'Espera para obtener una conexión del pool (incluye abrirla)', ('motor',), CUBETAS_BD),
+    'barberia_bd_consultas_total': ('counter', 'Sentencias SQL ejecutadas', ('motor', 'operacion'), None),
+    'barberia_turnos_total': ('counter', 'Cambios de agenda publicados (creado, cancelado, ...)', ('evento',), None),
+    'barberia_respuestas_condicionales_total': (
+        'counter', 'Respuestas JSON con ETag; resultado=hit es un 304 servido de la caché del cliente',
+        ('endpoint', 'resultado'), None),
+    'barberia_correos_total': ('counter', 'Avisos procesados por la cola de correo', ('resultado',), None),
+    'barberia_correo_cola': ('gauge', 'Avisos esperando en la cola de correo', (), None),
+    'barberia_logs_descartados_total': ('counter', 'Registros de log descartados con la cola llena', (), None),
+    'barberia_limite_rechazos_total': (
+        'counter', 'Solicitudes rechazadas por el limitador de intentos', ('endpoint',), None),
+}
+
+
+class Metricas:
+
+    def __init__(self, directorio=None, intervalo=5):
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self.medidores = {}  # nombre -> función sin argumentos, se evalúa al exportar
+        self._reiniciar()
+
+    def _reiniciar(self):
+        # También tras un fork: el worker no hereda lo que contó el proceso maestro
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.contadores = {}
+        self.histogramas = {}
+        self.hilo = None
+
+    def _proceso(self):
+        if os.getpid() != self.pid:
+            self._reiniciar()
+        if self.directorio and self.hilo is None:
+            self.hilo = threading.Thread(target=self._volcar_periodicamente, name='metricas', daemon=True)
+            self.hilo.start()
+
+    def contar(self, nombre, etiquetas=(), valor=1):
+        self._proceso()
+        clave = (nombre, tuple(etiquetas))
+        with self.lock:
+            self.contadores[clave] = self.contadores.get(clave, 0) + valor
+
+    def observar(self, nombre, valor, etiquetas=()):
+        self._proceso()
+        cubetas = DEFINICIONES[nombre][3]
+        clave = (nombre, tuple(etiquetas))
+        # Cubeta de la observación (no acumulado); las dos últimas posiciones son suma y cantidad
+        indice = bisect.bisect_left(cubetas, valor)
+        with self.lock:
+            datos = self.histogramas.get(clave)
+            if datos is None:
+                datos = self.histogramas[clave] = [0] * (len(cubetas) + 3)
+            datos[indice] += 1
+            datos[-2] += valor
+            datos[-1] += 1
+
+    def medir(self, nombre, funcion):
+        self.medidores[nombre] = funcion
+
+    def estado(self):
+        with self.lock:
+            contadores = [[n, list(e), v] for (n, e), v in self.contadores.items()]
+            histogramas = [[n, list(e), list(d)] for (n, e), d in self.histogramas.items()]
+        medidores = []
+        for nombre, funcion in self.medidores.items():
+            try:
+                medidores.append([nombre, [], funcion()])
+            except Exception:
+                log.exception("Error leyendo la métrica %s", nombre)
+        return {'pid': os.getpid(), 'contadores': contadores, 'histogramas': histogramas, 'medidores': medidores}
+
+    def volcar(self):
+        self._proceso()
+        ruta = os.path.join(self.directorio, f"{self.pid}.json")
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w') as f:
+            json.dump(self.estado(), f, separators=(',', ':'))
+        os.replace(temporal, ruta)
+
+    def _volcar_periodicamente(self):
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                self.volcar()
+            except Exception:
+                log.exception("Error volcando métricas")
+
+    def _estados(self):
+        if not self.directorio:
+            return [self.estado()]
+        self.volcar()
+        estados = []
+        for ruta in glob.glob(os.path.join(self.directorio, '*.json')):
+            try:
+                with open(ruta) as f:
+                    estados.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # borrado o a medio escribir por otro proceso
+        return estados
+
+    def sumar(self, nombre):
+        """{etiquetas: valor} del contador `nombre`, sumado entre procesos como en exportar()."""
+        totales = {}
+        for estado in self._estados():
+            for n, etiquetas, valor in estado['contadores']:
+                if n == nombre:
+                    totales[tuple(etiquetas)] = totales.get(tuple(etiquetas), 0) + valor
+        return totales
+
+    def exportar(self):
+        """Texto de Prometheus con la suma de todos los procesos."""
+        contadores, histogramas, medidores = {}, {}, {}
+        for estado in self._estados():
+            for nombre, etiquetas, valor in estado['contadores']:
+                clave = (nombre, tuple(etiquetas))
+                contadores[clave] = contadores.get(clave, 0) + valor
+            for nombre, etiquetas, datos in estado['histogramas']:
+                clave = (nombre, tuple(etiquetas))
+                if clave in histogramas:
+                    histogramas[clave] = [a + b for a, b in zip(histogramas[clave], datos)]
+                else:
+                    histogramas[clave] = datos
+            if _vivo(estado['pid']):
+                for nombre, etiquetas, valor in estado['medidores']:
+                    clave = (nombre, tuple(etiquetas))
+                    medidores[clave] = medidores.get(clave, 0) + valor
+
+        lineas = []
+        for nombre, (tipo, ayuda, nombres_etiquetas, cubetas) in DEFINICIONES.items():
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            if tipo == 'histogram':
+                for (n, etiquetas), datos in sorted(histogramas.items()):
+                    if n != nombre:
+                        continue
+                    acumulado = 0
+                    for limite, cantidad in zip(list(cubetas) + ['+Inf'], datos):
+                        acumulado += cantidad
+                        lineas.append(f"{nombre}_bucket{_etiquetas(nombres_etiquetas, etiquetas, le=limite)} {acumulado}")
+                    lineas.append(f"{nombre}_sum{_etiquetas(nombres_etiquetas, etiquetas)} {datos[-2]}")
+                    lineas.append(f"{nombre}_count{_etiquetas(nombres_etiquetas, etiquetas)} {datos[-1]}")
+            else:
+                valores = contadores if tipo == 'counter' else medidores
+                for (n, etiquetas), valor in sorted(valores.items()):
+                    if n == nombre:
+                        lineas.append(f"{nombre}{_etiquetas(nombres_etiquetas, etiquetas)} {valor}")
+        return '\n'.join(lineas) + '\n'
+
+
+def _vivo(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _etiquetas(nombres, valores, le=None):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if le is not None:
+        pares.append(f'le="{le}"')
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def contar(nombre, *etiquetas, valor=1):
+    current_app.extensions['metricas'].contar(nombre, etiquetas, valor)
+
+
+def _medir_conexiones(metricas, motor, engine):
+    # No hay evento de "pidiendo conexión": se envuelve raw_connection, que es por donde pasan
+    # engine.connect() y las sesiones (sobrevive a engine.dispose(), que solo cambia el pool)
+    original = engine.raw_connection
+
+    def raw_connection():
+        inicio = time.perf_counter()
+        try:
+            return original()
+        finally:
+            metricas.observar('barberia_bd_espera_conexion_segundos', time.perf_counter() - inicio, (motor,))
+    engine.raw_connection = raw_connection
+
+
+def init_app(app):
+    from sqlalchemy import event
+    from barberia.extensiones import db
+
+    # /metrics muestra endpoints, consultas y colas: en producción no se publica sin token
+    if app.config['METRICAS_TOKEN_OBLIGATORIO'] and not app.config['METRICAS_TOKEN']:
+        raise RuntimeError("Falta METRICAS_TOKEN: es obligatorio para exponer /metrics en producción.")
+
+    directorio = app.config['METRICAS_DIR']
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    metricas = Metricas(directorio, app.config['METRICAS_INTERVALO'])
+    app.extensions['metricas'] = metricas
+
+    with app.app_context():
+        for clave, engine in db.engines.items():
+            motor = clave or 'principal'
+            _medir_conexiones(metricas, motor, engine)
+
+            def contar_consulta(conn, cursor, sentencia, parametros, contexto, executemany, motor=motor):
+                operacion = sentencia.lstrip().split(None, 1)[0].upper() if sentencia.strip() else 'OTRA'
+                metricas.contar('barberia_bd_consultas_total', (motor, operacion))
+            event.listen(engine, 'before_cursor_execute', contar_consulta)
+
+    cola = app.extensions['cola_correo'].cola
+    metricas.medir('barberia_correo_cola', cola.qsize)
+
+    @app.before_request
+    def iniciar_cronometro():
+        g.inicio_peticion = time.perf_counter()
+
+    @app.after_request
+    def registrar_peticion(response):
+        inicio = g.pop('inicio_peticion', None)
+        if inicio is not None:
+            # El endpoint (no la URL) como etiqueta: la cantidad de series no crece con los ids
+            metricas.observar('barberia_http_peticion_segundos', time.perf_counter() - inicio,
+                              (request.endpoint or 'sin_ruta', request.method, str(response.status_code)))
+        return response
+
+    def exponer():
+        token = app.config['METRICAS_TOKEN']
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            abort(401)
+        return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    app.add_url_rule('/metrics', 'metricas', exponer)
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from barberia.extensiones import db
+
+
+class Usuario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    rol = db.Column(db.String(20), nullable=False)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.now)
+    puntos_acumulados = db.Column(db.Integer, default=0)
+    confirmado = db.Column(db.Boolean, default=False)
+    sucursal_id = db.Column(db.Integer, db.ForeignKey('sucursal.id'), nullable=True) # Solo para rol 'gerente'
+
+class Sucursal(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    direccion = db.Column(db.String(200), nullable=False)
+    empleados = db.relationship('Empleado', backref='sucursal_local', lazy=True)
+
+class Producto(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    precio = db.Column(db.Float, nullable=False)
+    stock = db.Column(db.Integer, default=0)
+    unidad = db.Column(db.String(20))
+
+class Empleado(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    especialidad = db.Column(db.String(100))
+    comision_porcentaje = db.Column(db.Float, default=70.0) # Nueva: % de pago
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    sucursal_id = db.Column(db.Integer, db.ForeignKey('sucursal.id'), nullable=True, index=True)
+
+# Estados que ya no ocupan la agenda del barbero
+TURNO_INACTIVO = ('cancelado', 'inasistencia')
+
+class Turno(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre_cliente = db.Column(db.String(100), nullable=False)
+    fecha_hora = db.Column(db.DateTime, nullable=False)
+    estado = db.Column(db.String(20), default='pendiente')  # pendiente, completado, cancelado, inasistencia
+    cliente_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    empleado_id = db.Column(db.Integer, db.ForeignKey('empleado.id'), nullable=False)
+    servicio_id = db.Column(db.Integer, db.ForeignKey('servicio.id'), nullable=True)
+    servicio = db.relationship('Servicio')
+    barbero = db.relationship('Empleado', backref='turnos')
+    cliente = db.relationship('Usuario', foreign_keys=[cliente_id])
+    monto_total = db.Column(db.Float, default=0.0) 
+    extras = db.Column(db.Text, nullable=True)
+    serie_id = db.Column(db.Integer, db.ForeignKey('serie_turno.id'), nullable=True, index=True)
+
+    __table_args__ = (
+        # Historial del cliente: WHERE cliente_id = ? ORDER BY fecha_hora DESC
+        db.Index('ix_turno_cliente_fecha', 'cliente_id', 'fecha_hora'),
+        # Agenda/disponibilidad por barbero y, vía empleado.sucursal_id, por sede
+        db.Index('ix_turno_empleado_fecha', 'empleado_id', 'fecha_hora'),
+    )
+
+    def calcular_y_actualizar_total(self):
+        base = self.servicio.precio if self.servicio else 0
+        adicionales = TurnoAdicional.query.filter_by(turno_id=self.id).all()
+        total_adicionales = sum(ad.precio for ad in adicionales)   
+        self.monto_total = base + total_adicionales
+        return self.monto_total
+    @property
+    def total_pagado(self):
+        return self.monto_total if self.monto_total else 0.0
+    
+class SerieTurno(db.Model):
+    # Reserva recurrente: `repeticiones` turnos cada `cada_dias` días desde `inicio`
+    __tablename__ = 'serie_turno'
+    id = db.Column(db.Integer, primary_key=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    empleado_id = db.Column(db.Integer, db.ForeignKey('empleado.id'), nullable=False)
+    servicio_id = db.Column(db.Integer, db.ForeignKey('servicio.id'), nullable=False)
+    inicio = db.Column(db.DateTime, nullable=False)
+    cada_dias = db.Column(db.Integer, nullable=False)
+    repeticiones = db.Column(db.Integer, nullable=False)
+    creado = db.Column(db.DateTime, default=datetime.now)
+    turnos = db.relationship('Turno', backref='serie')
+
+class HistorialPassword(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False) 
+    password_hash = db.Column(db.String(200), nullable=False)
+    fecha_registro = db.Column(db.DateTime, default=datetime.now)
+
+class Servicio(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    precio = db.Column(db.Float, nullable=False)
+    duracion_minutos = db.Column(db.Integer, default=30)
+
+class ConfiguracionPuntos(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    rango_min = db.Column(db.Float)
+    rango_max = db.Column(db.Float)
+    puntos_otorgados = db.Column(db.Integer)
+
+class TurnoAdicional(db.Model): 
+    id = db.Column(db.Integer, primary_key=True)
+    turno_id = db.Column(db.Integer, db.ForeignKey('turno.id'), index=True)
+    tipo = db.Column(db.String(20))
+    item_id = db.Column(db.Integer) 
+    nombre = db.Column(db.String(100))
+    precio = db.Column(db.Float)
+
+class ReglaPuntos(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    rango_min = db.Column(db.Float, nullable=False)
+    rango_max = db.Column(db.Float, nullable=False)
+    puntos = db.Column(db.Integer, nullable=False)
+
+class Premio(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    puntos_requeridos = db.Column(db.Integer, nullable=False)
+    descripcion = db.Column(db.String(200))
+
+class Venta(db.Model):
+    __tablename__ = 'ventas'
+    id = db.Column(db.Integer, primary_key=True)
+    turno_id = db.Column(db.Integer, db.ForeignKey('turno.id'), nullable=False, index=True)
+    producto_id = db.Column(db.Integer, db.ForeignKey('producto.id'), nullable=False)
+    cantidad = db.Column(db.Integer, default=1)
+    producto = db.relationship('Producto')
+
+class BloqueoDisponibilidad(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    empleado_id = db.Column(db.Integer, db.ForeignKey('empleado.id'), nullable=False)
+    fecha = db.Column(db.String(10), nullable=False)  # Formato YYYY-MM-DD
+    hora_inicio = db.Column(db.String(5), nullable=True) # Formato HH:MM
+    hora_fin = db.Column(db.String(5), nullable=True)
+    dia_completo = db.Column(db.Boolean, default=False)
+    motivo = db.Column(db.String(200), nullable=True)
+    empleado = db.relationship('Empleado', backref='bloqueos')  
+
+    __table_args__ = (
+        db.Index('ix_bloqueo_empleado_fecha', 'empleado_id', 'fecha'),
+    )
+
+class ListaEspera(db.Model):
+    __tablename__ = 'lista_espera'
+    id = db.Column(db.Integer, primary_key=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    nombre_cliente = db.Column(db.String(100), nullable=False)
+    empleado_id = db.Column(db.Integer, db.ForeignKey('empleado.id'), nullable=True)  # None = cualquier barbero
+    sucursal_id = db.Column(db.Integer, db.ForeignKey('sucursal.id'), nullable=True)  # con cualquier barbero: de esta sede
+    servicio_id = db.Column(db.Integer, db.ForeignKey('servicio.id'), nullable=False)
+    desde = db.Column(db.DateTime, nullable=False)  # ventana aceptada [desde, hasta)
+    hasta = db.Column(db.DateTime, nullable=False)
+    estado = db.Column(db.String(20), default='esperando')  # esperando, asignado, cancelado
+    turno_id = db.Column(db.Integer, nullable=True)  # sin FK: el turno puede pasar al archivo histórico
+    creado = db.Column(db.DateTime, default=datetime.now)
+    servicio = db.relationship('Servicio')
+    barbero = db.relationship('Empleado')
+
+    @property
+    def ultimo_dia(self):
+        return self.hasta - timedelta(days=1)
+
+    __table_args__ = (
+        # Búsqueda de candidatos al liberarse un hueco: WHERE estado = 'esperando' AND desde <= ?
+        db.Index('ix_espera_estado_desde', 'estado', 'desde'),
+    )
+
+class HistorialCanje(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    premio_nombre = db.Column(db.String(100), nullable=False)
+    puntos_usados = db.Column(db.Integer, nullable=False)
+    fecha = db.Column(db.DateTime, default=datetime.now)
+    usuario = db.relationship('Usuario', backref=db.backref('canjes_realizados', lazy=True))
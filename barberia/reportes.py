@@ -0,0 +1,253 @@
+from io import BytesIO
+import numpy as np
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, make_response, request, jsonify, current_app
+from barberia.extensiones import db
+from barberia.modelos import Empleado, Turno, Servicio, TurnoAdicional, Venta
+from barberia.utilidades import (filtrar_por_barbero, args_filtros, lectura_replica, admin_o_gerente_required,
+                                 json_condicional, periodo_quincena, calcular_liquidacion)
+from barberia.analitica import (datos_turnos, resumen, completados_df, ocupacion, por_dia_semana, proporcion,
+                                FRANJA_MINUTOS)
+
+bp = Blueprint('reportes', __name__)
+
+@bp.route('/contabilidad')
+@admin_o_gerente_required
+@lectura_replica
+def contabilidad():
+    sucursal_id, _ = args_filtros()
+
+    inicio_periodo, fin_periodo, nombre_periodo = periodo_quincena(datetime.now())
+    liquidacion = calcular_liquidacion(inicio_periodo, fin_periodo, sucursal_id)
+
+    return render_template('contabilidad.html', 
+                           liquidacion=liquidacion, 
+                           periodo=nombre_periodo)
+
+@bp.route('/admin/reporte/diario')
+@admin_o_gerente_required
+@lectura_replica
+def reporte_diario_excel():
+    sucursal_id, barbero_id = args_filtros()
+    hoy = datetime.now().date()
+    turnos = filtrar_por_barbero(
+        Turno.query.filter(db.func.date(Turno.fecha_hora) == hoy, Turno.estado == 'completado'),
+        Turno, sucursal_id, barbero_id
+    ).all()
+    
+    data = []
+    for t in turnos:
+        # CORRECCIÓN: Usar e.precio y e.nombre directamente, ya que están en el modelo TurnoAdicional
+        extras_serv = TurnoAdicional.query.filter_by(turno_id=t.id).all()
+        monto_extras = sum([e.precio for e in extras_serv if e.precio])
+        
+        # Calcular ventas de productos (usando el precio del producto relacionado)
+        ventas_prod = Venta.query.filter_by(turno_id=t.id).all()
+        monto_productos = sum([v.producto.precio * v.cantidad for v in ventas_prod if v.producto])
+        
+        total_servicio = (t.servicio.precio if t.servicio else 0) + monto_extras
+        
+        # CORRECCIÓN: Usar t.barbero (como definiste en el modelo Turno)
+        pago_barbero = total_servicio * (t.barbero.comision_porcentaje / 100 if t.barbero else 0.7)
+        ganancia_local = (total_servicio - pago_barbero) + monto_productos
+
+        data.append({
+            "Hora": t.fecha_hora.strftime('%H:%M'),
+            "Barbero": t.barbero.nombre if t.barbero else "N/A",
+            "Cliente": t.nombre_cliente,
+            "Servicio Base": t.servicio.nombre if t.servicio else "N/A",
+            "Precio Base": t.servicio.precio if t.servicio else 0,
+            "Extras (Servicios)": ", ".join([e.nombre for e in extras_serv if e.nombre]),
+            "Monto Extras": monto_extras,
+            "Productos": ", ".join([f"{v.producto.nombre} (x{v.cantidad})" for v in ventas_prod if v.producto]),
+            "Venta Productos": monto_productos,
+            "Total Bruto": total_servicio + monto_productos,
+            "Pago Barbero": pago_barbero,
+            "Ganancia Local": ganancia_local
+        })
+
+    # Evitar error si no hay datos hoy
+    if not data:
+        return "No hay datos para reportar hoy", 404
+
+    import pandas as pd  # pesado: solo se carga en el proceso que sirve reportes
+    return excel(pd.DataFrame(data), 'Reporte Diario', f"Reporte_Diario_{hoy}.xlsx")
+
+def rango_fechas():
+    # ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD (ambos incluidos); por defecto los últimos 30 días
+    hoy = datetime.now().date()
+    try:
+        desde = datetime.strptime(request.args.get('desde', str(hoy - timedelta(days=29))), '%Y-%m-%d')
+        hasta = datetime.strptime(request.args.get('hasta', str(hoy)), '%Y-%m-%d') + timedelta(days=1)
+    except ValueError:
+        raise ValueError('Fecha inválida')
+    if hasta <= desde:
+        raise ValueError('Rango vacío')
+    if (hasta - desde).days > current_app.config['REPORTE_MAX_DIAS']:
+        raise ValueError(f"El rango no puede superar {current_app.config['REPORTE_MAX_DIAS']} días")
+    return desde, hasta
+
+def nombres_barberos():
+    return dict(db.session.execute(db.select(Empleado.id, Empleado.nombre)).all())
+
+@bp.route('/admin/api/analitica')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_analitica():
+    sucursal_id, barbero_id = args_filtros()
+    try:
+        desde, hasta = rango_fechas()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    datos = resumen(datos_turnos(desde, hasta, sucursal_id, barbero_id), (hasta - desde).days,
+                    current_app.config['AGENDA_HORA_CIERRE'] - current_app.config['AGENDA_HORA_APERTURA'])
+    nombres = nombres_barberos()
+    servicios = dict(db.session.execute(db.select(Servicio.id, Servicio.nombre)).all())
+    for b in datos['por_barbero']:
+        b['nombre'] = nombres.get(b['empleado_id'], 'N/A')
+    for s in datos['por_servicio']:
+        s['nombre'] = servicios.get(s['servicio_id'], 'N/A')
+    return json_condicional(datos)
+
+def excel(df, hoja, archivo):
+    return excel_hojas({hoja: df}, archivo)
+
+def excel_hojas(hojas, archivo, index=False):
+    import pandas as pd
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        for hoja, df in hojas.items():
+            df.to_excel(writer, index=index, sheet_name=hoja)
+    return make_response(output.getvalue(), 200, {
+        "Content-Disposition": f"attachment; filename={archivo}",
+        "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    })
+
+def resumen_por(df, columna, nombre_columna):
+    # Suma por (periodo, barbero) sobre el DataFrame de analitica.completados_df
+    df['Empleado'] = df['empleado_id'].map(nombres_barberos()).fillna('N/A')
+    df[nombre_columna] = columna
+    tabla = df.groupby([nombre_columna, 'Empleado'], sort=True)[['servicios', 'productos', 'pago_barbero']].sum()
+    return tabla.reset_index()
+
+@bp.route('/admin/reporte/semanal')
+@admin_o_gerente_required
+@lectura_replica
+def reporte_semanal_excel():
+    sucursal_id, barbero_id = args_filtros()
+    hace_una_semana = datetime.now() - timedelta(days=7)
+    df = completados_df(datos_turnos(hace_una_semana, None, sucursal_id, barbero_id))
+
+    tabla = resumen_por(df, df['fecha'].dt.strftime('%Y-%m-%d'), 'Fecha')
+    tabla = tabla.rename(columns={'servicios': 'Ganancia Servicios', 'pago_barbero': 'Pago a Empleado',
+                                  'productos': 'Venta Productos'})
+    tabla['Pago a Empleado'] = tabla['Pago a Empleado'].round(2)
+    tabla['Total Bruto'] = tabla['Ganancia Servicios'] + tabla['Venta Productos']
+    tabla = tabla[['Fecha', 'Empleado', 'Ganancia Servicios', 'Pago a Empleado', 'Venta Productos', 'Total Bruto']]
+    return excel(tabla, 'Resumen Semanal', 'Reporte_Semanal.xlsx')
+
+@bp.route('/admin/reporte/mensual')
+@admin_o_gerente_required
+@lectura_replica
+def reporte_mensual_excel():
+    sucursal_id, barbero_id = args_filtros()
+    inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    df = completados_df(datos_turnos(inicio_mes, None, sucursal_id, barbero_id))
+
+    # Número de semana del mes
+    semana = "Semana " + ((df['fecha'].dt.day - 1) // 7 + 1).astype(str)
+    tabla = resumen_por(df, semana, 'Semana')
+    tabla = tabla.rename(columns={'servicios': 'Total Servicios', 'pago_barbero': 'A Pagar Empleado',
+                                  'productos': 'Venta Mercancía'})
+    tabla['A Pagar Empleado'] = tabla['A Pagar Empleado'].round(2)
+    tabla['Utilidad Local'] = tabla['Total Servicios'] - tabla['A Pagar Empleado'] + tabla['Venta Mercancía']
+    tabla = tabla[['Semana', 'Empleado', 'Total Servicios', 'A Pagar Empleado', 'Venta Mercancía', 'Utilidad Local']]
+    return excel(tabla, 'Resumen Mensual', 'Reporte_Mensual.xlsx')
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+def calcular_ocupacion(desde, hasta, sucursal_id, barbero_id):
+    """Ocupación (minutos reservados / disponibles) por día de la semana y franja, y por barbero."""
+    consulta = db.select(Empleado.id, Empleado.nombre).order_by(Empleado.id)
+    if sucursal_id:
+        consulta = consulta.where(Empleado.sucursal_id == sucursal_id)
+    if barbero_id:
+        consulta = consulta.where(Empleado.id == barbero_id)
+    barberos = db.session.execute(consulta).all()
+
+    apertura = current_app.config['AGENDA_HORA_APERTURA']
+    cierre = current_app.config['AGENDA_HORA_CIERRE']
+    dias = (hasta - desde).days
+    reservados, disponibles = ocupacion(desde, dias, [b.id for b in barberos], apertura, cierre)
+
+    franjas = [f"{(apertura * 60 + i * FRANJA_MINUTOS) // 60:02d}:{(apertura * 60 + i * FRANJA_MINUTOS) % 60:02d}"
+               for i in range(reservados.shape[-1])]
+    semana_reservados = por_dia_semana(reservados.sum(axis=0), desde)
+    semana_disponibles = por_dia_semana(disponibles.sum(axis=0), desde)
+    # Cuántos lunes, martes... hay en el periodo, para promediar barberos ocupados por franja
+    veces = por_dia_semana(np.ones((dias, 1)), desde)
+
+    datos = {
+        'desde': desde.strftime('%Y-%m-%d'),
+        'hasta': (hasta - timedelta(days=1)).strftime('%Y-%m-%d'),
+        'franja_minutos': FRANJA_MINUTOS,
+        'franjas': franjas,
+        'dias_semana': DIAS_SEMANA,
+        'minutos_reservados': round(float(reservados.sum()), 2),
+        'minutos_disponibles': round(float(disponibles.sum()), 2),
+        'ocupacion': round(float(proporcion(reservados.sum(), disponibles.sum())), 4),
+        'mapa': np.round(proporcion(semana_reservados, semana_disponibles), 4).tolist(),
+        'barberos_ocupados': np.round(proporcion(semana_reservados / FRANJA_MINUTOS, veces), 2).tolist(),
+        'por_barbero': []
+    }
+    detalle = request.args.get('detalle') == '1'
+    for k, b in enumerate(barberos):
+        fila = {
+            'empleado_id': b.id,
+            'nombre': b.nombre,
+            'minutos_reservados': round(float(reservados[k].sum()), 2),
+            'minutos_disponibles': round(float(disponibles[k].sum()), 2),
+            'ocupacion': round(float(proporcion(reservados[k].sum(), disponibles[k].sum())), 4)
+        }
+        if detalle:
+            fila['mapa'] = np.round(proporcion(por_dia_semana(reservados[k], desde),
+                                               por_dia_semana(disponibles[k], desde)), 4).tolist()
+        datos['por_barbero'].append(fila)
+    return datos
+
+@bp.route('/admin/api/ocupacion')
+@admin_o_gerente_required
+@lectura_replica
+def admin_api_ocupacion():
+    # Mismos filtros y rango que /admin/api/analitica; ?detalle=1 agrega el mapa de cada barbero
+    sucursal_id, barbero_id = args_filtros()
+    try:
+        desde, hasta = rango_fechas()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return json_condicional(calcular_ocupacion(desde, hasta, sucursal_id, barbero_id))
+
+@bp.route('/admin/reporte/ocupacion')
+@admin_o_gerente_required
+@lectura_replica
+def reporte_ocupacion_excel():
+    sucursal_id, barbero_id = args_filtros()
+    try:
+        desde, hasta = rango_fechas()
+    except ValueError as e:
+        return str(e), 400
+    datos = calcular_ocupacion(desde, hasta, sucursal_id, barbero_id)
+
+    import pandas as pd
+    mapa = pd.DataFrame((np.array(datos['mapa']).T * 100).round(1), index=datos['franjas'], columns=DIAS_SEMANA)
+    ocupados = pd.DataFrame(np.array(datos['barberos_ocupados']).T, index=datos['franjas'], columns=DIAS_SEMANA)
+    barberos = pd.DataFrame([{
+        'Barbero': b['nombre'],
+        'Minutos Reservados': b['minutos_reservados'],
+        'Minutos Disponibles': b['minutos_disponibles'],
+        'Ocupación %': round(b['ocupacion'] * 100, 1)
+    } for b in datos['por_barbero']], columns=['Barbero', 'Minutos Reservados', 'Minutos Disponibles', 'Ocupación %'])
+    barberos = barberos.set_index('Barbero')
+    return excel_hojas({'Ocupación %': mapa, 'Barberos Ocupados': ocupados, 'Por Barbero': barberos},
+                       f"Reporte_Ocupacion_{datos['desde']}_{datos['hasta']}.xlsx", index=True)
@@ -0,0 +1,143 @@
+import logging
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app, abort
+from barberia.extensiones import db
+from barberia.modelos import Usuario, Sucursal, Empleado, Turno, Servicio, Premio
+from barberia.utilidades import pagina_turnos_cliente
+from barberia.agenda import reservar_turno, reservar_serie, cancelar_turno_de
+from barberia.lista_espera import crear_espera, esperas_activas, cancelar_espera
+
+log = logging.getLogger(__name__)
+
+bp = Blueprint('reservas', __name__)
+
+@bp.route('/agendar', methods=['GET', 'POST'])
+def agendar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        turno_id = request.form.get('turno_id') # Presente solo si es reprogramación
+        barbero_id = request.form.get('barbero')
+        servicio_id = request.form.get('servicio')
+        fecha_dia = request.form.get('fecha_dia')
+        hora_slot = request.form.get('hora_slot') # Nombre exacto del select en el HTML
+
+        repetir_semanas = request.form.get('repetir_semanas') # Vacío = turno único
+
+        try:
+            if repetir_semanas and not turno_id:
+                _, turnos, conflictos = reservar_serie(session['usuario_id'], session['nombre'], barbero_id, servicio_id,
+                                                       fecha_dia, hora_slot, None, request.form.get('repeticiones'),
+                                                       cada_semanas=repetir_semanas)
+                if turnos:
+                    flash(f"Se agendaron {len(turnos)} turnos de la serie.", "exito")
+                for c in conflictos:
+                    flash(f"No se agendó el {c['fecha']} a las {c['hora']}: {c['motivo']}", "error")
+            else:
+                _, mensaje = reservar_turno(session['usuario_id'], session['nombre'], barbero_id,
+                                            servicio_id, fecha_dia, hora_slot, turno_id=turno_id)
+                flash(mensaje, "exito")
+        except ValueError as e:
+            db.session.rollback()
+            flash(f"Error: {e}", "error")
+        except Exception:
+            db.session.rollback()
+            log.exception("Error al procesar la cita", extra={
+                'barbero_id': barbero_id, 'servicio_id': servicio_id, 'fecha': fecha_dia, 'hora': hora_slot,
+                'turno_id': turno_id})
+            flash("Error al procesar la cita.", "error")
+        return redirect(url_for('reservas.agendar'))
+
+    # Datos para la vista
+    usuario = Usuario.query.get(session['usuario_id'])
+    premios = Premio.query.order_by(Premio.puntos_requeridos.asc()).all()
+    # Barberos de la sede elegida (o de toda la cadena si no se eligió)
+    sucursal_id = request.args.get('sucursal_id', type=int)
+    sucursales = Sucursal.query.order_by(Sucursal.nombre).all()
+    barberos = Empleado.query
+    if sucursal_id:
+        barberos = barberos.filter(Empleado.sucursal_id == sucursal_id)
+    barberos = barberos.all()
+    servicios = Servicio.query.all()
+    mis_turnos, siguiente_cursor = pagina_turnos_cliente(session['usuario_id'],
+                                                         limite=current_app.config['AGENDAR_PRIMERA_PAGINA'])
+    hoy_str_iso = datetime.now().strftime('%Y-%m-%d')
+
+    # Capturamos si estamos editando un turno (parámetro ?edit_id=<id>)
+    edit_id = request.args.get('edit_id')
+    edit_turno = None
+    if edit_id:
+        try:
+            edit_turno = Turno.query.get(int(edit_id))
+            if edit_turno and edit_turno.cliente_id != session['usuario_id']:
+                edit_turno = None
+        except (ValueError, TypeError):
+            edit_turno = None
+    # IMPORTANTE: Asegúrate de pasar 'edit_turno' aquí
+    return render_template('agendar.html', 
+                           usuario=usuario, 
+                           premios=premios, 
+                           barberos=barberos, 
+                           sucursales=sucursales,
+                           sucursal_id=sucursal_id,
+                           servicios=servicios, 
+                           turnos=mis_turnos, 
+                           siguiente_cursor=siguiente_cursor,
+                           hoy_str_iso=hoy_str_iso,
+                           edit_turno=edit_turno,
+                           esperas=esperas_activas(session['usuario_id']))
+
+@bp.route('/lista-espera', methods=['POST'])
+def lista_espera():
+    if 'usuario_id' not in session:
+        return redirect(url_for('auth.login'))
+
+    try:
+        crear_espera(session['usuario_id'], session['nombre'], request.form.get('servicio'),
+                     request.form.get('fecha_desde'), request.form.get('fecha_hasta'),
+                     barbero_id=request.form.get('barbero'), sucursal_id=request.form.get('sucursal'))
+        flash("Te avisaremos por correo si se libera un turno.", "exito")
+    except ValueError as e:
+        db.session.rollback()
+        flash(f"Error: {e}", "error")
+    return redirect(url_for('reservas.agendar'))
+
+@bp.route('/lista-espera/<int:id>/cancelar', methods=['GET', 'POST'])
+def cancelar_lista_espera(id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('auth.login'))
+
+    try:
+        cancelar_espera(id, session['usuario_id'])
+    except LookupError:
+        abort(404)
+    return redirect(url_for('reservas.agendar'))
+
+@bp.route('/cancelar-turno/<int:id>', methods=['GET', 'POST'])
+def cancelar_turno(id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('auth.login'))
+
+    try:
+        cancelar_turno_de(id, session['usuario_id'], session.get('rol'), session.get('sucursal_id'))
+        # flash("Turno cancelado exitosamente.", "exito") # Opcional si tienes el bloque flash en HTML
+    except LookupError:
+        abort(404)
+    except Exception as e:
+        db.session.rollback()
+        # flash("No se pudo cancelar el turno.", "error")
+    
+    # --- LA MAGIA DE LA REDIRECCIÓN ---
+    # 1. Intentamos regresar a la URL exacta de donde vino (mantiene fechas, filtros, etc.)
+    if request.referrer and request.host in request.referrer:
+        return redirect(request.referrer)
+    
+    # 2. Si no hay referrer (caso raro), usamos tu lógica de roles
+    rol = session.get('rol')
+    if rol in ['admin', 'gerente']:
+        return redirect(url_for('admin.admin_dashboard'))
+    elif rol == 'empleado':
+        return redirect(url_for('empleado.empleado_dashboard'))
+    
+    return redirect(url_for('auth.index'))
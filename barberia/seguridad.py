@@ -0,0 +1,162 @@
+import re
+from datetime import datetime
+from threading import Lock
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, request, flash, make_response, render_template
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+def validar_password(password):
+    if len(password) < 8: return "Mínimo 8 caracteres."
+    if not re.search(r"[A-Z]", password): return "Falta una mayúscula."
+    if not re.search(r"[a-z]", password): return "Falta una minúscula."
+    if not re.search(r"\d", password): return "Falta un número."
+    if not re.search(r"[!@#$%&*]", password): return "Falta un carácter especial (!@#$%&*)."
+    return True
+
+# Prefijo real de cada método configurado (Werkzeug completa los parámetros por defecto)
+_metodos_hash_normalizados = {}
+
+def hashear_password(password):
+    return generate_password_hash(password,
+                                  method=current_app.config['PASSWORD_HASH_METHOD'],
+                                  salt_length=current_app.config['PASSWORD_SALT_LENGTH'])
+
+def verificar_password(password_hash, password):
+    # scrypt/pbkdf2 liberan el GIL, así que el pool limita cuántos hashes corren a la vez
+    return current_app.extensions['hash_executor'].submit(check_password_hash, password_hash, password).result()
+
+def necesita_rehash(password_hash):
+    metodo_config = current_app.config['PASSWORD_HASH_METHOD']
+    if metodo_config not in _metodos_hash_normalizados:
+        _metodos_hash_normalizados[metodo_config] = hashear_password('x').split('$', 1)[0]
+
+    partes = password_hash.split('$')
+    if len(partes) != 3:
+        return True
+    metodo, salt, _ = partes
+    return metodo != _metodos_hash_normalizados[metodo_config] or len(salt) != current_app.config['PASSWORD_SALT_LENGTH']
+
+# --- LÍMITE DE INTENTOS (VENTANA DESLIZANTE) ---
+# Se usa el contador de ventana deslizante aproximado: el conteo de la ventana
+# anterior se pondera por la fracción de tiempo que aún se solapa con la actual.
+
+class AlmacenLimiteMemoria:
+    """Contadores en el proceso, con expulsión LRU cuando hay demasiadas claves."""
+
+    def __init__(self, max_claves):
+        self.max_claves = max_claves
+        self.datos = OrderedDict()  # clave -> [indice_ventana, conteo_actual, conteo_anterior]
+        self.lock = Lock()
+
+    def _rotar(self, clave, indice):
+        entrada = self.datos.get(clave)
+        if entrada is None:
+            return [indice, 0, 0]
+        if entrada[0] == indice:
+            return entrada
+        anterior = entrada[1] if entrada[0] == indice - 1 else 0
+        return [indice, 0, anterior]
+
+    def conteos(self, clave, indice):
+        with self.lock:
+            entrada = self._rotar(clave, indice)
+            return entrada[1], entrada[2]
+
+    def incrementar(self, clave, indice, ventana):
+        with self.lock:
+            entrada = self._rotar(clave, indice)
+            entrada[1] += 1
+            self.datos[clave] = entrada
+            self.datos.move_to_end(clave)
+            while len(self.datos) > self.max_claves:
+                self.datos.popitem(last=False)
+
+
+class AlmacenLimiteRedis:
+    """Contadores compartidos entre workers usando Redis."""
+
+    def __init__(self, url):
+        import redis  # Dependencia opcional, solo si se configura RATE_LIMIT_STORAGE_URL
+        self.cliente = redis.Redis.from_url(url)
+
+    def conteos(self, clave, indice):
+        actual, anterior = self.cliente.mget(f"rl:{clave}:{indice}", f"rl:{clave}:{indice - 1}")
+        return int(actual or 0), int(anterior or 0)
+
+    def incrementar(self, clave, indice, ventana):
+        pipe = self.cliente.pipeline()
+        pipe.incr(f"rl:{clave}:{indice}")
+        pipe.expire(f"rl:{clave}:{indice}", ventana * 2)
+        pipe.execute()
+
+
+class LimitadorIntentos:
+
+    def __init__(self, almacen, ventana, metricas=None):
+        self.almacen = almacen
+        self.ventana = ventana
+        self.metricas = metricas
+
+    def _estimado(self, clave):
+        ahora = datetime.now().timestamp()
+        indice = int(ahora // self.ventana)
+        actual, anterior = self.almacen.conteos(clave, indice)
+        solapado = 1 - (ahora % self.ventana) / self.ventana
+        return actual + anterior * solapado
+
+    def excedido(self, clave, limite):
+        return self._estimado(clave) >= limite
+
+    def registrar(self, clave):
+        indice = int(datetime.now().timestamp() // self.ventana)
+        self.almacen.incrementar(clave, indice, self.ventana)
+
+    def rechazar(self, endpoint):
+        # En el registro de métricas: se exporta en /metrics y se suma entre workers
+        if self.metricas is not None:
+            self.metricas.contar('barberia_limite_rechazos_total', (endpoint,))
+
+    def rechazados(self):
+        # {endpoint: rechazos} sumados entre los workers (con METRICAS_DIR), igual que /metrics
+        if self.metricas is None:
+            return {}
+        return {etiquetas[0]: valor for etiquetas, valor in self.metricas.sumar('barberia_limite_rechazos_total').items()}
+
+
+def init_app(app):
+    # Pool acotado para verificar hashes sin acaparar todos los hilos del worker
+    app.extensions['hash_executor'] = ThreadPoolExecutor(max_workers=app.config['PASSWORD_HASH_WORKERS'],
+                                                         thread_name_prefix='hash')
+    if app.config['RATE_LIMIT_STORAGE_URL']:
+        almacen = AlmacenLimiteRedis(app.config['RATE_LIMIT_STORAGE_URL'])
+    else:
+        almacen = AlmacenLimiteMemoria(app.config['RATE_LIMIT_MAX_CLAVES'])
+    app.extensions['limitador'] = LimitadorIntentos(almacen, app.config['RATE_LIMIT_VENTANA'],
+                                                    app.extensions.get('metricas'))
+
+def limitador():
+    return current_app.extensions['limitador']
+
+def intentos_excedidos(email):
+    # Se evalúa ANTES de consultar la BD o verificar el hash
+    ip = request.remote_addr or 'desconocida'
+    lim = limitador()
+    if (lim.excedido(f"ip:{ip}", current_app.config['RATE_LIMIT_POR_IP']) or
+            (email and lim.excedido(f"email:{email}", current_app.config['RATE_LIMIT_POR_EMAIL']))):
+        lim.rechazar(request.endpoint)
+        return True
+    return False
+
+def registrar_intento(email):
+    lim = limitador()
+    lim.registrar(f"ip:{request.remote_addr or 'desconocida'}")
+    if email:
+        lim.registrar(f"email:{email}")
+
+def respuesta_limite(plantilla):
+    flash("Demasiados intentos. Espera unos minutos antes de volver a intentar.", "error")
+    response = make_response(render_template(plantilla), 429)
+    response.headers['Retry-After'] = str(current_app.config['RATE_LIMIT_VENTANA'])
+    return response
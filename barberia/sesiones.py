@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import secrets
+import sqlite3
+from datetime import datetime
+from threading import local
+from flask import current_app
+from flask.sessions import SessionInterface, SessionMixin
+
+# La cookie solo guarda un identificador aleatorio; el perfil del usuario vive en el almacén.
+
+class AlmacenSesionesSQLite:
+    """Sesiones en un archivo SQLite propio (compartido por todos los workers del nodo)."""
+
+    def __init__(self, ruta, purga_cada=500):
+        self.ruta = ruta
+        self.hilos = local()
+        # Las sesiones anónimas (un flash basta para crear una) nunca se revocan:
+        # cada `purga_cada` guardados del proceso se borran las vencidas
+        self.purga_cada = purga_cada
+        self.guardados = 0
+        # El archivo se crea con la primera sesión, no al crear la app: los scripts,
+        # las migraciones y los procesos que no atienden peticiones no lo tocan
+        self.creado = False
+
+    def _conexion(self):
+        # Una conexión por hilo; sqlite3 no permite compartirlas entre hilos
+        con = getattr(self.hilos, 'con', None)
+        if con is None:
+            if not self.creado:
+                os.makedirs(os.path.dirname(self.ruta) or '.', exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            if not self.creado:
+                con.execute("CREATE TABLE IF NOT EXISTS sesiones ("
+                            "sid TEXT PRIMARY KEY, usuario_id INTEGER, datos TEXT NOT NULL, expira REAL NOT NULL)")
+                con.execute("CREATE INDEX IF NOT EXISTS ix_sesiones_usuario ON sesiones (usuario_id)")
+                con.commit()
+                self.creado = True
+            self.hilos.con = con
+        return con
+
+    def cargar(self, sid):
+        fila = self._conexion().execute(
+            "SELECT datos, expira FROM sesiones WHERE sid = ?", (sid,)).fetchone()
+        if fila is None or fila[1] < time.time():
+            return None
+        return json.loads(fila[0])
+
+    def guardar(self, sid, datos, expira):
+        con = self._conexion()
+        con.execute("INSERT OR REPLACE INTO sesiones (sid, usuario_id, datos, expira) VALUES (?, ?, ?, ?)",
+                    (sid, datos.get('usuario_id'), json.dumps(datos, separators=(',', ':')), expira))
+        self.guardados += 1
+        if self.purga_cada and self.guardados % self.purga_cada == 0:
+            con.execute("DELETE FROM sesiones WHERE expira < ?", (time.time(),))
+        con.commit()
+
+    def eliminar(self, sid):
+        con = self._conexion()
+        con.execute("DELETE FROM sesiones WHERE sid = ?", (sid,))
+        con.commit()
+
+    def revocar_usuario(self, usuario_id):
+        con = self._conexion()
+        con.execute("DELETE FROM sesiones WHERE usuario_id = ? OR expira < ?", (usuario_id, time.time()))
+        con.commit()
+
+
+class AlmacenSesionesRedis:
+    """Sesiones en Redis, compartidas entre nodos."""
+
+    def __init__(self, url):
+        import redis  # Dependencia opcional, solo si SESSION_BACKEND='redis'
+        self.cliente = redis.Redis.from_url(url)
+
+    def cargar(self, sid):
+        datos = self.cliente.get(f"ses:{sid}")
+        return json.loads(datos) if datos else None
+
+    def guardar(self, sid, datos, expira):
+        ttl = max(int(expira - time.time()), 1)
+        pipe = self.cliente.pipeline()
+        pipe.set(f"ses:{sid}", json.dumps(datos, separators=(',', ':')), ex=ttl)
+        if datos.get('usuario_id'):
+            pipe.sadd(f"ses_usuario:{datos['usuario_id']}", sid)
+            pipe.expire(f"ses_usuario:{datos['usuario_id']}", ttl)
+        pipe.execute()
+
+    def eliminar(self, sid):
+        self.cliente.delete(f"ses:{sid}")
+
+    def revocar_usuario(self, usuario_id):
+        sids = self.cliente.smembers(f"ses_usuario:{usuario_id}")
+        if sids:
+            self.cliente.delete(*[f"ses:{sid.decode()}" for sid in sids])
+        self.cliente.delete(f"ses_usuario:{usuario_id}")
+
+
+class SesionServidor(dict, SessionMixin):
+    def __init__(self, datos=None, sid=None, nueva=False):
+        super().__init__(datos or {})
+        self.sid = sid
+        self.new = nueva
+        self.modified = False
+
+    def __setitem__(self, clave, valor):
+        super().__setitem__(clave, valor)
+        self.modified = True
+
+    def __delitem__(self, clave):
+        super().__delitem__(clave)
+        self.modified = True
+
+    def clear(self):
+        super().clear()
+        self.modified = True
+
+    def pop(self, *args):
+        self.modified = True
+        return super().pop(*args)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.modified = True
+
+    def setdefault(self, clave, valor=None):
+        if clave not in self:
+            self.modified = True
+        return super().setdefault(clave, valor)
+
+
+class InterfazSesionServidor(SessionInterface):
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            datos = self.almacen.cargar(sid)
+            if datos is not None:
+                return SesionServidor(datos, sid=sid)
+        return SesionServidor(sid=secrets.token_urlsafe(32), nueva=True)
+
+    def save_session(self, app, sesion, response):
+        nombre = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        ruta = self.get_cookie_path(app)
+
+        if not sesion:
+            if sesion.modified:
+                self.almacen.eliminar(sesion.sid)
+                response.delete_cookie(nombre, domain=dominio, path=ruta)
+            return
+
+        if not sesion.modified:
+            return
+
+        # Al iniciar sesión se emite un identificador nuevo (evita fijación de sesión)
+        if sesion.pop('_rotar', False) and not sesion.new:
+            self.almacen.eliminar(sesion.sid)
+            sesion.sid = secrets.token_urlsafe(32)
+
+        expira = datetime.now() + app.permanent_session_lifetime
+        self.almacen.guardar(sesion.sid, dict(sesion), expira.timestamp())
+        response.set_cookie(nombre, sesion.sid, expires=expira if sesion.permanent else None,
+                            httponly=self.get_cookie_httponly(app), domain=dominio, path=ruta,
+                            secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
+
+
+def init_app(app):
+    if app.config['SESSION_BACKEND'] == 'sqlite':
+        ruta = app.config['SESSION_SQLITE_PATH'] or os.path.join(app.instance_path, 'sesiones.db')
+        almacen = AlmacenSesionesSQLite(ruta, app.config['SESSION_PURGA_CADA'])
+    elif app.config['SESSION_BACKEND'] == 'redis':
+        almacen = AlmacenSesionesRedis(app.config['SESSION_STORAGE_URL'])
+    else:
+        almacen = None
+
+    app.extensions['almacen_sesiones'] = almacen
+    if almacen is not None:
+        app.session_interface = InterfazSesionServidor(almacen)
+
+def revocar_sesiones(usuario_id):
+    # Cierra al instante todas las sesiones abiertas de un usuario
+    almacen = current_app.extensions.get('almacen_sesiones')
+    if almacen is not None:
+        almacen.revocar_usuario(usuario_id)
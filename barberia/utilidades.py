@@ -0,0 +1,196 @@
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, redirect, url_for, flash, session, jsonify, current_app, g
+from sqlalchemy.orm import joinedload
+from barberia.extensiones import db
+from barberia.modelos import Empleado, Turno, TurnoAdicional
+from barberia.metricas import contar
+
+def paginar_por_cursor(query, columna, cursor, limite, descendente=False, parsear=datetime.fromisoformat):
+    # Paginación por cursor sobre (columna, id): cada página cuesta lo mismo sin importar el offset
+    modelo = columna.class_
+    if cursor:
+        valor_str, id_str = cursor.rsplit('_', 1)
+        valor, id_c = parsear(valor_str), int(id_str)
+        if descendente:
+            query = query.filter(db.or_(columna < valor, db.and_(columna == valor, modelo.id < id_c)))
+        else:
+            query = query.filter(db.or_(columna > valor, db.and_(columna == valor, modelo.id > id_c)))
+
+    if descendente:
+        query = query.order_by(columna.desc(), modelo.id.desc())
+    else:
+        query = query.order_by(columna.asc(), modelo.id.asc())
+
+    items = query.limit(limite + 1).all()
+    siguiente = None
+    if len(items) > limite:
+        items = items[:limite]
+        ultimo = getattr(items[-1], columna.key)
+        valor = ultimo.isoformat() if hasattr(ultimo, 'isoformat') else ultimo
+        siguiente = f"{valor}_{items[-1].id}"
+    return items, siguiente
+
+def pagina_turnos_cliente(cliente_id, cursor=None, limite=10):
+    query = Turno.query.options(joinedload(Turno.barbero), joinedload(Turno.servicio)).filter(
+        Turno.cliente_id == cliente_id,
+        Turno.estado != 'cancelado'
+    )
+    return paginar_por_cursor(query, Turno.fecha_hora, cursor, limite, descendente=True)
+
+def filtrar_por_barbero(query, modelo, sucursal_id=None, barbero_id=None):
+    # Filtros de servidor por sede (a través del barbero) y por barbero
+    if barbero_id:
+        query = query.filter(modelo.empleado_id == barbero_id)
+    if sucursal_id:
+        query = query.join(Empleado, modelo.empleado_id == Empleado.id).filter(Empleado.sucursal_id == sucursal_id)
+    return query
+
+def periodo_quincena(ahora):
+    if ahora.day <= 15:
+        inicio_p = ahora.replace(day=1, hour=0, minute=0, second=0)
+        fin_p = ahora.replace(day=15, hour=23, minute=59, second=59)
+        nombre_periodo = "1ra Quincena"
+    else:
+        inicio_p = ahora.replace(day=16, hour=0, minute=0, second=0)
+        proximo_mes = ahora.replace(day=28) + timedelta(days=4)
+        ultimo_dia = proximo_mes - timedelta(days=proximo_mes.day)
+        fin_p = ultimo_dia.replace(hour=23, minute=59, second=59)
+        nombre_periodo = "2da Quincena"
+    return inicio_p, fin_p, nombre_periodo
+
+def calcular_liquidacion(inicio_p, fin_p, sucursal_id=None):
+    # Dos consultas agregadas por barbero en lugar de una por barbero y otra por turno
+    filtros = [Turno.estado == 'completado', Turno.fecha_hora >= inicio_p, Turno.fecha_hora <= fin_p]
+
+    recaudado = filtrar_por_barbero(
+        db.session.query(Turno.empleado_id, db.func.sum(Turno.monto_total)).filter(*filtros),
+        Turno, sucursal_id
+    ).group_by(Turno.empleado_id).all()
+    productos = filtrar_por_barbero(
+        db.session.query(Turno.empleado_id, db.func.sum(TurnoAdicional.precio))
+        .join(TurnoAdicional, TurnoAdicional.turno_id == Turno.id)
+        .filter(*filtros, TurnoAdicional.tipo == 'producto'),
+        Turno, sucursal_id
+    ).group_by(Turno.empleado_id).all()
+
+    recaudado = {emp_id: total or 0 for emp_id, total in recaudado}
+    productos = {emp_id: total or 0 for emp_id, total in productos}
+    if not recaudado:
+        return []
+
+    liquidacion = []
+    for emp in Empleado.query.filter(Empleado.id.in_(recaudado.keys())).order_by(Empleado.nombre).all():
+        recaudado_total = recaudado[emp.id]
+        base_comisionable = recaudado_total - productos.get(emp.id, 0)
+        porcentaje = emp.comision_porcentaje if emp.comision_porcentaje is not None else 70.0
+        pago_barbero = base_comisionable * (porcentaje / 100)
+
+        if recaudado_total > 0:
+            liquidacion.append({
+                'nombre': emp.nombre,
+                'total_recaudado': round(recaudado_total, 2),
+                'pago_barbero': round(pago_barbero, 2),
+                'ganancia_local': round(recaudado_total - pago_barbero, 2)
+            })
+    return liquidacion
+
+def sucursal_de_sesion():
+    # Un gerente solo ve su sede; el admin general ve toda la cadena (None)
+    if session.get('rol') == 'gerente':
+        return session.get('sucursal_id') or -1
+    return None
+
+def args_filtros():
+    sucursal_id = sucursal_de_sesion() or request.args.get('sucursal_id', type=int)
+    barbero_id = request.args.get('barbero_id', type=int)
+    if barbero_id and sucursal_de_sesion():
+        # Un gerente no puede pedir barberos de otra sede
+        emp = db.session.get(Empleado, barbero_id)
+        if emp is None or emp.sucursal_id != sucursal_id:
+            barbero_id = -1
+    return sucursal_id, barbero_id
+
+def iniciar_sesion(usuario):
+    # Foto del perfil en la sesión para no volver a consultar Usuario/Empleado en cada página
+    session.clear()
+    session['_rotar'] = True
+    session['usuario_id'] = usuario.id
+    session['nombre'] = usuario.nombre
+    session['rol'] = usuario.rol
+    if usuario.rol == 'gerente':
+        session['sucursal_id'] = usuario.sucursal_id
+    if usuario.rol == 'empleado':
+        emp = Empleado.query.filter_by(usuario_id=usuario.id).first()
+        if emp:
+            session['empleado_id'] = emp.id
+            session['sucursal_id'] = emp.sucursal_id
+            session['comision_porcentaje'] = emp.comision_porcentaje
+
+def perfil_empleado():
+    # Sesiones antiguas (sin la foto del perfil) se completan una sola vez
+    if 'empleado_id' not in session:
+        emp = Empleado.query.filter_by(usuario_id=session['usuario_id']).first()
+        if emp is None:
+            return None
+        session['empleado_id'] = emp.id
+        session['sucursal_id'] = emp.sucursal_id
+        session['comision_porcentaje'] = emp.comision_porcentaje
+    return {
+        'id': session['empleado_id'],
+        'nombre': session['nombre'],
+        'sucursal_id': session.get('sucursal_id'),
+        'comision_porcentaje': session.get('comision_porcentaje')
+    }
+
+def lectura_replica(f):
+    # Rutas de solo lectura donde se acepta un pequeño retraso de la réplica
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        ultima = session.get('_ultima_escritura', 0)
+        g.usar_replica = time.time() - ultima > current_app.config['REPLICA_VENTANA_ESCRITURA']
+        return f(*args, **kwargs)
+    return decorated_function
+
+def admin_o_gerente_required(f):
+    # Vistas de consulta del panel: el admin ve todo, el gerente solo su sede
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'usuario_id' not in session or session.get('rol') not in ['admin', 'gerente']:
+            flash("Acceso restringido. Se requieren permisos de administrador.", "error")
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # El "Guardia": Revisa si hay sesión y si el rol es admin
+        if 'usuario_id' not in session or session.get('rol') != 'admin':
+            flash("Acceso restringido. Se requieren permisos de administrador.", "error")
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def api_rol_required(*roles):
+    # Variante JSON de los decoradores anteriores: 401/403 en lugar de redirigir al login
+    def decorador(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if 'usuario_id' not in session:
+                return jsonify({"error": "No autenticado"}), 401
+            if roles and session.get('rol') not in roles:
+                return jsonify({"error": "Sin permisos"}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorador
+
+def json_condicional(datos):
+    # ETag sobre el contenido: si el cliente ya lo tiene, respondemos 304 sin cuerpo
+    response = jsonify(datos)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.add_etag()
+    response = response.make_conditional(request)
+    contar('barberia_respuestas_condicionales_total', request.endpoint, 'hit' if response.status_code == 304 else 'miss')
+    return response
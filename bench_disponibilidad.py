@@ -0,0 +1,143 @@
+"""Prueba de carga de /api/disponibilidad: worker WSGI síncrono vs. servidor ASGI.
+
+Levanta un proceso por servidor sobre la misma base SQLite de prueba y lanza
+N clientes concurrentes durante unos segundos. BENCH_LATENCIA_BD_MS simula la
+ida y vuelta a un Postgres remoto (se duerme en cada consulta), que es lo que
+deja bloqueado a un worker síncrono.
+
+Uso:
+    python bench_disponibilidad.py [concurrencia] [segundos]
+    BENCH_LATENCIA_BD_MS=5 python bench_disponibilidad.py 64 5
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+PUERTO_WSGI = 8701
+PUERTO_ASGI = 8702
+
+
+def _simular_latencia(flask_app):
+    latencia = float(os.getenv('BENCH_LATENCIA_BD_MS', 0)) / 1000
+    if not latencia:
+        return
+    from sqlalchemy import event
+    from barberia.extensiones import db
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', lambda *args: time.sleep(latencia))
+
+
+def preparar():
+    from barberia import create_app
+    from barberia.extensiones import db
+    from barberia.modelos import Usuario, Sucursal, Empleado, Servicio, Turno
+    from migraciones import migrar
+
+    with create_app(blueprints=()).app_context():
+        migrar()
+        db.session.add(Sucursal(nombre="Bench", direccion="-"))
+        db.session.add(Usuario(nombre="Bench", email="bench@barberia.com", password="-", rol="empleado"))
+        db.session.flush()
+        db.session.add(Empleado(nombre="Bench", usuario_id=1, sucursal_id=1))
+        db.session.add(Servicio(nombre="Corte", precio=10, duracion_minutos=30))
+        base = datetime(2030, 1, 1, 9, 0)
+        db.session.add_all(Turno(nombre_cliente="Bench", fecha_hora=base + timedelta(days=d, minutes=30 * i),
+                                 cliente_id=1, empleado_id=1, servicio_id=1)
+                           for d in range(30) for i in range(16))
+        db.session.commit()
+
+
+def servir(tipo, puerto):
+    if tipo == 'wsgi':
+        # Un worker sync de gunicorn atiende una petición a la vez
+        import logging
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        from barberia import create_app
+        flask_app = create_app(blueprints='api')
+        _simular_latencia(flask_app)
+        make_server('127.0.0.1', puerto, flask_app, threaded=False).serve_forever()
+    else:
+        import uvicorn
+        from barberia.asgi import app, flask_app
+        _simular_latencia(flask_app)
+        uvicorn.run(app, host='127.0.0.1', port=puerto, log_level='warning')
+
+
+async def _cliente(puerto, fin, latencias, errores, indice):
+    while time.perf_counter() < fin:
+        dia = 1 + (indice + len(latencias)) % 28
+        peticion = (f"GET /api/disponibilidad?barbero_id=1&fecha=2030-01-{dia:02d} HTTP/1.1\r\n"
+                    f"Host: localhost\r\nConnection: close\r\n\r\n").encode()
+        inicio = time.perf_counter()
+        try:
+            lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+            escritor.write(peticion)
+            await escritor.drain()
+            respuesta = await lector.read()
+            escritor.close()
+            if b" 200 " not in respuesta.split(b"\r\n", 1)[0]:
+                errores.append(1)
+                continue
+        except OSError:
+            errores.append(1)
+            await asyncio.sleep(0.01)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def _cargar(puerto, concurrencia, segundos):
+    latencias, errores = [], []
+    fin = time.perf_counter() + segundos
+    await asyncio.gather(*[_cliente(puerto, fin, latencias, errores, i) for i in range(concurrencia)])
+    return latencias, errores
+
+
+def _esperar_puerto(puerto):
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', puerto), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servidor en el puerto {puerto} no arrancó")
+
+
+def medir(tipo, puerto, concurrencia, segundos):
+    proceso = subprocess.Popen([sys.executable, __file__, '--servir', tipo, str(puerto)], env=os.environ)
+    try:
+        _esperar_puerto(puerto)
+        latencias, errores = asyncio.run(_cargar(puerto, concurrencia, segundos))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000 if latencias else 0
+    p95 = latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0
+    print(f"{tipo.upper():<5} {len(latencias) / segundos:8.1f} req/s | p50 {p50:7.1f} ms | "
+          f"p95 {p95:7.1f} ms | errores: {len(errores)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--servir':
+        servir(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+
+    concurrencia = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    carpeta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(carpeta, 'bench.db')}"
+    os.environ['SESSION_BACKEND'] = 'cookie'
+    preparar()
+
+    print(f"{concurrencia} clientes concurrentes, {segundos}s, "
+          f"latencia simulada de BD: {os.getenv('BENCH_LATENCIA_BD_MS', 0)} ms")
+    medir('wsgi', PUERTO_WSGI, concurrencia, segundos)
+    medir('asgi', PUERTO_ASGI, concurrencia, segundos)
@@ -0,0 +1,41 @@
+"""Benchmark de verificación de contraseñas: logins por segundo por núcleo.
+
+Uso:
+    python bench_login.py                       # usa PASSWORD_HASH_METHOD del entorno
+    python bench_login.py scrypt:16384:8:1 pbkdf2:sha256:260000
+"""
+import os
+import sys
+import time
+from multiprocessing import Pool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DURACION_SEGUNDOS = float(os.getenv('BENCH_DURACION', 3))
+PASSWORD = "Admin123!"
+
+
+def _medir(password_hash):
+    # Cuenta cuántas verificaciones completa un núcleo en la ventana de tiempo
+    ops = 0
+    fin = time.perf_counter() + DURACION_SEGUNDOS
+    while time.perf_counter() < fin:
+        check_password_hash(password_hash, PASSWORD)
+        ops += 1
+    return ops / DURACION_SEGUNDOS
+
+
+def medir_metodo(metodo, nucleos):
+    password_hash = generate_password_hash(PASSWORD, method=metodo)
+    un_nucleo = _medir(password_hash)
+    with Pool(nucleos) as pool:
+        por_proceso = pool.map(_medir, [password_hash] * nucleos)
+    total = sum(por_proceso)
+    print(f"{metodo:<28} 1 núcleo: {un_nucleo:8.1f} logins/s | "
+          f"{nucleos} núcleos: {total:8.1f} logins/s ({total / nucleos:.1f} por núcleo)")
+
+
+if __name__ == "__main__":
+    metodos = sys.argv[1:] or [os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')]
+    nucleos = os.cpu_count() or 1
+    for metodo in metodos:
+        medir_metodo(metodo, nucleos)
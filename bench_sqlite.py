@@ -0,0 +1,106 @@
+"""Benchmark de reservas concurrentes sobre SQLite: configuración por defecto vs. perfil afinado.
+
+Simula varios workers de gunicorn (procesos) que reservan turnos a la vez sobre
+el mismo archivo, con la misma lógica que /agendar (consulta de solapamiento + insert).
+
+Uso:
+    python bench_sqlite.py [procesos] [reservas_por_proceso]
+"""
+import os
+import sys
+import time
+import tempfile
+import multiprocessing
+from datetime import datetime, timedelta
+
+app = None  # se crea una vez por worker en _iniciar_worker
+
+
+def _configurar_entorno(ruta_db, tuning):
+    os.environ['DATABASE_URL'] = f"sqlite:///{ruta_db}"
+    os.environ['SQLITE_TUNING'] = '1' if tuning else '0'
+    # El benchmark mide la base de datos, no el almacén de sesiones
+    os.environ['SESSION_BACKEND'] = 'cookie'
+
+
+def _iniciar_worker(ruta_db, tuning):
+    # La creación de la app (modelos, motor) queda fuera del tiempo medido
+    global app
+    _configurar_entorno(ruta_db, tuning)
+    from barberia import create_app
+    app = create_app(blueprints=())
+
+
+def _worker(args):
+    indice, reservas = args
+    from barberia.extensiones import db
+    from barberia.modelos import Turno
+
+    exitos = bloqueos = 0
+    base = datetime(2030, 1, 1, 8, 0) + timedelta(days=indice)
+    with app.app_context():
+        for i in range(reservas):
+            fecha_dt = base + timedelta(minutes=30 * (i % 24), days=30 * (i // 24))
+            try:
+                db.session.query(Turno).filter(
+                    Turno.empleado_id == 1,
+                    Turno.estado != 'cancelado',
+                    Turno.fecha_hora >= fecha_dt,
+                    Turno.fecha_hora < fecha_dt + timedelta(minutes=30)
+                ).all()
+                db.session.add(Turno(nombre_cliente="Bench", fecha_hora=fecha_dt, cliente_id=1,
+                                     empleado_id=1, servicio_id=1, estado='pendiente'))
+                db.session.commit()
+                exitos += 1
+            except Exception as e:
+                db.session.rollback()
+                if 'locked' in str(e):
+                    bloqueos += 1
+                else:
+                    raise
+    return exitos, bloqueos
+
+
+def preparar(ruta_db, tuning):
+    _configurar_entorno(ruta_db, tuning)
+    from barberia import create_app
+    from barberia.extensiones import db
+    from barberia.modelos import Usuario, Sucursal, Empleado, Servicio
+    with create_app(blueprints=()).app_context():
+        db.create_all()
+        db.session.add(Sucursal(nombre="Bench", direccion="-"))
+        db.session.add(Usuario(nombre="Bench", email="bench@barberia.com", password="-", rol="empleado"))
+        db.session.flush()
+        db.session.add(Empleado(nombre="Bench", usuario_id=1, sucursal_id=1))
+        db.session.add(Servicio(nombre="Corte", precio=10, duracion_minutos=30))
+        db.session.commit()
+        db.engine.dispose()
+
+
+def correr(tuning, procesos, reservas):
+    carpeta = tempfile.mkdtemp()
+    ruta_db = os.path.join(carpeta, 'bench.db')
+    ctx = multiprocessing.get_context('spawn')
+
+    with ctx.Pool(1) as pool:
+        pool.apply(preparar, (ruta_db, tuning))
+
+    with ctx.Pool(procesos, initializer=_iniciar_worker, initargs=(ruta_db, tuning)) as pool:
+        pool.map(time.sleep, [0.5] * procesos)  # espera a que todos los workers terminen de importar
+        inicio = time.perf_counter()
+        resultados = pool.map(_worker, [(i, reservas) for i in range(procesos)])
+        duracion = time.perf_counter() - inicio
+
+    exitos = sum(r[0] for r in resultados)
+    bloqueos = sum(r[1] for r in resultados)
+    nombre = "Afinado (WAL)" if tuning else "Por defecto"
+    print(f"{nombre:<15} {exitos:6d} reservas en {duracion:6.2f}s -> {exitos / duracion:8.1f} reservas/s "
+          f"| 'database is locked': {bloqueos}")
+
+
+if __name__ == "__main__":
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    reservas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print(f"{procesos} procesos x {reservas} reservas")
+    correr(False, procesos, reservas)
+    correr(True, procesos, reservas)
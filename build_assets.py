@@ -0,0 +1,79 @@
+"""Minifica y precomprime los estáticos (CSS/JS) en static/dist.
+
+Uso:
+    python build_assets.py
+
+Genera para cada archivo la versión minificada y sus variantes .gz y .br
+(brotli solo si el paquete está instalado). Flask sirve la variante
+precomprimida cuando el navegador la acepta (ver servir_estatico en barberia/estaticos.py).
+"""
+import os
+import re
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+STATIC = os.path.join(BASE, 'static')
+DIST = os.path.join(STATIC, 'dist')
+CARPETAS = ['css', 'js']
+
+
+def minificar_css(texto):
+    texto = re.sub(r'/\*.*?\*/', '', texto, flags=re.S)
+    texto = re.sub(r'\s+', ' ', texto)
+    texto = re.sub(r'\s*([{};,>])\s*', r'\1', texto)
+    return texto.replace(';}', '}').strip()
+
+
+def minificar_js(texto):
+    # Conservador: solo quitamos comentarios de línea completa, sangría y líneas vacías,
+    # así no hace falta un parser para no romper strings ni expresiones regulares.
+    lineas = []
+    for linea in texto.splitlines():
+        limpia = linea.strip()
+        if not limpia or limpia.startswith('//'):
+            continue
+        lineas.append(limpia)
+    return '\n'.join(lineas)
+
+
+def precomprimir(ruta, datos):
+    with open(ruta + '.gz', 'wb') as f:
+        f.write(gzip.compress(datos, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(ruta + '.br', 'wb') as f:
+            f.write(brotli.compress(datos, quality=11))
+
+
+def construir():
+    total_original = total_final = 0
+    for carpeta in CARPETAS:
+        origen = os.path.join(STATIC, carpeta)
+        if not os.path.isdir(origen):
+            continue
+        os.makedirs(os.path.join(DIST, carpeta), exist_ok=True)
+        for nombre in sorted(os.listdir(origen)):
+            with open(os.path.join(origen, nombre), encoding='utf-8') as f:
+                texto = f.read()
+            minificado = minificar_css(texto) if carpeta == 'css' else minificar_js(texto)
+            datos = minificado.encode('utf-8')
+
+            destino = os.path.join(DIST, carpeta, nombre)
+            with open(destino, 'wb') as f:
+                f.write(datos)
+            precomprimir(destino, datos)
+
+            comprimido = os.path.getsize(destino + ('.br' if brotli else '.gz'))
+            total_original += len(texto.encode('utf-8'))
+            total_final += comprimido
+            print(f"{carpeta}/{nombre}: {len(texto.encode('utf-8'))} -> {len(datos)} min -> {comprimido} comprimido")
+
+    print(f"✅ Estáticos: {total_original} bytes -> {total_final} bytes")
+
+
+if __name__ == "__main__":
+    construir()
@@ -0,0 +1,167 @@
+"""Migraciones de esquema versionadas (reemplaza db.create_all al importar app.py).
+
+Uso:
+    python migraciones.py            # aplica las migraciones pendientes
+    python migraciones.py estado     # muestra qué versiones están aplicadas
+    flask --app app migrar           # lo mismo desde el CLI de Flask
+
+Cada migración es una función que recibe una conexión. Las marcadas con
+transaccional=False corren en modo AUTOCOMMIT; así en Postgres los índices se
+crean con CREATE INDEX CONCURRENTLY sin bloquear las escrituras de la tabla.
+
+SQLite: desde que se activan las claves foráneas (SQLITE_FOREIGN_KEYS, por defecto
+encendido) no se puede borrar un servicio, producto o empleado con turnos o ventas.
+Antes de actualizar una base existente conviene correr `PRAGMA foreign_key_check`
+y corregir las filas huérfanas que liste.
+"""
+import sys
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, inspect, text
+
+from barberia import create_app
+from barberia.extensiones import db
+import barberia.modelos  # noqa: F401  (registra las tablas en db.metadata)
+
+metadata_versiones = MetaData()
+esquema_version = Table(
+    'esquema_version', metadata_versiones,
+    Column('version', Integer, primary_key=True),
+    Column('nombre', String(100), nullable=False),
+    Column('aplicada_en', DateTime, nullable=False),
+)
+
+# Número arbitrario para el advisory lock de Postgres (evita dos migraciones a la vez)
+LOCK_MIGRACIONES = 19990001
+
+
+def crear_indice(conn, nombre, tabla, columnas):
+    if conn.dialect.name == 'postgresql':
+        # Un CONCURRENTLY que falló deja el índice marcado INVALID, e IF NOT EXISTS lo daría por hecho
+        invalido = conn.execute(text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :nombre AND pg_table_is_visible(c.oid) AND NOT i.indisvalid"), {'nombre': nombre}).first()
+        if invalido:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {nombre}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {nombre} ON {tabla} ({columnas})"))
+    else:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})"))
+
+
+def agregar_columna(conn, tabla, columna, definicion):
+    # Idempotente: las bases creadas con db.create_all pueden tenerla ya
+    if columna not in {c['name'] for c in inspect(conn).get_columns(tabla)}:
+        conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}"))
+
+
+# --- MIGRACIONES ---
+
+def m0001_esquema_inicial(conn):
+    # checkfirst: en bases existentes solo crea las tablas que falten
+    db.metadata.create_all(conn)
+
+
+def m0002_usuario_sucursal(conn):
+    agregar_columna(conn, 'usuario', 'sucursal_id', 'INTEGER REFERENCES sucursal(id)')
+
+
+def m0003_indices_turno(conn):
+    crear_indice(conn, 'ix_turno_cliente_fecha', 'turno', 'cliente_id, fecha_hora')
+    crear_indice(conn, 'ix_turno_empleado_fecha', 'turno', 'empleado_id, fecha_hora')
+    crear_indice(conn, 'ix_empleado_sucursal_id', 'empleado', 'sucursal_id')
+
+
+def m0004_indices_hijos_turno(conn):
+    # El archivo histórico borra adicionales y ventas por turno_id
+    crear_indice(conn, 'ix_turno_adicional_turno_id', 'turno_adicional', 'turno_id')
+    crear_indice(conn, 'ix_ventas_turno_id', 'ventas', 'turno_id')
+
+
+def m0005_lista_espera(conn):
+    barberia.modelos.ListaEspera.__table__.create(conn, checkfirst=True)
+
+
+def m0006_indice_bloqueos(conn):
+    # La búsqueda de próximos horarios lee los bloqueos de varios barberos por rango de fechas
+    crear_indice(conn, 'ix_bloqueo_empleado_fecha', 'bloqueo_disponibilidad', 'empleado_id, fecha')
+
+
+def m0007_series(conn):
+    barberia.modelos.SerieTurno.__table__.create(conn, checkfirst=True)
+    agregar_columna(conn, 'turno', 'serie_id', 'INTEGER REFERENCES serie_turno(id)')
+
+
+def m0008_indice_serie(conn):
+    # Aparte de 0007: el índice sobre turno se crea sin transacción (CONCURRENTLY en Postgres)
+    crear_indice(conn, 'ix_turno_serie_id', 'turno', 'serie_id')
+
+
+# (version, nombre, funcion, transaccional)
+MIGRACIONES = [
+    (1, 'esquema_inicial', m0001_esquema_inicial, True),
+    (2, 'usuario_sucursal', m0002_usuario_sucursal, True),
+    (3, 'indices_turno', m0003_indices_turno, False),
+    (4, 'indices_hijos_turno', m0004_indices_hijos_turno, False),
+    (5, 'lista_espera', m0005_lista_espera, True),
+    (6, 'indice_bloqueos', m0006_indice_bloqueos, False),
+    (7, 'series', m0007_series, True),
+    (8, 'indice_serie', m0008_indice_serie, False),
+]
+
+
+def versiones_aplicadas(conn):
+    metadata_versiones.create_all(conn)
+    return {fila.version for fila in conn.execute(esquema_version.select())}
+
+
+def registrar(conn, version, nombre):
+    conn.execute(esquema_version.insert().values(version=version, nombre=nombre, aplicada_en=datetime.now()))
+
+
+def migrar(engine=None):
+    engine = engine or db.engine
+    aplicadas = []
+    with engine.connect() as lock_conn:
+        if engine.dialect.name == 'postgresql':
+            lock_conn.execute(text(f"SELECT pg_advisory_lock({LOCK_MIGRACIONES})"))
+        try:
+            with engine.begin() as conn:
+                hechas = versiones_aplicadas(conn)
+
+            for version, nombre, funcion, transaccional in MIGRACIONES:
+                if version in hechas:
+                    continue
+                if transaccional:
+                    with engine.begin() as conn:
+                        funcion(conn)
+                        registrar(conn, version, nombre)
+                else:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                        funcion(conn)
+                        registrar(conn, version, nombre)
+                aplicadas.append(version)
+                print(f"✅ Migración {version:04d} ({nombre}) aplicada")
+        finally:
+            if engine.dialect.name == 'postgresql':
+                lock_conn.execute(text(f"SELECT pg_advisory_unlock({LOCK_MIGRACIONES})"))
+                lock_conn.commit()
+
+    if not aplicadas:
+        print("Esquema al día, no hay migraciones pendientes.")
+    return aplicadas
+
+
+def estado(engine=None):
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        hechas = versiones_aplicadas(conn)
+    for version, nombre, _, _ in MIGRACIONES:
+        marca = "✅" if version in hechas else "⏳"
+        print(f"{marca} {version:04d} {nombre}")
+
+
+if __name__ == "__main__":
+    with create_app(blueprints=()).app_context():
+        if len(sys.argv) > 1 and sys.argv[1] == 'estado':
+            estado()
+        else:
+            migrar()
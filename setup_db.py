@@ -1,45 +1,218 @@
+"""Inicialización de la base.
+
+Uso:
+    python setup_db.py                     # migra y crea el admin y la sede inicial
+    python setup_db.py --reset             # borra la base SQLite antes
+    python setup_db.py --reset --fixtures  # entorno completo de prueba (CI, staging, benchmarks)
+    python setup_db.py --reset --fixtures --turnos 100000 --sucursales 3 --barberos 5
+
+Las fixtures se insertan en bloque (executemany) y en una sola transacción:
+sedes, gerentes, barberos con su cuenta, clientes, catálogo, reglas de puntos,
+premios y meses de turnos con adicionales y ventas. Todas las cuentas usan la
+contraseña FIXTURES_PASSWORD.
+"""
 import os
-from dotenv import load_dotenv
-from app import app, db, Usuario, Sucursal, Empleado, Servicio, Producto, ReglaPuntos
-from werkzeug.security import generate_password_hash
-
-def inicializar_sistema():
-    # Asegurar que la carpeta instance exista si usas SQLite en instance/
-    if not os.path.exists("instance"):
-        os.makedirs("instance")
-        print("📁 Carpeta 'instance' creada.")
-
-    db_path = "instance/barberia.db" # Ajusta a tu ruta real
-    
-    if os.path.exists(db_path):
-        try:
-            os.remove(db_path)
-            print(f"🗑️ Base de datos antigua eliminada.")
-        except Exception as e:
-            print(f"❌ Error al borrar: {e}")
-            return
+import math
+import random
+import argparse
+from datetime import datetime, timedelta
+from flask import current_app
+from barberia import create_app
+from barberia.extensiones import db
+from barberia.modelos import (Usuario, Sucursal, Empleado, Servicio, Producto, ReglaPuntos, Premio, Turno,
+                              TurnoAdicional, Venta)
+from barberia.seguridad import hashear_password
+from migraciones import migrar
+
+FIXTURES_PASSWORD = "Barberia123!"
+
+SERVICIOS = [("Corte Clásico", 15000, 30), ("Corte + Barba", 25000, 45), ("Barba", 12000, 20),
+             ("Fade", 18000, 40), ("Corte Infantil", 12000, 30), ("Tinte", 35000, 60),
+             ("Cejas", 5000, 15), ("Mascarilla", 10000, 20)]
+PRODUCTOS = [("Cera Mate", 28000, "uds"), ("Pomada", 32000, "uds"), ("Aceite de Barba", 30000, "ml"),
+             ("Shampoo", 25000, "ml"), ("After Shave", 27000, "ml"), ("Gel", 15000, "uds")]
+REGLAS = [(0, 19999, 5), (20000, 39999, 10), (40000, 10 ** 7, 20)]
+PREMIOS = [("Corte gratis", 150, "Un corte clásico sin costo"), ("Barba gratis", 100, "Arreglo de barba"),
+           ("Producto a elección", 250, "Cualquier producto del inventario")]
+NOMBRES = ["Juan", "Carlos", "Andrés", "Felipe", "Santiago", "Mateo", "Daniel", "Camilo", "Sebastián", "Luis",
+           "Miguel", "David", "Jorge", "Diego", "Alejandro", "Nicolás", "Tomás", "Samuel", "Simón", "Martín"]
+APELLIDOS = ["García", "Rodríguez", "Martínez", "López", "Gómez", "Pérez", "Sánchez", "Ramírez", "Torres",
+             "Díaz", "Vargas", "Rojas", "Moreno", "Castro", "Ortiz"]
+
+
+def _insertar(modelo, filas):
+    # INSERT en bloque (executemany) y lectura de los ids nuevos. Las fixtures corren sobre una base
+    # recién creada y en una sola transacción, así que los ids salen en el orden de las filas.
+    # (RETURNING con orden garantizado obliga a SQLAlchemy a insertar fila por fila en SQLite.)
+    if not filas:
+        return []
+    antes = db.session.scalar(db.select(db.func.max(modelo.id))) or 0
+    db.session.execute(db.insert(modelo), filas)
+    ids = list(db.session.scalars(db.select(modelo.id).where(modelo.id > antes).order_by(modelo.id)))
+    if len(ids) != len(filas):
+        raise RuntimeError(f"Otra conexión insertó en {modelo.__tablename__} durante la siembra")
+    return ids
+
+
+def _insertar_sin_ids(modelo, filas):
+    # Sin filas no hay nada que insertar (execute con una lista vacía haría un INSERT sin valores)
+    if filas:
+        db.session.execute(db.insert(modelo), filas)
+
+
+def _ruta_sqlite():
+    url = db.engine.url
+    return url.database if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:') else None
+
+
+def sembrar_fixtures(turnos=100000, sucursales=3, barberos=5, clientes=2000, semilla=1999):
+    """Crea un entorno completo en una sola transacción. `barberos` es por sede."""
+    rnd = random.Random(semilla)
+    apertura, cierre = current_app.config['AGENDA_HORA_APERTURA'], current_app.config['AGENDA_HORA_CIERRE']
+    inicio_reloj = datetime.now()
+    password = hashear_password(FIXTURES_PASSWORD)  # un solo hash para todas las cuentas de prueba
+
+    def nombre():
+        return f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}"
+
+    _insertar(Usuario, [dict(nombre="Admin General", email="admin@barberia.com", password=password,
+                             rol="admin", confirmado=True)])
+    sedes = _insertar(Sucursal, [dict(nombre=f"Sede {i + 1}", direccion=f"Calle {100 + i * 7} #{10 + i}-{20 + i}")
+                                 for i in range(sucursales)])
+    _insertar(Usuario, [dict(nombre=f"Gerente {i + 1}", email=f"gerente{i + 1}@barberia.com", password=password,
+                             rol="gerente", confirmado=True, sucursal_id=s) for i, s in enumerate(sedes)])
+
+    cuentas = [dict(nombre=nombre(), email=f"barbero{i + 1}@barberia.com", password=password, rol="empleado",
+                    confirmado=True) for i in range(sucursales * barberos)]
+    usuarios_barberos = _insertar(Usuario, cuentas)
+    empleados = _insertar(Empleado, [dict(nombre=c['nombre'], especialidad=rnd.choice(["Cortes", "Barba", "Color"]),
+                                          comision_porcentaje=rnd.choice([50.0, 60.0, 70.0]), usuario_id=u,
+                                          sucursal_id=sedes[i // barberos])
+                                     for i, (c, u) in enumerate(zip(cuentas, usuarios_barberos))])
+
+    nombres_clientes = [nombre() for _ in range(clientes)]
+    ids_clientes = _insertar(Usuario, [dict(nombre=n, email=f"cliente{i + 1}@correo.com", password=password,
+                                            rol="cliente", confirmado=True)
+                                       for i, n in enumerate(nombres_clientes)])
+
+    ids_servicios = _insertar(Servicio, [dict(nombre=n, precio=p, duracion_minutos=d) for n, p, d in SERVICIOS])
+    ids_productos = _insertar(Producto, [dict(nombre=n, precio=p, stock=rnd.randint(5, 60), unidad=u)
+                                         for n, p, u in PRODUCTOS])
+    _insertar_sin_ids(ReglaPuntos, [dict(rango_min=a, rango_max=b, puntos=p) for a, b, p in REGLAS])
+    _insertar_sin_ids(Premio, [dict(nombre=n, puntos_requeridos=p, descripcion=d) for n, p, d in PREMIOS])
+
+    # Turnos: se llena la agenda de cada barbero día por día hacia atrás desde dentro de dos semanas,
+    # con huecos y duraciones reales, hasta juntar `turnos`
+    servicios = list(zip(ids_servicios, SERVICIOS))
+    pesos = [30, 20, 12, 18, 8, 4, 5, 3]
+    productos = list(zip(ids_productos, PRODUCTOS))
+    ahora = datetime.now()
+    dia = ahora.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=14)
+    filas_turnos, extras = [], []  # extras[i] = adicionales del turno i: [(tipo, item_id, nombre, precio)]
+    while len(filas_turnos) < turnos:
+        for empleado_id in empleados:
+            minuto = apertura * 60 + rnd.choice((0, 15, 30, 60))
+            while len(filas_turnos) < turnos:
+                servicio_id, (_, precio, duracion) = rnd.choices(servicios, pesos)[0]
+                if minuto + duracion > cierre * 60:
+                    break
+                fecha = dia + timedelta(minutes=minuto)
+                if fecha > ahora:
+                    estado = 'pendiente'
+                else:
+                    estado = rnd.choices(('completado', 'cancelado', 'inasistencia'), (85, 8, 7))[0]
+                adicionales = []
+                if rnd.random() < 0.15:
+                    extra_id, (extra_nombre, extra_precio, _) = servicios[rnd.choice((2, 6, 7))]
+                    adicionales.append(('servicio', extra_id, extra_nombre, extra_precio))
+                if estado == 'completado' and rnd.random() < 0.1:
+                    producto_id, (producto_nombre, producto_precio, _) = rnd.choice(productos)
+                    adicionales.append(('producto', producto_id, producto_nombre, producto_precio))
+                cliente = rnd.randrange(clientes)
+                filas_turnos.append(dict(
+                    nombre_cliente=nombres_clientes[cliente], fecha_hora=fecha, estado=estado,
+                    cliente_id=ids_clientes[cliente], empleado_id=empleado_id, servicio_id=servicio_id,
+                    monto_total=float(precio + sum(a[3] for a in adicionales))))
+                extras.append(adicionales)
+                minuto += duracion + rnd.choice((0, 0, 15, 30, 45, 90))
+        dia -= timedelta(days=1)
+
+    ids_turnos = _insertar(Turno, filas_turnos)
+    _insertar_sin_ids(TurnoAdicional, [
+        dict(turno_id=t, tipo=tipo, item_id=item, nombre=n, precio=p)
+        for t, adicionales in zip(ids_turnos, extras) for tipo, item, n, p in adicionales])
+    _insertar_sin_ids(Venta, [
+        dict(turno_id=t, producto_id=item, cantidad=1)
+        for t, adicionales in zip(ids_turnos, extras) for tipo, item, _, _ in adicionales if tipo == 'producto'])
+
+    # Puntos de cada cliente según las reglas, sobre sus turnos completados
+    puntos = {}
+    for fila in filas_turnos:
+        if fila['estado'] == 'completado':
+            ganados = next((p for a, b, p in REGLAS if a <= fila['monto_total'] <= b), 0)
+            puntos[fila['cliente_id']] = puntos.get(fila['cliente_id'], 0) + ganados
+    if puntos:
+        db.session.execute(db.update(Usuario), [dict(id=c, puntos_acumulados=p) for c, p in puntos.items()])
+
+    db.session.commit()
+    dias = (ahora.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=14) - dia).days
+    print(f"🌱 Fixtures: {sucursales} sedes, {len(empleados)} barberos, {clientes} clientes, "
+          f"{len(filas_turnos)} turnos en {dias} días ({math.ceil(dias / 30)} meses) "
+          f"en {(datetime.now() - inicio_reloj).total_seconds():.1f}s")
+    print(f"🔑 Cuentas: admin@barberia.com, gerente1@barberia.com, barbero1@barberia.com, "
+          f"cliente1@correo.com / {FIXTURES_PASSWORD}")
+
+
+def inicializar_sistema(reiniciar=False, fixtures=None):
+    app = create_app(blueprints=())
 
     with app.app_context():
-        db.create_all()
-        
-        # 1. Admin Maestro
-        admin = Usuario(
-            nombre="Admin General",
-            email="admin@barberia.com",
-            password=generate_password_hash("Admin123!"),
-            rol="admin"
-        )
-        db.session.add(admin)
-        db.session.commit() # Commiteamos para tener el ID del admin
+        # Borrar la base solo si se pide explícitamente (python setup_db.py --reset);
+        # por defecto se migra el esquema existente sin perder datos.
+        db_path = _ruta_sqlite()
+        if reiniciar and db_path and os.path.exists(db_path):
+            db.engine.dispose()
+            try:
+                os.remove(db_path)
+                print("🗑️ Base de datos antigua eliminada.")
+            except Exception as e:
+                print(f"❌ Error al borrar: {e}")
+                return
+        elif db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
 
-        # 2. Sucursal
-        sucursal = Sucursal(nombre="Sede Central", direccion="Calle 123")
-        db.session.add(sucursal)
-        db.session.commit()
+        migrar()
+
+        if Usuario.query.filter_by(rol='admin').first():
+            print("ℹ️ El sistema ya tiene datos iniciales, no se vuelve a sembrar.")
+            return
 
+        if fixtures is not None:
+            sembrar_fixtures(**fixtures)
+            return
 
+        # Admin maestro y sede inicial en una sola transacción
+        db.session.add(Usuario(
+            nombre="Admin General",
+            email="admin@barberia.com",
+            password=hashear_password("Admin123!"),
+            rol="admin"
+        ))
+        db.session.add(Sucursal(nombre="Sede Central", direccion="Calle 123"))
         db.session.commit()
         print("🚀 SISTEMA REINICIADO EXITOSAMENTE")
 
+
 if __name__ == "__main__":
-    inicializar_sistema()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Inicializa la base de la barbería.")
+    parser.add_argument('--reset', action='store_true', help="borra la base SQLite antes de migrar")
+    parser.add_argument('--fixtures', action='store_true', help="siembra un entorno completo de prueba")
+    parser.add_argument('--turnos', type=int, default=100000)
+    parser.add_argument('--sucursales', type=int, default=3)
+    parser.add_argument('--barberos', type=int, default=5, help="barberos por sede")
+    parser.add_argument('--clientes', type=int, default=2000)
+    parser.add_argument('--semilla', type=int, default=1999)
+    args = parser.parse_args()
+    inicializar_sistema(reiniciar=args.reset, fixtures=dict(
+        turnos=args.turnos, sucursales=args.sucursales, barberos=args.barberos,
+        clientes=args.clientes, semilla=args.semilla) if args.fixtures else None)
@@ -0,0 +1,483 @@
+// --- CARGA PEREZOSA DE SECCIONES ---
+// Cada sección pide sus datos por JSON la primera vez que se abre
+// (o de nuevo si cambian los filtros de sede/barbero).
+let premiosDisponibles = [];
+let barberosFiltro = [];
+const seccionesCargadas = {};
+const cursores = {};
+
+const cargadores = {
+    inicio: () => { cargarAgenda(false); cargarHistorial(false); },
+    datos: () => cargarContabilidad(),
+    usuarios: () => cargarUsuarios(false),
+    inventario: () => cargarInventario(false),
+    puntos: () => cargarPuntos()
+};
+
+function esc(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto == null ? '' : String(texto);
+    return div.innerHTML;
+}
+
+function dinero(valor) {
+    return '$' + Math.round(valor || 0).toLocaleString('en-US');
+}
+
+function paramsFiltros(extra = {}) {
+    const params = new URLSearchParams(extra);
+    const sucursal = document.getElementById('filtroSucursal').value;
+    const barbero = document.getElementById('filtroBarbero').value;
+    if (sucursal) params.set('sucursal_id', sucursal);
+    if (barbero) params.set('barbero_id', barbero);
+    return params;
+}
+
+async function pedirJSON(url, params) {
+    const resp = await fetch(`${url}?${params.toString()}`);
+    if (!resp.ok) throw new Error(`Error ${resp.status} en ${url}`);
+    return resp.json();
+}
+
+function botonMas(id, siguiente) {
+    document.getElementById(id).style.display = siguiente ? 'inline-block' : 'none';
+}
+
+function showSection(id) {
+    document.querySelectorAll('.section').forEach(s => s.classList.remove('active'));
+    document.querySelectorAll('.nav-btn').forEach(b => b.classList.remove('active'));
+    const target = document.getElementById(id);
+    if (target) {
+        target.classList.add('active');
+        const btn = Array.from(document.querySelectorAll('.nav-btn')).find(b => b.getAttribute('onclick').includes(id));
+        if (btn) btn.classList.add('active');
+        window.location.hash = id;
+
+        if (!seccionesCargadas[id] && cargadores[id]) {
+            seccionesCargadas[id] = true;
+            cargadores[id]();
+        }
+    }
+}
+
+async function cargarFiltros() {
+    const data = await pedirJSON('/admin/api/filtros', new URLSearchParams());
+    barberosFiltro = data.barberos;
+    const sucursal = document.getElementById('filtroSucursal');
+    data.sucursales.forEach(s => {
+        const opcion = `<option value="${s.id}">${esc(s.nombre)}</option>`;
+        sucursal.insertAdjacentHTML('beforeend', opcion);
+        document.querySelectorAll('.select-sucursal-form').forEach(sel => sel.insertAdjacentHTML('beforeend', opcion));
+    });
+    // Gerente de sede: el filtro queda fijo en su sucursal
+    if (data.sucursal_fija) {
+        sucursal.value = String(data.sucursal_fija);
+        sucursal.disabled = true;
+    }
+    llenarBarberos();
+}
+
+function llenarBarberos() {
+    const sucursal = document.getElementById('filtroSucursal').value;
+    const select = document.getElementById('filtroBarbero');
+    const actual = select.value;
+    select.innerHTML = '<option value="">Todos los barberos</option>';
+    barberosFiltro
+        .filter(b => !sucursal || String(b.sucursal_id) === sucursal)
+        .forEach(b => select.insertAdjacentHTML('beforeend',
+            `<option value="${b.id}" ${String(b.id) === actual ? 'selected' : ''}>${esc(b.nombre)}</option>`));
+}
+
+function cambiarFiltros() {
+    llenarBarberos();
+    Object.keys(seccionesCargadas).forEach(k => delete seccionesCargadas[k]);
+    showSection(window.location.hash.replace('#', '') || 'inicio');
+}
+
+// --- AGENDA DEL DÍA ---
+async function cargarAgenda(mas) {
+    const contenedor = document.getElementById('agendaBarberos');
+    const extra = { fecha: contenedor.dataset.fecha };
+    if (mas && cursores.agenda) extra.cursor = cursores.agenda;
+    const data = await pedirJSON('/admin/api/agenda', paramsFiltros(extra));
+
+    if (!mas) {
+        contenedor.innerHTML = '';
+        const sucursal = document.getElementById('filtroSucursal').value;
+        const barbero = document.getElementById('filtroBarbero').value;
+        barberosFiltro
+            .filter(b => (!sucursal || String(b.sucursal_id) === sucursal) && (!barbero || String(b.id) === barbero))
+            .forEach(b => contenedor.insertAdjacentHTML('beforeend', `
+                <div style="margin-top: 30px;">
+                    <h4 style="color: white; border-left: 2px solid var(--gold); padding-left: 15px; text-transform: uppercase; letter-spacing: 2px; font-weight: 400; margin-bottom: 15px;">${esc(b.nombre)}</h4>
+                    <div style="width: 100%; overflow-x: auto; border-radius: 8px;">
+                        <table style="width: 100%; min-width: 600px; border-collapse: collapse;">
+                            <thead>
+                                <tr style="border-bottom: 1px solid #333;">
+                                    <th>Hora</th><th>Cliente</th><th>Servicio</th><th>Estado</th><th style="text-align: right;">Acción</th>
+                                </tr>
+                            </thead>
+                            <tbody id="agenda-barbero-${b.id}"></tbody>
+                        </table>
+                    </div>
+                </div>`));
+    }
+    if (data.stats) {
+        document.getElementById('statPendientes').textContent = data.stats.programados_hoy;
+        document.getElementById('statCompletados').textContent = data.stats.completados_hoy;
+        document.getElementById('statHistorico').textContent = data.stats.total_turnos_historico;
+    }
+
+    data.turnos.forEach(t => {
+        const tbody = document.getElementById(`agenda-barbero-${t.empleado_id}`);
+        if (tbody) tbody.insertAdjacentHTML('beforeend', filaAgenda(t));
+    });
+    cursores.agenda = data.siguiente;
+    botonMas('btnMasAgenda', data.siguiente);
+}
+
+function filaAgenda(t) {
+    const accion = t.estado === 'pendiente'
+        ? `<form action="/cancelar-turno/${t.id}" method="POST" style="display:inline;">
+               <button type="submit" class="btn-action-dim" onclick="return confirm('¿Seguro?')">Cancelar</button>
+           </form>`
+        : `<span style="color: var(--text-dim); font-size: 0.8em;">Procesado</span>`;
+    return `
+        <tr style="border-bottom: 1px solid #222;" data-turno-id="${t.id}" data-hora="${t.hora}">
+            <td width="10%"><strong style="color: var(--gold);">${t.hora}</strong></td>
+            <td>${esc(t.cliente)}</td>
+            <td style="color: var(--text-dim);">${esc(t.servicio)}</td>
+            <td><span class="badge-gold">${esc(t.estado)}</span></td>
+            <td style="text-align: right;">${accion}</td>
+        </tr>`;
+}
+
+// --- AGENDA EN TIEMPO REAL (SSE) ---
+// Cada cambio de turno llega por /admin/eventos: se mueve solo su fila
+// y se ajustan los contadores, sin volver a pedir la agenda completa.
+function hoyISO() {
+    const d = new Date();
+    return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+}
+
+function enFiltro(empleadoId, sucursalId) {
+    const sucursal = document.getElementById('filtroSucursal').value;
+    const barbero = document.getElementById('filtroBarbero').value;
+    return (!sucursal || String(sucursalId) === sucursal) && (!barbero || String(empleadoId) === barbero);
+}
+
+function sumarStat(id, delta) {
+    const el = document.getElementById(id);
+    const valor = parseInt(el.textContent, 10);
+    if (!isNaN(valor)) el.textContent = valor + delta;
+}
+
+function contarTurno(t, signo) {
+    if (!t || !enFiltro(t.empleado_id, t.sucursal_id)) return;
+    if (t.fecha === hoyISO() && t.estado === 'pendiente') sumarStat('statPendientes', signo);
+    if (t.fecha === hoyISO() && t.estado === 'completado') sumarStat('statCompletados', signo);
+    if (!['cancelado', 'inasistencia'].includes(t.estado)) sumarStat('statHistorico', signo);
+}
+
+function aplicarEventoTurno(ev) {
+    if (!seccionesCargadas.inicio) return;  // La agenda se pedirá completa al abrir la sección
+    if (ev.tipo === 'resincronizar') {
+        cargarAgenda(false);
+        return;
+    }
+    contarTurno(ev.antes, -1);
+    contarTurno(ev, +1);
+
+    const contenedor = document.getElementById('agendaBarberos');
+    const anterior = contenedor.querySelector(`tr[data-turno-id="${ev.id}"]`);
+    if (anterior) anterior.remove();
+
+    const tbody = document.getElementById(`agenda-barbero-${ev.empleado_id}`);
+    if (ev.fecha !== contenedor.dataset.fecha || !tbody) return;
+    // Si aún quedan páginas y el turno cae después de lo cargado, llegará con "Ver más"
+    if (cursores.agenda && `${ev.fecha}T${ev.hora}` > cursores.agenda.slice(0, 16)) return;
+
+    const siguiente = Array.from(tbody.rows).find(f => f.dataset.hora > ev.hora);
+    if (siguiente) siguiente.insertAdjacentHTML('beforebegin', filaAgenda(ev));
+    else tbody.insertAdjacentHTML('beforeend', filaAgenda(ev));
+}
+
+function escucharAgenda() {
+    if (!window.EventSource) return;
+    const fuente = new EventSource('/admin/eventos');
+    fuente.addEventListener('turno', e => aplicarEventoTurno(JSON.parse(e.data)));
+}
+
+async function cargarHistorial(mas) {
+    const extra = mas && cursores.historial ? { cursor: cursores.historial } : {};
+    const data = await pedirJSON('/admin/api/historial', paramsFiltros(extra));
+    const tbody = document.getElementById('tablaHistorial');
+    if (!mas) tbody.innerHTML = '';
+    data.turnos.forEach(t => tbody.insertAdjacentHTML('beforeend', `
+        <tr>
+            <td style="color: var(--gold);">${t.fecha}</td>
+            <td>${esc(t.cliente)}</td>
+            <td>${esc(t.barbero)}</td>
+            <td style="color: var(--text-dim);">${esc(t.servicio)}</td>
+            <td><span class="badge-gold">${esc(t.estado)}</span></td>
+            <td>${dinero(t.total)}</td>
+        </tr>`));
+    cursores.historial = data.siguiente;
+    botonMas('btnMasHistorial', data.siguiente);
+}
+
+// --- CONTABILIDAD ---
+async function cargarContabilidad() {
+    const data = await pedirJSON('/admin/api/contabilidad', paramsFiltros());
+    document.getElementById('periodoLiquidacion').textContent = data.periodo;
+    document.getElementById('tablaLiquidacion').innerHTML = data.liquidacion.map(item => `
+        <tr>
+            <td><strong>${esc(item.nombre)}</strong></td>
+            <td>${dinero(item.total_recaudado)}</td>
+            <td style="color: var(--gold); font-weight: bold;">${dinero(item.pago_barbero)}</td>
+            <td>${dinero(item.ganancia_local)}</td>
+        </tr>`).join('');
+}
+
+// --- PERSONAL Y BLOQUEOS ---
+async function cargarUsuarios(mas) {
+    const extra = mas && cursores.bloqueos ? { cursor: cursores.bloqueos } : {};
+    const data = await pedirJSON('/admin/api/usuarios', paramsFiltros(extra));
+
+    if (data.empleados) {
+        document.getElementById('tablaEmpleados').innerHTML = data.empleados.map(e => `
+            <tr>
+                <td><strong>${esc(e.nombre)}</strong></td>
+                <td><span style="color: var(--text-dim);">${esc(e.sucursal)}</span></td>
+                <td><a href="/admin/eliminar-empleado/${e.id}" class="btn-action-dim" onclick="return confirm('¿Confirmar baja?')">Eliminar</a></td>
+            </tr>`).join('');
+    }
+
+    const tbody = document.getElementById('tablaBloqueos');
+    if (!mas) tbody.innerHTML = '';
+    data.bloqueos.forEach(b => {
+        const horario = b.dia_completo
+            ? `<span style="border: 1px solid var(--gold); color: var(--gold); padding: 2px 8px; font-size: 0.7em; text-transform: uppercase;">Jornada Completa</span>`
+            : `${esc(b.hora_inicio)} - ${esc(b.hora_fin)}`;
+        tbody.insertAdjacentHTML('beforeend', `
+            <tr>
+                <td><strong>${esc(b.barbero)}</strong></td>
+                <td style="color: var(--gold);">${esc(b.fecha)}</td>
+                <td>${horario}</td>
+                <td style="color: var(--text-dim); font-style: italic; font-size: 0.85em;">${esc(b.motivo || 'Sin especificar')}</td>
+                <td style="text-align: right; white-space: nowrap;">
+                    <a href="/admin/editar-bloqueo/${b.id}"
+                       style="color: var(--gold); text-decoration: none; margin-right: 15px; font-size: 0.8em; letter-spacing: 1px;">EDITAR</a>
+                    <form action="/admin/eliminar-bloqueo/${b.id}" method="POST" style="display: inline;">
+                        <button type="submit"
+                                style="background: none; border: none; color: white; cursor: pointer; font-family: Arial, sans-serif; font-size: 1.2em; vertical-align: middle;"
+                                onclick="return confirm('¿Anular este bloqueo?')">✕</button>
+                    </form>
+                </td>
+            </tr>`);
+    });
+    cursores.bloqueos = data.siguiente;
+    botonMas('btnMasBloqueos', data.siguiente);
+}
+
+// --- SERVICIOS Y STOCK ---
+const catalogo = { servicios: {}, productos: {} };
+
+async function cargarInventario(mas) {
+    const extra = mas && cursores.productos ? { cursor: cursores.productos } : {};
+    const data = await pedirJSON('/admin/api/inventario', new URLSearchParams(extra));
+
+    if (data.servicios) {
+        data.servicios.forEach(s => catalogo.servicios[s.id] = s);
+        document.getElementById('tablaServicios').innerHTML = data.servicios.map(s => `
+            <tr>
+                <td>${esc(s.nombre)}</td>
+                <td style="color: #888;">${s.duracion_minutos} min</td>
+                <td style="font-weight: bold; color: var(--gold);">${dinero(s.precio)}</td>
+                <td style="text-align: right;">
+                    <button onclick="editarServicio(${s.id})"
+                            style="background:none; border:none; color:var(--gold); cursor:pointer; font-size: 1.1em;">✎</button>
+                    <a href="/admin/eliminar-servicio/${s.id}"
+                       style="color: white; text-decoration: none; margin-left: 10px;"
+                       onclick="return confirm('¿Eliminar servicio?')">✕</a>
+                </td>
+            </tr>`).join('');
+    }
+
+    const tbody = document.getElementById('tablaProductos');
+    if (!mas) tbody.innerHTML = '';
+    data.productos.forEach(p => {
+        catalogo.productos[p.id] = p;
+        tbody.insertAdjacentHTML('beforeend', `
+            <tr>
+                <td>${esc(p.nombre)} <br><small style="color: #666;">${esc(p.unidad)}</small></td>
+                <td style="font-weight: bold; color: var(--gold);">${p.stock}</td>
+                <td>${dinero(p.precio)}</td>
+                <td style="text-align: right;">
+                    <button onclick="editarProducto(${p.id})"
+                            style="background:none; border:none; color:var(--gold); cursor:pointer; font-size: 1.1em;">✎</button>
+                    <a href="/admin/eliminar-producto/${p.id}"
+                       style="color: white; text-decoration: none; margin-left: 10px;"
+                       onclick="return confirm('¿Eliminar producto?')">✕</a>
+                </td>
+            </tr>`);
+    });
+    cursores.productos = data.siguiente;
+    botonMas('btnMasProductos', data.siguiente);
+}
+
+async function importarArchivo(event) {
+    event.preventDefault();
+    const form = event.target;
+    const boton = form.querySelector('button[type="submit"]');
+    const salida = document.getElementById('resultadoImportar');
+    boton.disabled = true;
+    salida.innerHTML = '<p style="color: #888;">Procesando...</p>';
+    try {
+        const resp = await fetch('/admin/importar', { method: 'POST', body: new FormData(form) });
+        const data = await resp.json();
+        if (!resp.ok) {
+            salida.innerHTML = `<p style="color: #e74c3c;">${esc(data.error)}</p>`;
+            return;
+        }
+        const accion = data.simulacion ? 'listas para importar' : 'insertadas';
+        const cantidad = data.simulacion ? data.validas : data.insertadas;
+        const omitidos = data.total_errores - data.errores.length;
+        salida.innerHTML = `
+            <p>${data.filas} filas leídas · <strong style="color: var(--gold);">${cantidad} ${accion}</strong> · ${data.total_errores} con errores</p>
+            ${data.errores.length ? `<table><thead><tr><th>Fila</th><th>Error</th></tr></thead><tbody>
+                ${data.errores.map(e => `<tr><td>${e.fila}</td><td>${esc(e.error)}</td></tr>`).join('')}
+            </tbody></table>` : ''}
+            ${omitidos > 0 ? `<p style="color: #888;">... y ${omitidos} errores más</p>` : ''}`;
+        if (!data.simulacion && data.insertadas && data.tipo !== 'clientes') cargarInventario(false);
+    } catch (e) {
+        salida.innerHTML = `<p style="color: #e74c3c;">Error al importar: ${esc(e.message)}</p>`;
+    } finally {
+        boton.disabled = false;
+    }
+}
+
+// --- FIDELIZACIÓN ---
+async function cargarPuntos() {
+    const data = await pedirJSON('/admin/api/puntos', new URLSearchParams());
+    premiosDisponibles = data.premios;
+
+    document.getElementById('listaReglas').innerHTML = data.reglas.length ? data.reglas.map(r => `
+        <div style="display: flex; justify-content: space-between; align-items: center; padding: 12px 5px; border-bottom: 1px solid #222;">
+            <div style="color: white; font-size: 0.9em;">
+                <span style="color: var(--text-dim); font-size: 0.8em;">Rango:</span>
+                ${dinero(r.rango_min)} - ${dinero(r.rango_max)}
+            </div>
+            <div style="display: flex; align-items: center; gap: 15px;">
+                <span style="color: var(--gold); border: 1px solid var(--gold); padding: 2px 8px; font-size: 0.75em; border-radius: 2px; font-weight: bold;">${r.puntos} PTS</span>
+                <a href="/admin/eliminar-regla/${r.id}" style="color: white; text-decoration: none; font-weight: bold;"
+                   onclick="return confirm('¿Eliminar esta regla?')">✕</a>
+            </div>
+        </div>`).join('')
+        : '<p style="color: var(--text-dim); font-size: 0.8em; text-align: center; margin-top: 20px;">No hay reglas definidas.</p>';
+
+    document.getElementById('listaPremios').innerHTML = data.premios.length ? data.premios.map(p => `
+        <div style="display: flex; justify-content: space-between; align-items: center; padding: 12px 5px; border-bottom: 1px solid #222;">
+            <div style="color: white; font-size: 0.9em;">${esc(p.nombre)}</div>
+            <div style="display: flex; align-items: center; gap: 15px;">
+                <span style="color: var(--gold); border: 1px solid var(--gold); padding: 2px 8px; font-size: 0.75em; border-radius: 2px;">${p.puntos_requeridos} PTS</span>
+                <a href="/admin/eliminar-premio/${p.id}" style="color: white; text-decoration: none; font-weight: bold;"
+                   onclick="return confirm('¿Eliminar premio?')">✕</a>
+            </div>
+        </div>`).join('')
+        : '<p style="color: var(--text-dim); font-size: 0.8em; text-align: center; margin-top: 20px;">No hay premios publicados.</p>';
+}
+
+function buscarCliente() {
+    const q = document.getElementById('inputBusqueda').value;
+    const res = document.getElementById('resultadosBusqueda');
+    if (q.length < 3) return alert("Mínimo 3 caracteres");
+    res.innerHTML = "<p style='color:var(--gold); font-size: 0.8em; letter-spacing: 1px;'>CONSULTANDO...</p>";
+
+    fetch(`/admin/buscar_cliente_json?q=${q}`)
+        .then(r => r.json())
+        .then(data => {
+            res.innerHTML = "";
+            if(data.length === 0) res.innerHTML = "<p style='color:var(--text-dim)'>No se hallaron registros.</p>";
+            data.forEach(c => {
+                let opciones = premiosDisponibles.map(p =>
+                    `<option value="${p.puntos_requeridos}" ${c.puntos < p.puntos_requeridos ? 'disabled' : ''}>
+                        ${p.nombre} (${p.puntos_requeridos} pts)
+                    </option>`).join('');
+                res.innerHTML += `
+                    <div class="client-result-item">
+                        <div>
+                            <strong style="color:var(--gold); letter-spacing: 1px;">${c.nombre.toUpperCase()}</strong><br>
+                            <small style="color:var(--text-dim)">${c.email}</small><br>
+                            <span class="badge-gold" style="margin-top:5px; display:inline-block">${c.puntos} PTS</span>
+                        </div>
+                        <form action="/admin/canjear/${c.id}" method="POST" style="display:flex; gap:10px;">
+                            <select name="puntos" required style="margin-bottom:0; width:220px; border-color: var(--gold);">${opciones}</select>
+                            <button type="submit" class="btn-gold" style="width:auto; padding: 0 30px;">Canjear</button>
+                        </form>
+                    </div>`;
+            });
+        });
+}
+
+// --- LÓGICA DE EDICIÓN ---
+function openEditProducto(id, nombre, precio, stock, unidad) {
+    const modal = document.getElementById('modalEditar');
+    const form = document.getElementById('editForm');
+    const extras = document.getElementById('extraFields');
+
+    document.getElementById('editTitle').innerText = "Editar Producto";
+    document.getElementById('editNombre').value = nombre;
+    document.getElementById('editPrecio').value = precio;
+
+    form.action = '/admin/editar-producto/' + id;
+
+    extras.innerHTML = `
+        <div class="input-group"><label>Stock</label><input type="number" name="stock" value="${stock}" required></div>
+        <div class="input-group"><label>Medida</label><input type="text" name="unidad" value="${unidad}" required></div>
+    `;
+    modal.style.display = 'block';
+}
+
+function openEditServicio(id, nombre, precio, duracion) {
+    const modal = document.getElementById('modalEditar');
+    const form = document.getElementById('editForm');
+    const extras = document.getElementById('extraFields');
+
+    document.getElementById('editTitle').innerText = "Editar Servicio";
+    document.getElementById('editNombre').value = nombre;
+    document.getElementById('editPrecio').value = precio;
+    form.action = '/admin/editar-servicio/' + id;
+    extras.innerHTML = `
+        <div class="input-group">
+            <label>Duración (Minutos)</label>
+            <input type="number" name="duracion" value="${duracion}" required>
+        </div>
+    `;
+    modal.style.display = 'block';
+}
+
+function editarServicio(id) {
+    const s = catalogo.servicios[id];
+    openEditServicio(s.id, s.nombre, s.precio, s.duracion_minutos);
+}
+
+function editarProducto(id) {
+    const p = catalogo.productos[id];
+    openEditProducto(p.id, p.nombre, p.precio, p.stock, p.unidad);
+}
+
+function closeEditModal() {
+    document.getElementById('modalEditar').style.display = 'none';
+}
+
+window.onclick = function(event) {
+    let modal = document.getElementById('modalEditar');
+    if (event.target == modal) closeEditModal();
+}
+
+window.onload = async () => {
+    await cargarFiltros();
+    showSection(window.location.hash.replace('#', '') || 'inicio');
+    escucharAgenda();
+};
@@ -0,0 +1,107 @@
+const selectBarbero = document.getElementById('select_barbero');
+const selectFecha = document.getElementById('fecha_dia');
+const selectHora = document.getElementById('hora_slot');
+const selectServicio = document.getElementById('select_servicio');
+const editTurnoInput = document.getElementById('edit_turno_id');
+const horaOriginal = document.getElementById('horaOriginal')?.value || null;
+
+selectFecha.setAttribute('min', new Date().toISOString().split('T')[0]);
+
+async function actualizarDisponibilidad() {
+    const barberoId = selectBarbero.value;
+    const fecha = selectFecha.value;
+    const editId = editTurnoInput ? editTurnoInput.value : '';
+    const servicioSeleccionado = selectServicio.selectedOptions[0];
+
+    if (!servicioSeleccionado || !barberoId || !fecha) return;
+
+    const duracionSolicitada = parseInt(servicioSeleccionado.getAttribute('data-duracion')) || 30;
+    selectHora.innerHTML = '<option>Calculando...</option>';
+
+    try {
+        const response = await fetch(`/api/disponibilidad?barbero_id=${barberoId}&fecha=${fecha}&edit_id=${editId}`);
+        const bloqueados = await response.json();
+
+        const ahora = new Date();
+        const hoyStr = ahora.toISOString().split('T')[0];
+        const horaActualMinutos = (ahora.getHours() * 60) + ahora.getMinutes();
+
+        selectHora.innerHTML = '';
+        const apertura = 9 * 60;  
+        const cierre = 21 * 60;  
+
+        for (let tiempo = apertura; tiempo + duracionSolicitada <= cierre; tiempo += 5) {
+            if (fecha === hoyStr && tiempo <= horaActualMinutos + 15) continue;
+
+            const h = Math.floor(tiempo / 60);
+            const m = tiempo % 60;
+            const horaInicioStr = `${h.toString().padStart(2, '0')}:${m.toString().padStart(2, '0')}`;
+
+            const tiempoFin = tiempo + duracionSolicitada;
+            const hF = Math.floor(tiempoFin / 60);
+            const mF = tiempoFin % 60;
+            const horaFinStr = `${hF.toString().padStart(2, '0')}:${mF.toString().padStart(2, '0')}`;
+
+            const estaOcupado = bloqueados.some(slot => {
+                return horaInicioStr < slot.fin && horaFinStr > slot.inicio;
+            });
+
+            if (!estaOcupado) {
+                const opt = document.createElement('option');
+                opt.value = horaInicioStr;
+                opt.textContent = horaInicioStr;
+                if (horaOriginal && horaInicioStr === horaOriginal) opt.selected = true;
+                selectHora.appendChild(opt);
+            }
+        }
+        if (selectHora.options.length === 0) selectHora.innerHTML = '<option value="">Sin turnos disponibles</option>';
+    } catch (error) {
+        selectHora.innerHTML = '<option value="">Error al cargar</option>';
+    }
+}
+
+async function cargarMasCitas() {
+    const boton = document.getElementById('btn-ver-mas');
+    boton.disabled = true;
+    try {
+        const resp = await fetch(`/api/mis-turnos?cursor=${encodeURIComponent(boton.dataset.cursor)}`);
+        const data = await resp.json();
+        const tabla = document.getElementById('tabla-citas');
+
+        data.turnos.forEach(t => {
+            const tr = document.createElement('tr');
+            const acciones = t.estado === 'pendiente'
+                ? `<a href="/agendar?edit_id=${t.id}" style="color: white; margin-right: 10px;"><i class="fas fa-edit"></i></a>
+                   <a href="/cancelar-turno/${t.id}" onclick="return confirm('¿Cancelar cita?')" style="color: var(--gold);"><i class="fas fa-trash"></i></a>`
+                : '';
+            tr.innerHTML = `
+                <td>
+                    <div style="font-weight: bold; color: var(--gold);"></div>
+                    <div style="font-size: 0.85em;"><span></span> con <b></b></div>
+                </td>
+                <td style="text-align: right;">${acciones}</td>`;
+            tr.querySelector('div').textContent = t.fecha;
+            tr.querySelector('span').textContent = t.servicio;
+            tr.querySelector('b').textContent = t.barbero;
+            tabla.appendChild(tr);
+        });
+
+        if (data.siguiente) {
+            boton.dataset.cursor = data.siguiente;
+            boton.disabled = false;
+        } else {
+            boton.style.display = 'none';
+        }
+    } catch (error) {
+        console.error("Error cargando citas:", error);
+        boton.disabled = false;
+    }
+}
+
+[selectBarbero, selectFecha, selectServicio].forEach(el => el.addEventListener('change', actualizarDisponibilidad));
+
+document.addEventListener('DOMContentLoaded', () => {
+    if (selectBarbero.value && selectFecha.value && selectServicio.value) {
+        actualizarDisponibilidad();
+    }
+});
@@ -0,0 +1,224 @@
+// --- NAVEGACIÓN ---
+function showSection(sectionId, event) {
+    console.log("Mostrando sección:", sectionId);
+
+    // 1. Ocultar todas
+    const sections = document.querySelectorAll('.section');
+    sections.forEach(s => {
+        s.style.display = 'none';
+        s.classList.remove('active');
+    });
+
+    // 2. Desactivar todos los botones
+    document.querySelectorAll('.nav-btn').forEach(b => b.classList.remove('active'));
+
+    // 3. Activar la elegida
+    const target = document.getElementById(sectionId);
+    if (target) {
+        target.style.display = 'block';
+        target.classList.add('active');
+        localStorage.setItem('empleado_tab_activa', sectionId);
+    }
+
+    // 4. Marcar botón activo
+    if (event) {
+        event.currentTarget.classList.add('active');
+    } else {
+        const btn = document.getElementById('btn-' + sectionId);
+        if (btn) btn.classList.add('active');
+    }
+}
+
+let extrasSeleccionados = [];
+
+// --- FUNCIONES DE EXTRAS ---
+function cargarOpciones() {
+    const tipo = document.getElementById('extra_tipo').value;
+    const select = document.getElementById('extra_item');
+    select.innerHTML = '';
+    const lista = (tipo === 'servicio') ? serviciosBase : productosBase;
+    lista.forEach(item => {
+        let opt = document.createElement('option');
+        opt.value = item.id;
+        opt.dataset.nombre = item.nombre;
+        opt.textContent = `${item.nombre} ($${item.precio})`;
+        select.appendChild(opt);
+    });
+}
+
+function renderizarExtras() {
+    const tbody = document.getElementById('lista_extras_temp');
+    const editable = document.getElementById('controles_registro').style.display !== 'none';
+
+    if (extrasSeleccionados.length === 0) {
+        tbody.innerHTML = '<tr><td style="color:#444; text-align:center;">Sin extras</td></tr>';
+        return;
+    }
+
+    tbody.innerHTML = extrasSeleccionados.map((item, index) => `
+        <tr>
+            <td style="color:white; padding:8px; border-bottom:1px solid #222;">
+                <small style="color:var(--gold)">${item.tipo.toUpperCase()}</small> | ${item.nombre}
+            </td>
+            <td style="text-align:right;">
+                ${editable ? `<button onclick="eliminarDeLista(${index})" style="color:red; background:none; border:none; cursor:pointer;">&times;</button>` : ''}
+            </td>
+        </tr>
+    `).join('');
+}
+
+function agregarALista() {
+    const tipo = document.getElementById('extra_tipo').value;
+    const select = document.getElementById('extra_item');
+    if (!select.value) return;
+    extrasSeleccionados.push({
+        id: select.value,
+        nombre: select.options[select.selectedIndex].dataset.nombre,
+        tipo: tipo
+    });
+    renderizarExtras();
+}
+
+function eliminarDeLista(index) {
+    extrasSeleccionados.splice(index, 1);
+    renderizarExtras();
+}
+
+function openAdicionales(button) {
+    const turnoId = button.getAttribute('data-id');
+    document.getElementById('modal_turno_id').value = turnoId;
+    document.getElementById('titulo_modal').textContent = "Gestionar Extras";
+    document.getElementById('controles_registro').style.display = 'flex';
+    document.getElementById('btn_guardar_extras').style.display = 'block';
+    fetchExtras(turnoId);
+    document.getElementById('modalAdicionales').style.display = 'block';
+    cargarOpciones();
+}
+
+function openDetalles(button) {
+    const turnoId = button.getAttribute('data-id');
+    document.getElementById('titulo_modal').textContent = "Detalles del Servicio";
+    document.getElementById('controles_registro').style.display = 'none';
+    document.getElementById('btn_guardar_extras').style.display = 'none';
+    fetchExtras(turnoId);
+    document.getElementById('modalAdicionales').style.display = 'block';
+}
+
+function fetchExtras(turnoId) {
+    fetch(`/get_extras_turno/${turnoId}`)
+        .then(res => res.json())
+        .then(data => {
+            extrasSeleccionados = data.extras || [];
+            renderizarExtras();
+        });
+}
+
+function enviarExtrasServidor() {
+    const turnoId = document.getElementById('modal_turno_id').value;
+    fetch('/guardar_extras_multiples', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ turno_id: turnoId, extras: extrasSeleccionados })
+    }).then(res => res.ok ? window.location.reload() : alert("Error al guardar"));
+}
+
+function closeModal() { document.getElementById('modalAdicionales').style.display = 'none'; }
+
+function toggleHoras(checkbox) {
+    document.querySelectorAll('.input-hora').forEach(i => {
+        i.disabled = checkbox.checked;
+        i.style.opacity = checkbox.checked ? "0.3" : "1";
+    });
+}
+
+// --- AGENDA EN TIEMPO REAL (SSE) ---
+// Los turnos nuevos, reprogramados, completados o cancelados llegan por
+// /empleado/eventos y se actualiza solo su fila y los contadores del día.
+function esc(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto == null ? '' : String(texto);
+    return div.innerHTML;
+}
+
+function filaTurno(t) {
+    const acciones = t.estado === 'pendiente'
+        ? `<div style="display: flex; gap: 10px; justify-content: flex-end;">
+               <button class="btn-small btn-add" data-id="${t.id}" onclick="openAdicionales(this)">+ Extra</button>
+               <form action="/completar-turno/${t.id}" method="POST" style="display:inline;">
+                   <button type="submit" class="btn-small btn-confirm" onclick="return confirm('¿Confirmar finalización?')">Finalizar</button>
+               </form>
+               <form action="/empleado/inasistencia/${t.id}" method="POST" style="display: inline;">
+                   <button type="submit" class="btn-small" style="border-color: #444; color: #888;">🚫</button>
+               </form>
+           </div>`
+        : `<button class="btn-small btn-confirm" data-id="${t.id}" onclick="openDetalles(this)">Ver Detalles</button>`;
+    return `
+        <tr data-turno-id="${t.id}" data-hora="${t.hora}">
+            <td width="10%"><strong>${t.hora}</strong></td>
+            <td>${esc(t.cliente)}</td>
+            <td style="color: #aaa;">${esc(t.servicio)}</td>
+            <td><span class="badge">${esc(t.estado)}</span></td>
+            <td style="color: var(--gold); font-weight: bold;">$${Number(t.total).toFixed(2)}</td>
+            <td style="text-align: right;">${acciones}</td>
+        </tr>`;
+}
+
+function contarTurno(t, signo, fecha) {
+    // La agenda del barbero solo muestra pendientes y completados del día elegido
+    if (!t || t.fecha !== fecha || !['pendiente', 'completado'].includes(t.estado)) return;
+    const ids = { pendiente: 'statPendientes', completado: 'statCompletados' };
+    ['statTotal', ids[t.estado]].forEach(id => {
+        const el = id && document.getElementById(id);
+        if (el) el.textContent = parseInt(el.textContent, 10) + signo;
+    });
+}
+
+function aplicarEventoTurno(ev) {
+    const tbody = document.getElementById('agendaEmpleado');
+    if (ev.tipo === 'resincronizar') {
+        window.location.reload();
+        return;
+    }
+    const fecha = tbody.dataset.fecha;
+    const anterior = tbody.querySelector(`tr[data-turno-id="${ev.id}"]`);
+    // Sin fila previa el turno no estaba en esta agenda (otro día u otro barbero)
+    contarTurno(anterior ? ev.antes : null, -1, fecha);
+    if (anterior) anterior.remove();
+
+    // Un turno reprogramado con otro barbero solo sale de esta agenda
+    if (ev.fecha === fecha && ['pendiente', 'completado'].includes(ev.estado) && String(ev.empleado_id) === tbody.dataset.empleado) {
+        contarTurno(ev, +1, fecha);
+        const vacia = tbody.querySelector('.fila-vacia');
+        if (vacia) vacia.remove();
+        const siguiente = Array.from(tbody.rows).find(f => f.dataset.hora > ev.hora);
+        if (siguiente) siguiente.insertAdjacentHTML('beforebegin', filaTurno(ev));
+        else tbody.insertAdjacentHTML('beforeend', filaTurno(ev));
+    }
+}
+
+function escucharAgenda() {
+    if (!window.EventSource || !document.getElementById('agendaEmpleado')) return;
+    const fuente = new EventSource('/empleado/eventos');
+    fuente.addEventListener('turno', e => aplicarEventoTurno(JSON.parse(e.data)));
+}
+
+// --- AL CARGAR ---
+document.addEventListener("DOMContentLoaded", function() {
+    const tab = localStorage.getItem('empleado_tab_activa') || 'hoy';
+    const urlParams = new URLSearchParams(window.location.search);
+
+    // Si hay un cambio de fecha en la URL, siempre mostrar 'hoy'
+    if (urlParams.has('fecha')) {
+        showSection('hoy');
+    } else {
+        showSection(tab);
+    }
+
+    escucharAgenda();
+
+    // Auto-cierre de alertas
+    const toast = document.getElementById('auto-close-alert');
+    if (toast) {
+        setTimeout(() => { toast.style.opacity = '0'; setTimeout(() => toast.remove(), 500); }, 3000);
+    }
+});